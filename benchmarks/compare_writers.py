@@ -0,0 +1,71 @@
+"""Compare the row-by-row and bulk chunk writers on the sample document.
+
+Run from the repository root against a scratch database:
+
+    python -m benchmarks.compare_writers --copies 20 --repeat 3
+
+Embeddings are random vectors so only write cost is measured. Every row the
+benchmark writes is deleted again before it exits.
+"""
+import argparse
+import random
+import time
+from processor.document_processor import DocumentProcessor
+from config import DB_CONFIG
+
+SAMPLE_DOC = "tests/test_data/sample_doc.md"
+
+def build_plans(processor, copies):
+    """Chunk the sample document and attach random embeddings"""
+    with open(SAMPLE_DOC, 'r', encoding='utf-8') as f:
+        content = f.read()
+    plans = []
+    for _ in range(copies):
+        nodes = processor._build_chunk_plan(content)
+        for node in nodes:
+            node['embedding'] = [random.random() for _ in range(1024)]
+        plans.append(nodes)
+    return plans
+
+def delete_chunks(processor, ids):
+    """Remove benchmark rows"""
+    with processor.conn.cursor() as cur:
+        cur.execute("DELETE FROM json_blocks WHERE chunk_id = ANY(%s)", (ids,))
+        cur.execute("DELETE FROM table_blocks WHERE chunk_id = ANY(%s)", (ids,))
+        cur.execute("DELETE FROM document_chunks WHERE id = ANY(%s)", (ids,))
+    processor.conn.commit()
+
+def run(processor, plans, mode):
+    """Write all plans with the given mode and return (seconds, chunk IDs)"""
+    start = time.perf_counter()
+    if mode == "bulk":
+        ids = [i for plan_ids in processor.bulk_writer.write_plans(plans) for i in plan_ids]
+    else:
+        ids = [i for nodes in plans for i in processor._write_plan(nodes)]
+    processor.conn.commit()
+    return time.perf_counter() - start, ids
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=10, help="Copies of the sample document per run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per write mode")
+    args = parser.parse_args()
+
+    processor = DocumentProcessor(DB_CONFIG)
+    try:
+        plans = build_plans(processor, args.copies)
+        rows = sum(len(nodes) for nodes in plans)
+        print(f"Writing {rows} chunks ({args.copies} documents) per run")
+        for mode in ("row", "bulk"):
+            timings = []
+            for _ in range(args.repeat):
+                elapsed, ids = run(processor, plans, mode)
+                delete_chunks(processor, ids)
+                timings.append(elapsed)
+            best = min(timings)
+            print(f"{mode:>5}: best {best:.3f}s, {rows / best:.0f} chunks/s")
+    finally:
+        processor.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare embedding backends on the sample doc: throughput and agreement with fp32.
+
+Run from the repository root:
+
+    python -m benchmarks.embedding_backends --threads 8
+
+The fp32 HuggingFace backend is the reference. For each backend this prints
+batch throughput (texts/sec), single-query latency, and the mean and minimum
+cosine similarity of its vectors to the reference vectors.
+"""
+import argparse
+import statistics
+import time
+import numpy as np
+from processor.document_processor import DocumentProcessor
+from processor.embedding_backends import HuggingFaceBackend, OnnxBackend
+from config import EMBEDDING_MODEL_CONFIG
+
+SAMPLE_DOC = "tests/test_data/sample_doc.md"
+
+def sample_texts():
+    """Chunk texts of the sample doc, exactly as ingestion would embed them"""
+    with open(SAMPLE_DOC, 'r', encoding='utf-8') as f:
+        return [node['embed_text'] for node in DocumentProcessor._build_chunk_plan(f.read())]
+
+def measure(backend, texts, batch_size, queries):
+    """Return (vectors, texts/sec, median query latency in ms)"""
+    backend.embed_documents(texts[:batch_size])  # Warm-up
+    start = time.perf_counter()
+    vectors = []
+    for i in range(0, len(texts), batch_size):
+        vectors.extend(backend.embed_documents(texts[i:i + batch_size]))
+    throughput = len(texts) / (time.perf_counter() - start)
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        backend.embed_query(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.asarray(vectors, dtype=np.float32), throughput, statistics.median(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=EMBEDDING_MODEL_CONFIG["intra_op_threads"],
+                        help="Intra-op threads (0 lets the runtime decide)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    model_name = EMBEDDING_MODEL_CONFIG["model_name"]
+    texts = sample_texts()
+    queries = ["what are the rate limits for getOrders", "A+ content document modules", "StandardTextModule"] * 5
+    print(f"{len(texts)} chunks from {SAMPLE_DOC}, model {model_name}")
+
+    backends = [
+        ("pytorch fp32 (cpu)", lambda: HuggingFaceBackend(model_name, device="cpu", intra_op_threads=args.threads)),
+        ("onnx fp32", lambda: OnnxBackend(model_name, quantize=False, intra_op_threads=args.threads,
+                                          cache_dir=EMBEDDING_MODEL_CONFIG["onnx_cache_dir"])),
+        ("onnx int8", lambda: OnnxBackend(model_name, quantize=True, intra_op_threads=args.threads,
+                                          cache_dir=EMBEDDING_MODEL_CONFIG["onnx_cache_dir"])),
+    ]
+    reference = None
+    print(f"{'backend':<20}{'texts/s':>10}{'query ms':>10}{'mean cos':>10}{'min cos':>10}")
+    for name, factory in backends:
+        vectors, throughput, latency = measure(factory(), texts, args.batch_size, queries)
+        if reference is None:
+            reference = vectors
+        # Vectors are L2-normalized, so the row-wise dot product is the cosine similarity
+        cosines = np.sum(vectors * reference, axis=1)
+        print(f"{name:<20}{throughput:>10.1f}{latency:>10.1f}{cosines.mean():>10.4f}{cosines.min():>10.4f}")
+
+if __name__ == "__main__":
+    main()
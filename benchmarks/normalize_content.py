@@ -0,0 +1,70 @@
+"""Micro-benchmark for the backtick/header normalization pass in process_document.
+
+Run from the repository root:
+
+    python -m benchmarks.normalize_content --fields 3000
+
+Compares the single-pass DocumentProcessor._normalize_content with the previous
+replace-and-slice implementation on the sample doc and on a synthetic reference
+page with many "`field` type" entries.
+"""
+import argparse
+import re
+import time
+from processor.document_processor import DocumentProcessor
+
+SAMPLE_DOC = "tests/test_data/sample_doc.md"
+
+def legacy_normalize_content(content: str) -> str:
+    """Previous implementation: one content.replace() per match, then a slice per header"""
+    pattern = r"(`\S+`)\s*(\S+)\s*\1\s*\2"
+    matches = list(re.finditer(pattern, content))
+    
+    for match in matches:
+        full_match = match.group(0)
+        backtick_part = match.group(1)
+        word_part = match.group(2)
+        new_first_part = re.sub(r'(`\S+`)\s*\n\n+(\S+)', r'\1 \2', f"{backtick_part}\n\n{word_part}")
+        content = content.replace(full_match, full_match.replace(f"{backtick_part}\n\n{word_part}", new_first_part))
+    
+    matches = re.finditer(pattern, content)
+    offset = 0
+    for match in matches:
+        start = match.start() + offset
+        content = content[:start] + "### " + content[start:]
+        offset += 4
+    return content
+
+def reference_page(fields: int) -> str:
+    """Synthetic API reference page shaped like the scraped property tables"""
+    return "# Reference\n\n" + "".join(
+        f"`field{i}`\n\nstring\n\n`field{i}`\n\nstring\n\nDescription of field {i}.\n\n"
+        for i in range(fields)
+    )
+
+def best_of(func, content, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(content)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fields", type=int, default=3000, help="Fields on the synthetic reference page")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(SAMPLE_DOC, 'r', encoding='utf-8') as f:
+        documents = {"sample_doc.md": f.read(), f"reference page ({args.fields} fields)": reference_page(args.fields)}
+
+    for name, content in documents.items():
+        assert legacy_normalize_content(content) == DocumentProcessor._normalize_content(content)
+        legacy = best_of(legacy_normalize_content, content, args.repeat)
+        current = best_of(DocumentProcessor._normalize_content, content, args.repeat)
+        print(f"{name}: {len(content)} chars, legacy {legacy * 1000:.2f}ms, "
+              f"single pass {current * 1000:.2f}ms ({legacy / current:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Compare per-query search latency of the single-statement searches with the old N+1 path.
+
+Run from the repository root against an ingested database:
+
+    python -m benchmarks.search_latency --repeat 20 --limit 5
+
+Query embeddings are computed once up front and the retrieval result cache is
+turned off, so only database time is measured.
+The legacy path issues one query for the chunks plus two per hit for their JSON
+and table blocks (hybrid runs it for the semantic and the keyword half).
+"""
+import argparse
+import statistics
+import time
+from processor.document_processor import DocumentProcessor
+from config import DB_CONFIG
+
+QUERIES = [
+    "what are the rate limits for getOrders",
+    "A+ content document modules",
+    "StandardTextModule",
+    "how do I create a feed document",
+    "restricted data token",
+]
+
+class PrecomputedEmbeddings:
+    """Serve query embeddings computed before timing starts"""
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_query(self, text):
+        return self.vectors[text]
+
+def _attach_blocks(cur, rows, with_distance):
+    results = []
+    for row in rows:
+        chunk_id, content, metadata = row[:3]
+        cur.execute("SELECT json_content, metadata FROM json_blocks WHERE chunk_id = %s", (chunk_id,))
+        json_blocks = [{"content": r[0], "metadata": r[1]} for r in cur.fetchall()]
+        cur.execute("SELECT table_content, headers, metadata FROM table_blocks WHERE chunk_id = %s", (chunk_id,))
+        tables = [{"content": r[0], "headers": r[1], "metadata": r[2]} for r in cur.fetchall()]
+        result = {"id": chunk_id, "content": content, "metadata": metadata,
+                  "json_blocks": json_blocks, "tables": tables}
+        if with_distance:
+            result["distance"] = row[3]
+        results.append(result)
+    return results
+
+def legacy_search(processor, query, limit, min_distance):
+    """The pre-aggregation semantic search: 1 + 2 * hits queries"""
+    query_embedding = processor.embeddings.embed_query(query)
+    with processor.conn.cursor() as cur:
+        cur.execute("""
+            SELECT id, content, metadata,
+                   embedding <-> %s::vector(1024) as distance
+            FROM document_chunks
+            WHERE embedding <-> %s::vector(1024) < %s
+            ORDER BY distance
+            LIMIT %s
+        """, (query_embedding, query_embedding, min_distance, limit))
+        return _attach_blocks(cur, cur.fetchall(), with_distance=True)
+
+def legacy_keyword_search(processor, query, limit):
+    """The pre-aggregation keyword search: 1 + 2 * hits queries"""
+    with processor.conn.cursor() as cur:
+        cur.execute("SELECT id, content, metadata FROM document_chunks WHERE content ILIKE %s LIMIT %s",
+                    (f"%{query}%", limit))
+        return _attach_blocks(cur, cur.fetchall(), with_distance=False)
+
+def legacy_hybrid_search(processor, query, limit, min_distance):
+    """The pre-aggregation hybrid search: both legacy searches merged in Python"""
+    merged = {r['id']: r for r in legacy_search(processor, query, limit, min_distance)}
+    for r in legacy_keyword_search(processor, query, limit):
+        merged.setdefault(r['id'], r)
+    return sorted(merged.values(), key=lambda r: r.get('distance', float('inf')))[:limit]
+
+def time_queries(search, repeat):
+    """Median and p95 latency in ms over `repeat` passes through QUERIES"""
+    latencies = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            search(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Passes through the query set")
+    parser.add_argument("--limit", type=int, default=5, help="Results per query (chat_cli uses 5)")
+    parser.add_argument("--min-distance", type=float, default=1.5)
+    args = parser.parse_args()
+
+    processor = DocumentProcessor(DB_CONFIG)
+    try:
+        processor.embeddings = PrecomputedEmbeddings({q: processor.embeddings.embed_query(q) for q in QUERIES})
+        # Every pass repeats the same queries, which the result cache would answer from memory
+        processor.result_cache = None
+        modes = [
+            ("semantic", lambda q: legacy_search(processor, q, args.limit, args.min_distance),
+             lambda q: processor.search(q, limit=args.limit, min_distance=args.min_distance)),
+            ("keyword", lambda q: legacy_keyword_search(processor, q, args.limit),
+             lambda q: processor.keyword_search(q, limit=args.limit)),
+            ("hybrid", lambda q: legacy_hybrid_search(processor, q, args.limit, args.min_distance),
+             lambda q: processor.hybrid_search(q, limit=args.limit, min_distance=args.min_distance)),
+        ]
+        print(f"{'mode':<10}{'path':<10}{'median ms':>12}{'p95 ms':>10}")
+        for name, legacy, current in modes:
+            for path, search in (("n+1", legacy), ("single", current)):
+                search(QUERIES[0])  # Warm-up
+                median, p95 = time_queries(search, args.repeat)
+                print(f"{name:<10}{path:<10}{median:>12.2f}{p95:>10.2f}")
+    finally:
+        processor.close()
+
+if __name__ == "__main__":
+    main()
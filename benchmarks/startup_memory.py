@@ -0,0 +1,52 @@
+"""Measure QueryHandler startup time, first-query latency and peak RSS.
+
+Run from the repository root (needs the database and the model):
+
+    python -m benchmarks.startup_memory
+    python -m benchmarks.startup_memory --legacy
+
+--legacy additionally loads a second copy of the model with AutoModel, the way
+QueryHandler used to, to show the memory that the shared embedding service saves.
+Run each mode in a fresh process; peak RSS only ever grows. The query embedding
+cache is kept in memory only, so the first query always loads the model.
+"""
+import argparse
+import os
+import resource
+import time
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is in KiB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--legacy", action="store_true", help="Also load the duplicate AutoModel copy")
+    parser.add_argument("--query", default="what are the rate limits for getOrders")
+    args = parser.parse_args()
+
+    # A cache persisted by an earlier run would answer the first query without the model
+    os.environ["QUERY_CACHE_DIR"] = ""
+
+    print(f"{'phase':<28}{'seconds':>10}{'peak RSS MB':>14}")
+    started = time.perf_counter()
+    from query_handler import QueryHandler
+    print(f"{'imports':<28}{time.perf_counter() - started:>10.2f}{peak_rss_mb():>14.0f}")
+
+    started = time.perf_counter()
+    handler = QueryHandler()
+    if args.legacy:
+        from transformers import AutoModel, AutoTokenizer
+        from config import EMBEDDING_MODEL_CONFIG
+        handler.tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL_CONFIG["model_name"])
+        handler.model = AutoModel.from_pretrained(EMBEDDING_MODEL_CONFIG["model_name"])
+    print(f"{'QueryHandler()':<28}{time.perf_counter() - started:>10.2f}{peak_rss_mb():>14.0f}")
+
+    for label in ("first query embedding", "second query embedding"):
+        started = time.perf_counter()
+        handler.doc_processor.embeddings.embed_query(args.query)
+        print(f"{label:<28}{time.perf_counter() - started:>10.2f}{peak_rss_mb():>14.0f}")
+    handler.doc_processor.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Compare index size, vector memory, recall@k and latency of each VECTOR_STORAGE mode.
+
+Run from the repository root against an ingested database (pgvector >= 0.7):
+
+    python -m benchmarks.vector_storage --queries 100 --k 10
+
+Builds one index per storage (vector, halfvec, binary) under a temporary name with
+the configured metric and index type, and drops them afterwards unless --keep.
+Query vectors are the embeddings of randomly sampled chunks; the chunk itself is
+left out of every result list. Ground truth is an exact fp32 scan with index scans
+disabled, and recall@k is the share of its top k that each storage returns.
+"""
+import argparse
+import statistics
+import time
+import psycopg2
+from config import DB_CONFIG, VECTOR_INDEX_CONFIG
+from db.vector_index import (INDEX_NAME, STORAGES, create_index_sql, nearest_chunks_sql, nearest_chunks_params,
+                             search_settings, storage_spec)
+
+def nearest_ids(cur, config, query_embedding, query_id, k, exact=False):
+    """Ids of the k nearest chunks other than the query chunk, and the query time in ms"""
+    settings = {"enable_indexscan": "off"} if exact else search_settings(config, k + 1)
+    for name, value in settings.items():
+        cur.execute("SELECT set_config(%s, %s, true)", (name, str(value)))
+    started = time.perf_counter()
+    cur.execute(nearest_chunks_sql(config["metric"], config["storage"]),
+                nearest_chunks_params(config, query_embedding, k + 1, float("inf")))
+    elapsed = (time.perf_counter() - started) * 1000
+    ids = [chunk_id for chunk_id, _ in cur.fetchall() if chunk_id != query_id][:k]
+    cur.connection.rollback()
+    return ids, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=100, help="Sampled chunks used as queries")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours compared for recall@k")
+    parser.add_argument("--rerank-factor", type=int, default=VECTOR_INDEX_CONFIG["rerank_factor"],
+                        help="Candidates per result fetched from the compact indexes")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark indexes")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    indexes = []
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*) FROM document_chunks WHERE embedding IS NOT NULL")
+            rows = cur.fetchone()[0]
+            cur.execute("""
+                SELECT id, embedding::real[] FROM document_chunks
+                WHERE embedding IS NOT NULL
+                ORDER BY random()
+                LIMIT %s
+            """, (args.queries,))
+            queries = cur.fetchall()
+            conn.rollback()
+
+            base = {**VECTOR_INDEX_CONFIG, "storage": "vector", "rerank_factor": args.rerank_factor}
+            truth = {query_id: set(nearest_ids(cur, base, embedding, query_id, args.k, exact=True)[0])
+                     for query_id, embedding in queries}
+            exact_ms = statistics.median(nearest_ids(cur, base, embedding, query_id, args.k, exact=True)[1]
+                                         for query_id, embedding in queries[:10])
+
+            print(f"{rows} chunks, {len(queries)} queries, {VECTOR_INDEX_CONFIG['index_type']} "
+                  f"{VECTOR_INDEX_CONFIG['metric']}; exact scan median {exact_ms:.2f} ms")
+            print(f"{'storage':<10}{'index MB':>10}{'bytes/vector':>14}{'build s':>10}"
+                  f"{f'recall@{args.k}':>12}{'median ms':>11}")
+            for storage in STORAGES:
+                config = {**base, "storage": storage}
+                name = f"{INDEX_NAME}_{storage}_bench"
+                started = time.perf_counter()
+                cur.execute(f"DROP INDEX IF EXISTS {name}")
+                cur.execute(create_index_sql(config, name=name))
+                cur.execute("ANALYZE document_chunks")
+                conn.commit()
+                indexes.append(name)
+                build = time.perf_counter() - started
+                cur.execute("SELECT pg_relation_size(%s::regclass)", (name,))
+                index_mb = cur.fetchone()[0] / 2 ** 20
+                cur.execute(f"SELECT avg(pg_column_size({storage_spec(config['metric'], storage)['expression']})) "
+                            f"FROM document_chunks WHERE embedding IS NOT NULL")
+                vector_bytes = float(cur.fetchone()[0])
+                conn.rollback()
+
+                hits, latencies = 0, []
+                for query_id, embedding in queries:
+                    ids, elapsed = nearest_ids(cur, config, embedding, query_id, args.k)
+                    hits += len(truth[query_id].intersection(ids))
+                    latencies.append(elapsed)
+                recall = hits / sum(len(ids) for ids in truth.values())
+                print(f"{storage:<10}{index_mb:>10.1f}{vector_bytes:>14.0f}{build:>10.1f}"
+                      f"{recall:>12.3f}{statistics.median(latencies):>11.2f}")
+    finally:
+        if not args.keep:
+            conn.rollback()
+            with conn.cursor() as cur:
+                for name in indexes:
+                    cur.execute(f"DROP INDEX IF EXISTS {name}")
+            conn.commit()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
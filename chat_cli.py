@@ -1,12 +1,46 @@
-from query_handler import QueryHandler
+import argparse
 import sys
+import threading
+import time
 from config import GROQ_CONFIG
 
 SYSTEM_PROMPT = "You are a helpful assistant for Amazon API documentation. Use the provided context to answer as accurately as possible."
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Chat with the Amazon SP-API documentation")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Print the time spent in each startup phase before the first answer")
+    return parser.parse_args()
+
+def start_warm_up(handler) -> threading.Thread:
+    """Load the embedding model and connect to the database while the user types"""
+    def warm_up():
+        try:
+            handler.warm_up()
+        except Exception as e:
+            # The first query retries lazily and reports the error itself
+            handler.logger.error(f"Warm-up failed: {str(e)}")
+
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+def print_startup_report(timings):
+    print("Startup time by phase:")
+    # Phases in the order they ran; the imports are timed before the handler exists
+    for phase in sorted(timings, key=lambda phase: phase != "imports"):
+        print(f"  {phase:<14}{timings[phase]:>8.2f}s")
+
 def main():
+    args = parse_args()
     print("Amazon Docs Chatbot (type 'exit' or 'quit' to end)")
+    started = time.perf_counter()
+    # Deferred so the banner shows up before the heavy imports
+    from query_handler import QueryHandler
+    imports_seconds = time.perf_counter() - started
     handler = QueryHandler()
+    handler.startup_timings["imports"] = imports_seconds
+    warm_up = start_warm_up(handler)
     conversation = [
         {"role": "system", "content": SYSTEM_PROMPT}
     ]
@@ -19,6 +53,12 @@ def main():
                 print("Goodbye!")
                 break
 
+            # Usually finished by now; otherwise the first question waits for the rest of it
+            warm_up.join()
+            if args.startup_report:
+                print_startup_report(handler.startup_timings)
+                args.startup_report = False
+
             # Use LLM to clarify the query if there is a last query/result
             if last_user_query and last_search_result:
                 # Prepare a short context string from the last search result
@@ -22,7 +22,83 @@ DB_CONFIG = {
 # Model Configuration
 EMBEDDING_MODEL_CONFIG = {
     "model_name": "BAAI/bge-large-en-v1.5",  # Better for technical documentation
-    "device": "cuda"
+    "device": os.environ.get("EMBEDDING_DEVICE", "auto"),  # 'auto' picks cuda when available, else cpu
+    "backend": os.environ.get("EMBEDDING_BACKEND", "huggingface"),  # Options: 'huggingface', 'onnx' (CPU), 'remote' (embedding server)
+    "onnx_quantize": os.environ.get("EMBEDDING_ONNX_QUANTIZE", "true").lower() == "true",  # Dynamic int8 weights
+    "onnx_cache_dir": os.environ.get("EMBEDDING_ONNX_CACHE_DIR", ".cache/onnx"),
+    "intra_op_threads": int(os.environ.get("EMBEDDING_THREADS", 0)),  # 0 lets the runtime decide
+}
+
+# Vector index: one metric drives the index operator class and the query operator.
+# Search thresholds stay in L2 units whatever the metric (embeddings are normalized).
+VECTOR_INDEX_CONFIG = {
+    "metric": os.environ.get("VECTOR_METRIC", "l2"),  # Options: 'l2', 'cosine', 'ip' (inner product)
+    "index_type": os.environ.get("VECTOR_INDEX_TYPE", "hnsw"),  # Options: 'hnsw', 'ivfflat' (build after loading data)
+    "hnsw_m": int(os.environ.get("VECTOR_HNSW_M", 16)),
+    "hnsw_ef_construction": int(os.environ.get("VECTOR_HNSW_EF_CONSTRUCTION", 64)),
+    "hnsw_ef_search": int(os.environ.get("VECTOR_HNSW_EF_SEARCH", 40)),  # Candidate list size per query
+    "ivfflat_lists": int(os.environ.get("VECTOR_IVFFLAT_LISTS", 100)),  # About rows / 1000
+    "ivfflat_probes": int(os.environ.get("VECTOR_IVFFLAT_PROBES", 10)),  # Lists scanned per query
+    # What the index is built on: 'vector' (fp32), 'halfvec' (fp16) or 'binary' (1 bit per dimension).
+    # Compact indexes return rerank_factor x limit candidates, re-ranked on the fp32 embedding.
+    "storage": os.environ.get("VECTOR_STORAGE", "vector"),
+    "rerank_factor": int(os.environ.get("VECTOR_RERANK_FACTOR", 4)),
+}
+
+# Semantic search backend: Postgres, or an in-process memory-mapped snapshot
+# exported with `python -m processor.vector_snapshot export` (needs numpy, faiss optional)
+RETRIEVAL_CONFIG = {
+    "backend": os.environ.get("RETRIEVAL_BACKEND", "postgres"),  # Options: 'postgres', 'snapshot'
+    "snapshot_dir": os.environ.get("VECTOR_SNAPSHOT_DIR", ".cache/vector_snapshot"),
+    "snapshot_search": os.environ.get("VECTOR_SNAPSHOT_SEARCH", "numpy"),  # Options: 'numpy' (exact), 'faiss'
+    "dtype": os.environ.get("VECTOR_SNAPSHOT_DTYPE", "float32"),  # float16 halves memory but converts on every scan
+    "faiss_nlist": int(os.environ.get("VECTOR_SNAPSHOT_FAISS_NLIST", 0)),  # 0 for a flat index, else IVF lists
+    "faiss_nprobe": int(os.environ.get("VECTOR_SNAPSHOT_FAISS_NPROBE", 8)),  # IVF lists scanned per query
+}
+
+# LRU cache of query embeddings in the search path
+QUERY_CACHE_CONFIG = {
+    "max_entries": int(os.environ.get("QUERY_CACHE_MAX_ENTRIES", 10000)),
+    "ttl_seconds": float(os.environ.get("QUERY_CACHE_TTL_SECONDS", 7 * 24 * 3600)),  # 0 keeps entries forever
+    "dir": os.environ.get("QUERY_CACHE_DIR", ""),  # Persisted at exit when set (e.g. .cache/query_embeddings)
+}
+
+# Retrieval result cache, invalidated whenever an ingest commits (corpus generation)
+RESULT_CACHE_CONFIG = {
+    "max_entries": int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", 2048)),  # 0 disables the cache
+    "check_interval_seconds": float(os.environ.get("RESULT_CACHE_CHECK_INTERVAL", 0)),  # 0 checks on every search
+}
+
+# Semantic answer cache for QueryHandler.get_response (stored in Postgres)
+ANSWER_CACHE_CONFIG = {
+    "enabled": os.environ.get("ANSWER_CACHE_ENABLED", "true").lower() == "true",
+    "similarity_threshold": float(os.environ.get("ANSWER_CACHE_SIMILARITY", 0.95)),  # Cosine similarity of the questions
+    "ttl_hours": float(os.environ.get("ANSWER_CACHE_TTL_HOURS", 168)),
+    # Search modes that use the cache; keyword and identifier search would embed every question only for the lookup
+    "modes": os.environ.get("ANSWER_CACHE_MODES", "semantic,hybrid").split(","),
+}
+
+# Shared embedding server (python -m processor.embedding_server); set EMBEDDING_BACKEND=remote to use it
+EMBEDDING_SERVER_CONFIG = {
+    "url": os.environ.get("EMBEDDING_SERVER_URL", "http://127.0.0.1:8765"),  # Used by the 'remote' backend
+    "host": os.environ.get("EMBEDDING_SERVER_HOST", "127.0.0.1"),
+    "port": int(os.environ.get("EMBEDDING_SERVER_PORT", 8765)),
+    "backend": os.environ.get("EMBEDDING_SERVER_BACKEND", "huggingface"),  # Model backend inside the server
+    "max_batch_size": int(os.environ.get("EMBEDDING_SERVER_MAX_BATCH", 32)),  # Texts per model call
+    "max_wait_ms": float(os.environ.get("EMBEDDING_SERVER_MAX_WAIT_MS", 5)),  # How long a batch waits to fill up
+    "timeout": float(os.environ.get("EMBEDDING_SERVER_TIMEOUT", 60)),  # Client request timeout in seconds
+}
+
+# Ingestion Configuration
+INGEST_CONFIG = {
+    "embedding_batch_size": int(os.environ.get("EMBEDDING_BATCH_SIZE", 32)),  # Chunks per embed_documents call
+    "write_mode": os.environ.get("INGEST_WRITE_MODE", "row"),  # Options: 'row', 'bulk'
+}
+
+# Persistent chunk embedding cache (set EMBEDDING_CACHE_PATH to an empty string to disable)
+EMBEDDING_CACHE_CONFIG = {
+    "path": os.environ.get("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3"),
+    "max_entries": int(os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES", 500000)),
 }
 
 # Groq API Configuration
@@ -66,6 +142,42 @@ URL_PATHS = {
     "api_docs_url": "/sp-api/docs/welcome"
 }
 
+# URL discovery: HTTP-only by default, cached in a manifest until the TTL expires
+DISCOVERY_CONFIG = {
+    "manifest_path": os.environ.get("URL_MANIFEST_PATH", ".cache/url_manifest.json"),
+    "ttl_hours": float(os.environ.get("URL_MANIFEST_TTL_HOURS", 24)),
+    "selenium_fallback": os.environ.get("DISCOVERY_SELENIUM_FALLBACK", "false").lower() == "true",
+}
+
+# Compressed raw page cache for offline reprocessing (empty PAGE_CACHE_DIR disables it)
+PAGE_CACHE_CONFIG = {
+    "dir": os.environ.get("PAGE_CACHE_DIR", ".cache/pages"),
+}
+
+# Concurrent fetch configuration (rate limits apply per host)
+FETCH_CONFIG = {
+    "max_workers": int(os.environ.get("FETCH_MAX_WORKERS", 4)),
+    "requests_per_second": float(os.environ.get("FETCH_REQUESTS_PER_SECOND", 1.0)),
+    "burst": int(os.environ.get("FETCH_BURST", 1)),
+    "max_retries": int(os.environ.get("FETCH_MAX_RETRIES", 2)),
+    "backoff_seconds": float(os.environ.get("FETCH_BACKOFF_SECONDS", 2.0)),
+}
+
+# Per-URL ingestion journal used by --resume
+JOURNAL_CONFIG = {
+    "path": os.environ.get("INGEST_JOURNAL_PATH", ".cache/ingest_journal.sqlite3"),
+    "max_attempts": int(os.environ.get("INGEST_MAX_ATTEMPTS", 3)),  # Failed URLs are retried up to this many times
+}
+
+# Staged ingestion pipeline (python -m processor.pipeline)
+PIPELINE_CONFIG = {
+    "fetch_workers": int(os.environ.get("PIPELINE_FETCH_WORKERS", 4)),
+    "chunk_workers": int(os.environ.get("PIPELINE_CHUNK_WORKERS", 2)),
+    "embed_workers": int(os.environ.get("PIPELINE_EMBED_WORKERS", 1)),
+    "write_workers": int(os.environ.get("PIPELINE_WRITE_WORKERS", 1)),  # Each opens its own DB connection
+    "queue_size": int(os.environ.get("PIPELINE_QUEUE_SIZE", 16)),  # Bound on items waiting between stages
+}
+
 #Scraping configuration
 # SCRAPING_CONFIG = {
 #     "method": "beautifulsoup",
@@ -79,7 +191,22 @@ URL_PATHS = {
 # }
 
 # Search mode configuration
-SEARCH_MODE = os.environ.get("SEARCH_MODE", "semantic")  # Options: 'semantic', 'keyword', 'hybrid'
+SEARCH_MODE = os.environ.get("SEARCH_MODE", "semantic")  # Options: 'semantic', 'keyword', 'hybrid', 'identifier'
+
+# Hybrid search: semantic and full-text candidates merged with reciprocal rank fusion
+HYBRID_CONFIG = {
+    "semantic_candidates": int(os.environ.get("HYBRID_SEMANTIC_CANDIDATES", 20)),  # Nearest chunks fused
+    "keyword_candidates": int(os.environ.get("HYBRID_KEYWORD_CANDIDATES", 20)),  # Best full-text hits fused
+    "semantic_weight": float(os.environ.get("HYBRID_SEMANTIC_WEIGHT", 1.0)),
+    "keyword_weight": float(os.environ.get("HYBRID_KEYWORD_WEIGHT", 1.0)),
+    "rrf_k": int(os.environ.get("HYBRID_RRF_K", 60)),  # Larger values flatten the rank curve
+    "pool_size": int(os.environ.get("HYBRID_POOL_SIZE", 4)),  # Max pooled connections for the branches; more borrowers wait
+}
+
+# Trigram lookup of bare operation, model and error names (SEARCH_MODE=identifier)
+IDENTIFIER_SEARCH_CONFIG = {
+    "threshold": float(os.environ.get("IDENTIFIER_SIMILARITY_THRESHOLD", 0.5)),  # Minimum strict_word_similarity
+}
 
 # User-facing messages and prompts
 SYSTEM_PROMPT = "You are a helpful assistant for an API documentation. The docdumentation contains API text descriptions, tables and jsons samples for request, response and error codes. Use the provided context to answer as accurately as possible."
@@ -0,0 +1,78 @@
+from typing import List, Dict, Any
+from psycopg2.extras import Json, execute_values
+
+class BulkChunkWriter:
+    """Write embedded chunk plans with a few multi-row statements per batch.
+
+    Chunk IDs are reserved up front from document_chunks_id_seq, so parent_id
+    links can be resolved client-side instead of waiting on INSERT ... RETURNING
+    for every row. Nothing is committed here; the caller owns the transaction.
+    """
+
+    def __init__(self, conn, page_size: int = 500):
+        self.conn = conn
+        self.page_size = page_size
+
+    def allocate_ids(self, cur, count: int) -> List[int]:
+        """Reserve `count` chunk IDs from the document_chunks sequence"""
+        if count == 0:
+            return []
+        cur.execute("SELECT nextval('document_chunks_id_seq') FROM generate_series(1, %s)", (count,))
+        return [row[0] for row in cur.fetchall()]
+
+    def write_plans(self, plans: List[List[Dict[str, Any]]], document_ids: List[int] = None) -> List[List[int]]:
+        """Write one or more embedded chunk plans and return the chunk IDs of each plan"""
+        if document_ids is None:
+            document_ids = [None] * len(plans)
+        chunk_rows = []
+        json_rows = []
+        table_rows = []
+        plan_ids = []
+        with self.conn.cursor() as cur:
+            ids = self.allocate_ids(cur, sum(len(nodes) for nodes in plans))
+            offset = 0
+            for nodes, document_id in zip(plans, document_ids):
+                node_ids = ids[offset:offset + len(nodes)]
+                offset += len(nodes)
+                plan_ids.append(node_ids)
+                for chunk_id, node in zip(node_ids, nodes):
+                    parent_id = node_ids[node['parent']] if node['parent'] is not None else None
+                    chunk_rows.append((
+                        chunk_id,
+                        parent_id,
+                        document_id,
+                        node['content'],
+                        node['embedding'],
+                        Json(node['metadata'])
+                    ))
+                    for json_block in node['json_blocks']:
+                        json_rows.append((
+                            chunk_id,
+                            Json(json_block['content']),
+                            Json(json_block['metadata'])
+                        ))
+                    for table in node['tables']:
+                        table_rows.append((
+                            chunk_id,
+                            Json(table['content']),
+                            table['headers'],
+                            Json(table['metadata'])
+                        ))
+
+            # Parents always precede their children in a plan, so every page only
+            # references IDs written by itself or by an earlier page
+            execute_values(cur, """
+                INSERT INTO document_chunks (id, parent_id, document_id, content, embedding, metadata)
+                VALUES %s
+            """, chunk_rows, template="(%s, %s, %s, %s, %s::vector, %s)", page_size=self.page_size)
+            if json_rows:
+                execute_values(cur, """
+                    INSERT INTO json_blocks (chunk_id, json_content, metadata)
+                    VALUES %s
+                """, json_rows, page_size=self.page_size)
+            if table_rows:
+                execute_values(cur, """
+                    INSERT INTO table_blocks (chunk_id, table_content, headers, metadata)
+                    VALUES %s
+                """, table_rows, page_size=self.page_size)
+        return plan_ids
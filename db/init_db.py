@@ -1,6 +1,10 @@
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-from config import DB_CONFIG
+from config import DB_CONFIG, VECTOR_INDEX_CONFIG
+from db.vector_index import ensure_index
+from processor.retrieval_cache import BUMP_GENERATION_SQL
+from db.schema import (TEXT_SEARCH_CONFIG_SQL, CONTENT_TSV_SQL, HEADER_TEXT_SQL, CORPUS_STATE_SQL,
+                       ANSWER_CACHE_TABLE_SQL, ANSWER_CACHE_INDEX_SQL)
 
 def init_database(config):
     """Initialize the database and create required tables"""
@@ -27,12 +31,27 @@ def init_database(config):
     with conn.cursor() as cur:
         # Enable pgvector extension
         cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        
+        cur.execute(TEXT_SEARCH_CONFIG_SQL)
+        
+        # Create documents table (one row per source page, used for incremental re-ingestion)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id SERIAL PRIMARY KEY,
+                url TEXT UNIQUE NOT NULL,
+                content_hash TEXT NOT NULL,
+                chunk_count INTEGER,
+                last_ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
         
         # Create document_chunks table
         cur.execute("""
             CREATE TABLE IF NOT EXISTS document_chunks (
                 id SERIAL PRIMARY KEY,
                 parent_id INTEGER REFERENCES document_chunks(id),
+                document_id INTEGER REFERENCES documents(id),
                 title TEXT,
                 content TEXT,
                 embedding vector(1024),
@@ -41,6 +60,16 @@ def init_database(config):
             )
         """)
         
+        # Databases created before documents existed get the column added in place
+        cur.execute("""
+            ALTER TABLE document_chunks
+            ADD COLUMN IF NOT EXISTS document_id INTEGER REFERENCES documents(id)
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS document_chunks_document_id_idx
+            ON document_chunks (document_id)
+        """)
+        
         # Create json_blocks table
         cur.execute("""
             CREATE TABLE IF NOT EXISTS json_blocks (
@@ -66,12 +95,87 @@ def init_database(config):
             )
         """)
         
-        # Create vector similarity search index
+        # Keyword search matches against a stored tsvector of the content; a column
+        # generated without the unstemmed 'simple' lexemes is rebuilt
+        cur.execute("""
+            SELECT pg_get_expr(d.adbin, d.adrelid)
+            FROM pg_attrdef d
+            JOIN pg_attribute a ON a.attrelid = d.adrelid AND a.attnum = d.adnum
+            WHERE d.adrelid = 'document_chunks'::regclass AND a.attname = 'content_tsv'
+        """)
+        row = cur.fetchone()
+        if row and "'simple'" not in row[0]:
+            cur.execute("ALTER TABLE document_chunks DROP COLUMN content_tsv")
+        cur.execute(f"""
+            ALTER TABLE document_chunks
+            ADD COLUMN IF NOT EXISTS content_tsv {CONTENT_TSV_SQL}
+        """)
         cur.execute("""
-            CREATE INDEX IF NOT EXISTS document_chunks_embedding_idx 
-            ON document_chunks 
-            USING ivfflat (embedding vector_cosine_ops)
+            CREATE INDEX IF NOT EXISTS document_chunks_content_tsv_idx
+            ON document_chunks USING gin (content_tsv)
+        """)
+        
+        # Identifier search: trigram indexes on headers, content and table cells
+        cur.execute(f"""
+            ALTER TABLE document_chunks
+            ADD COLUMN IF NOT EXISTS header_text {HEADER_TEXT_SQL}
         """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS document_chunks_header_text_trgm_idx
+            ON document_chunks USING gin (header_text gin_trgm_ops)
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS document_chunks_content_trgm_idx
+            ON document_chunks USING gin (content gin_trgm_ops)
+        """)
+        
+        # Searches aggregate the blocks of each hit by chunk
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS json_blocks_chunk_id_idx
+            ON json_blocks (chunk_id)
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS table_blocks_chunk_id_idx
+            ON table_blocks (chunk_id)
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS table_blocks_content_trgm_idx
+            ON table_blocks USING gin ((table_content::text) gin_trgm_ops)
+        """)
+        
+        # Corpus generation for the retrieval result cache
+        for statement in CORPUS_STATE_SQL:
+            cur.execute(statement)
+        
+        # Answer cache
+        cur.execute(ANSWER_CACHE_TABLE_SQL)
+        # Older rows keep NULL here and never match a lookup
+        cur.execute("ALTER TABLE answer_cache ADD COLUMN IF NOT EXISTS min_distance DOUBLE PRECISION")
+        for statement in ANSWER_CACHE_INDEX_SQL:
+            cur.execute(statement)
+        
+        # Chunks stored before documents existed record no source URL, so nothing can
+        # match them to a page and re-ingesting would add a second copy; drop them
+        cur.execute("""
+            SELECT count(*) FROM document_chunks
+            WHERE document_id IS NULL AND metadata->>'source' IS NULL
+        """)
+        orphaned = cur.fetchone()[0]
+        if orphaned:
+            print(f"Deleting {orphaned} chunks stored before document tracking; re-ingest to restore them")
+            cur.execute("""
+                CREATE TEMP TABLE orphaned_chunks ON COMMIT DROP AS
+                SELECT id FROM document_chunks
+                WHERE document_id IS NULL AND metadata->>'source' IS NULL
+            """)
+            cur.execute("DELETE FROM answer_cache WHERE chunk_ids && ARRAY(SELECT id FROM orphaned_chunks)")
+            cur.execute("DELETE FROM json_blocks WHERE chunk_id IN (SELECT id FROM orphaned_chunks)")
+            cur.execute("DELETE FROM table_blocks WHERE chunk_id IN (SELECT id FROM orphaned_chunks)")
+            cur.execute("DELETE FROM document_chunks WHERE id IN (SELECT id FROM orphaned_chunks)")
+            cur.execute(BUMP_GENERATION_SQL)
+        
+        # Vector similarity index for the configured metric (rebuilt if the metric changed)
+        ensure_index(cur, VECTOR_INDEX_CONFIG)
         
     conn.commit()
     conn.close() 
\ No newline at end of file
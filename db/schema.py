@@ -0,0 +1,62 @@
+"""Schema constants shared by db/init_db.py and DocumentProcessor.setup_database"""
+
+# Full-text search configuration for chunk content: english, except that hyphenated
+# tokens such as x-amzn-RateLimit-Limit are also indexed whole instead of only as parts
+TEXT_SEARCH_CONFIG = "sp_api"
+TEXT_SEARCH_CONFIG_SQL = f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{TEXT_SEARCH_CONFIG}') THEN
+            CREATE TEXT SEARCH CONFIGURATION {TEXT_SEARCH_CONFIG} (COPY = english);
+            ALTER TEXT SEARCH CONFIGURATION {TEXT_SEARCH_CONFIG}
+                ALTER MAPPING FOR asciihword, hword, numhword WITH simple;
+        END IF;
+    END
+    $$;
+"""
+# Stemmed lexemes plus the exact (lowercased, unstemmed) words, so identifiers such as
+# getOrders also match as 'getorders' and not only as their english stem 'getord'
+CONTENT_TSV_SQL = (f"tsvector GENERATED ALWAYS AS (to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(content, '')) || "
+                   f"to_tsvector('simple', coalesce(content, ''))) STORED")
+# FROM item binding `q` to the query in both forms (parameters: query, query); chunks
+# containing the exact words match more lexemes and rank above stem-only matches
+KEYWORD_TSQUERY_SQL = (f"(SELECT websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', %s) || "
+                       f"websearch_to_tsquery('simple', %s)) AS keyword_query(q)")
+# Single-row counter bumped by every committed document write; tags cached search results
+CORPUS_STATE_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS corpus_state (
+        id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id),
+        generation BIGINT NOT NULL DEFAULT 0
+    )
+    """,
+    "INSERT INTO corpus_state DEFAULT VALUES ON CONFLICT DO NOTHING",
+]
+
+# Generated answers, looked up by query embedding and invalidated through chunk_ids
+ANSWER_CACHE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS answer_cache (
+        id SERIAL PRIMARY KEY,
+        query TEXT NOT NULL,
+        embedding vector(1024) NOT NULL,
+        search_mode TEXT NOT NULL,
+        result_limit INTEGER NOT NULL,
+        min_distance DOUBLE PRECISION,
+        answer TEXT NOT NULL,
+        chunk_ids INTEGER[] NOT NULL,
+        generation_seconds REAL,
+        hits INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+ANSWER_CACHE_INDEX_SQL = [
+    "CREATE INDEX IF NOT EXISTS answer_cache_embedding_idx ON answer_cache USING hnsw (embedding vector_cosine_ops)",
+    "CREATE INDEX IF NOT EXISTS answer_cache_chunk_ids_idx ON answer_cache USING gin (chunk_ids)",
+]
+
+# Section headers of a chunk as one string, for trigram identifier lookups
+HEADER_TEXT_SQL = """text GENERATED ALWAYS AS (
+    coalesce(metadata->>'Header 1', '') || ' ' ||
+    coalesce(metadata->>'Header 2', '') || ' ' ||
+    coalesce(metadata->>'Header 3', '')
+) STORED"""
@@ -0,0 +1,135 @@
+from typing import Any, Dict, List
+
+INDEX_NAME = "document_chunks_embedding_idx"
+
+# Operator and operator class per metric; all three rank normalized vectors identically
+METRICS = {
+    "l2": {"operator": "<->", "opclass": "vector_l2_ops"},
+    "cosine": {"operator": "<=>", "opclass": "vector_cosine_ops"},
+    # <#> is the negative inner product, so smaller still means closer
+    "ip": {"operator": "<#>", "opclass": "vector_ip_ops"},
+}
+
+# What the index is built on. The compact storages index an expression of the fp32
+# column, so writes are unchanged; their hits are re-ranked on the fp32 distance.
+STORAGES = {
+    "vector": {"expression": "embedding", "query": "%s::vector(1024)"},
+    # Half precision: half the index size, practically the same neighbours
+    "halfvec": {"expression": "(embedding::halfvec(1024))", "query": "%s::vector(1024)::halfvec(1024)"},
+    # One sign bit per dimension, compared by Hamming distance: 1/32 of the size
+    "binary": {"expression": "(binary_quantize(embedding)::bit(1024))",
+               "query": "binary_quantize(%s::vector(1024))::bit(1024)"},
+}
+
+def metric_spec(metric: str) -> Dict[str, str]:
+    if metric not in METRICS:
+        raise ValueError(f"Unknown vector metric: {metric} (expected one of {', '.join(METRICS)})")
+    return METRICS[metric]
+
+def storage_spec(metric: str, storage: str) -> Dict[str, str]:
+    """Indexed expression, query expression, operator and operator class of the coarse search"""
+    if storage not in STORAGES:
+        raise ValueError(f"Unknown vector storage: {storage} (expected one of {', '.join(STORAGES)})")
+    spec = dict(STORAGES[storage], **metric_spec(metric))
+    if storage == "halfvec":
+        spec["opclass"] = spec["opclass"].replace("vector_", "halfvec_")
+    elif storage == "binary":
+        spec.update(operator="<~>", opclass="bit_hamming_ops")
+    return spec
+
+def rerank_candidates(config: Dict[str, Any], limit: int) -> int:
+    """Rows fetched from a compact index for `limit` results (just `limit` for full vectors)"""
+    if config["storage"] == "vector":
+        return limit
+    return limit * config["rerank_factor"]
+
+def distance_threshold(metric: str, l2_distance: float) -> float:
+    """Convert an L2 distance threshold between unit vectors into the metric's own units.
+
+    Search thresholds are given as L2 distances, whatever the metric. For unit vectors,
+    cosine distance is l2^2 / 2 and the negative inner product is l2^2 / 2 - 1.
+    """
+    metric_spec(metric)
+    if metric == "l2":
+        return l2_distance
+    cosine_distance = l2_distance * l2_distance / 2
+    return cosine_distance if metric == "cosine" else cosine_distance - 1
+
+def nearest_chunks_sql(metric: str, storage: str = "vector") -> str:
+    """Subquery of (id, distance) for the chunks nearest to a query vector.
+
+    Parameters come from nearest_chunks_params. The distance is computed once;
+    ORDER BY ... LIMIT runs on the vector index and the threshold only filters the
+    candidates that come back. With a compact storage the index returns a larger
+    candidate set, which is re-ranked on the full-precision distance first.
+    """
+    operator = metric_spec(metric)["operator"]
+    if storage != "vector":
+        coarse = storage_spec(metric, storage)
+        return f"""
+        SELECT id, distance
+        FROM (
+            SELECT id, embedding {operator} %s::vector(1024) AS distance
+            FROM (
+                SELECT id, embedding
+                FROM document_chunks
+                ORDER BY {coarse["expression"]} {coarse["operator"]} {coarse["query"]}
+                LIMIT %s
+            ) candidates
+            ORDER BY distance
+            LIMIT %s
+        ) nearest
+        WHERE distance < %s
+    """
+    return f"""
+        SELECT id, distance
+        FROM (
+            SELECT id, embedding {operator} %s::vector(1024) AS distance
+            FROM document_chunks
+            ORDER BY distance
+            LIMIT %s
+        ) nearest
+        WHERE distance < %s
+    """
+
+def nearest_chunks_params(config: Dict[str, Any], query_embedding: List[float], limit: int,
+                          min_distance: float) -> tuple:
+    """Parameters of nearest_chunks_sql; `min_distance` is an L2 threshold, as in search()"""
+    threshold = distance_threshold(config["metric"], min_distance)
+    if config["storage"] == "vector":
+        return (query_embedding, limit, threshold)
+    return (query_embedding, query_embedding, rerank_candidates(config, limit), limit, threshold)
+
+def create_index_sql(config: Dict[str, Any], name: str = INDEX_NAME) -> str:
+    """CREATE INDEX statement for the embedding column under VECTOR_INDEX_CONFIG"""
+    spec = storage_spec(config["metric"], config["storage"])
+    if config["index_type"] == "hnsw":
+        options = f"m = {config['hnsw_m']}, ef_construction = {config['hnsw_ef_construction']}"
+    elif config["index_type"] == "ivfflat":
+        options = f"lists = {config['ivfflat_lists']}"
+    else:
+        raise ValueError(f"Unknown vector index type: {config['index_type']}")
+    return (f"CREATE INDEX IF NOT EXISTS {name} ON document_chunks "
+            f"USING {config['index_type']} ({spec['expression']} {spec['opclass']}) WITH ({options})")
+
+def search_settings(config: Dict[str, Any], limit: int = 0) -> Dict[str, Any]:
+    """Per-query index settings (candidate list size) for set_config"""
+    if config["index_type"] == "hnsw":
+        # An HNSW scan returns at most ef_search rows
+        return {"hnsw.ef_search": max(config["hnsw_ef_search"], rerank_candidates(config, limit))}
+    return {"ivfflat.probes": config["ivfflat_probes"]}
+
+def ensure_index(cur, config: Dict[str, Any]) -> bool:
+    """Create the embedding index, replacing one built for another metric, storage or index type.
+
+    Returns True if the index was (re)built.
+    """
+    cur.execute("SELECT indexdef FROM pg_indexes WHERE indexname = %s", (INDEX_NAME,))
+    row = cur.fetchone()
+    opclass = storage_spec(config["metric"], config["storage"])["opclass"]
+    if row and opclass in row[0] and f"USING {config['index_type']}" in row[0]:
+        return False
+    if row:
+        cur.execute(f"DROP INDEX {INDEX_NAME}")
+    cur.execute(create_index_sql(config))
+    return True
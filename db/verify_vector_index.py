@@ -0,0 +1,100 @@
+"""Check that semantic search actually runs on the vector index.
+
+    python -m db.verify_vector_index
+    python -m db.verify_vector_index --rebuild
+
+Runs EXPLAIN on the exact nearest-chunks query DocumentProcessor.search issues for
+the configured VECTOR_METRIC and VECTOR_STORAGE and exits with status 1 if the plan does not scan
+document_chunks_embedding_idx, or if that index was built for another metric.
+--rebuild drops and recreates the index first (for ivfflat, with lists sized
+to the current row count).
+"""
+import argparse
+import json
+import random
+import sys
+import psycopg2
+from config import DB_CONFIG, VECTOR_INDEX_CONFIG
+from db.vector_index import (INDEX_NAME, ensure_index, storage_spec, nearest_chunks_sql, nearest_chunks_params,
+                             search_settings)
+
+def plan_index_names(plan):
+    """Every index name scanned anywhere in an EXPLAIN (FORMAT JSON) plan"""
+    names = []
+    if "Index Name" in plan:
+        names.append(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names.extend(plan_index_names(child))
+    return names
+
+def random_unit_vector(dimensions=1024):
+    vector = [random.gauss(0, 1) for _ in range(dimensions)]
+    norm = sum(x * x for x in vector) ** 0.5
+    return [x / norm for x in vector]
+
+def verify(conn, config, limit=5):
+    """Return a list of problems (empty when the index is used)"""
+    problems = []
+    with conn.cursor() as cur:
+        cur.execute("SELECT indexdef FROM pg_indexes WHERE indexname = %s", (INDEX_NAME,))
+        row = cur.fetchone()
+        if row is None:
+            return [f"{INDEX_NAME} does not exist"]
+        print(f"Index: {row[0]}")
+        opclass = storage_spec(config["metric"], config["storage"])["opclass"]
+        if opclass not in row[0]:
+            problems.append(f"{INDEX_NAME} is not built with {opclass} "
+                            f"(VECTOR_METRIC={config['metric']}, VECTOR_STORAGE={config['storage']})")
+
+        for name, value in search_settings(config, limit).items():
+            cur.execute("SELECT set_config(%s, %s, true)", (name, str(value)))
+        cur.execute("EXPLAIN (FORMAT JSON) " + nearest_chunks_sql(config["metric"], config["storage"]),
+                    nearest_chunks_params(config, random_unit_vector(), limit, 1.5))
+        plan = cur.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        plan = plan[0]["Plan"]
+        cur.execute("SELECT count(*) FROM document_chunks")
+        rows = cur.fetchone()[0]
+    conn.rollback()
+
+    used = plan_index_names(plan)
+    print(f"Rows: {rows}; indexes in plan: {', '.join(used) or 'none'}")
+    if INDEX_NAME not in used:
+        problems.append("The nearest-chunks query does not use the vector index (full scan)")
+        if rows < 1000:
+            problems.append(f"Only {rows} rows: the planner may prefer a sequential scan on a table this small")
+    return problems
+
+def rebuild(conn, config):
+    config = dict(config)
+    with conn.cursor() as cur:
+        if config["index_type"] == "ivfflat":
+            cur.execute("SELECT count(*) FROM document_chunks")
+            config["ivfflat_lists"] = max(10, cur.fetchone()[0] // 1000)
+        cur.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+        ensure_index(cur, config)
+        cur.execute("ANALYZE document_chunks")
+    conn.commit()
+    print(f"Rebuilt {INDEX_NAME} ({config['index_type']}, {config['metric']}, {config['storage']})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rebuild", action="store_true", help="Drop and recreate the vector index first")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        if args.rebuild:
+            rebuild(conn, VECTOR_INDEX_CONFIG)
+        problems = verify(conn, VECTOR_INDEX_CONFIG)
+    finally:
+        conn.close()
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if problems:
+        sys.exit(1)
+    print("OK: semantic search uses the vector index")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Ingest a directory or a tar/zip archive of .md/.html page snapshots.
+
+    python ingest_snapshot.py snapshots/2026-10-01.tar.gz --base-url https://developer-docs.amazon.com/sp-api/docs
+
+Pages go through the same chunking, embedding and incremental write path as the
+live scraper: parsing and chunking run in a process pool, embeddings are
+computed in batches across documents, and progress is reported as it goes.
+"""
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from multiprocessing import Pool
+import argparse
+import os
+import tarfile
+import time
+import zipfile
+from processor.document_processor import DocumentProcessor
+from scraper.scraper import extract_markdown
+from config import DB_CONFIG, INGEST_CONFIG
+
+SNAPSHOT_EXTENSIONS = ('.md', '.markdown', '.html', '.htm')
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+def _decode(name: str, read: Callable[[], bytes], skipped: Optional[List[Tuple[str, str]]]) -> Optional[str]:
+    """UTF-8 text of one snapshot file, or None (recorded in `skipped`) if it cannot be read"""
+    try:
+        return read().decode('utf-8')
+    except (OSError, UnicodeDecodeError, zipfile.BadZipFile, tarfile.TarError) as e:
+        print(f"Skipping {name}: {str(e)}")
+        if skipped is not None:
+            skipped.append((name, str(e)))
+        return None
+
+def iter_snapshot(path: str, skipped: List[Tuple[str, str]] = None) -> Iterator[Tuple[str, str]]:
+    """Yield (relative path, text) for every page in a directory, tar or zip archive.
+
+    Files that cannot be read or are not valid UTF-8 are left out and appended to
+    `skipped` as (relative path, error).
+    """
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.lower().endswith(SNAPSHOT_EXTENSIONS):
+                    full_path = os.path.join(root, name)
+                    relative_path = os.path.relpath(full_path, path)
+                    text = _decode(relative_path, lambda: _read_file(full_path), skipped)
+                    if text is not None:
+                        yield relative_path, text
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in sorted(archive.namelist()):
+                if name.lower().endswith(SNAPSHOT_EXTENSIONS):
+                    text = _decode(name, lambda: archive.read(name), skipped)
+                    if text is not None:
+                        yield name, text
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path) as archive:
+            for member in archive:
+                if member.isfile() and member.name.lower().endswith(SNAPSHOT_EXTENSIONS):
+                    text = _decode(member.name, lambda: archive.extractfile(member).read(), skipped)
+                    if text is not None:
+                        yield member.name, text
+    else:
+        raise ValueError(f"{path} is not a directory, zip or tar archive")
+
+def source_for(relative_path: str, base_url: Optional[str]) -> str:
+    """Source URL stored for a snapshot file"""
+    if not base_url:
+        return relative_path
+    slug = os.path.splitext(relative_path)[0].replace(os.sep, '/')
+    return base_url.rstrip('/') + '/' + slug
+
+def chunk_snapshot_page(task: Tuple[str, str, Optional[str], bool]) -> Dict[str, Any]:
+    """Worker: convert a page to markdown and build its chunk plan unless it is unchanged"""
+    source, text, stored_hash, is_html = task
+    try:
+        content = extract_markdown(text) if is_html else text
+    except Exception as e:
+        print(f"Error converting {source}: {str(e)}")
+        return {'url': source, 'nodes': None, 'status': 'failed'}
+    if not content:
+        return {'url': source, 'nodes': None, 'status': 'empty'}
+    content_hash = DocumentProcessor._content_hash(content)
+    if content_hash == stored_hash:
+        return {'url': source, 'nodes': None, 'status': 'unchanged'}
+    return {
+        'url': source,
+        'content_hash': content_hash,
+        'nodes': DocumentProcessor._build_chunk_plan(content),
+        'status': 'chunked'
+    }
+
+def ingest_snapshot(processor: DocumentProcessor, path: str, base_url: str = None, workers: int = None,
+                    batch_size: int = 16, force: bool = False) -> Dict[str, Any]:
+    """Ingest every page of a snapshot and return counters (unreadable files are listed under 'skipped')"""
+    skipped = []
+    pages = list(iter_snapshot(path, skipped))
+    stored = {} if force else processor._stored_hashes()
+    tasks = []
+    for relative_path, text in pages:
+        source = source_for(relative_path, base_url)
+        tasks.append((source, text, stored.get(source), relative_path.lower().endswith(('.html', '.htm'))))
+    print(f"Found {len(tasks)} pages in {path}")
+
+    counts = {'pages': len(tasks), 'written': 0, 'unchanged': 0, 'empty': 0, 'failed': 0, 'chunks': 0}
+    started = time.perf_counter()
+    batch = []
+
+    def flush():
+        # One embedding pass for the whole batch, then one transaction per page
+        processor._embed_plan([node for item in batch for node in item['nodes']])
+        for item in batch:
+            try:
+                processor._store_document(item['url'], item['content_hash'], item['nodes'])
+                counts['written'] += 1
+                counts['chunks'] += len(item['nodes'])
+            except Exception as e:
+                print(f"Error storing {item['url']}: {str(e)}")
+                counts['failed'] += 1
+        batch.clear()
+        done = counts['written'] + counts['unchanged'] + counts['empty'] + counts['failed']
+        elapsed = time.perf_counter() - started
+        print(f"{done}/{counts['pages']} pages, {done / elapsed:.1f} pages/s, "
+              f"{counts['chunks'] / elapsed:.1f} chunks/s")
+
+    with Pool(processes=workers) as pool:
+        for item in pool.imap_unordered(chunk_snapshot_page, tasks, chunksize=4):
+            if item['status'] != 'chunked':
+                counts[item['status']] += 1
+                continue
+            batch.append(item)
+            if len(batch) >= batch_size:
+                flush()
+    if batch:
+        flush()
+
+    counts['seconds'] = time.perf_counter() - started
+    counts['skipped'] = skipped
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="Directory, .zip or .tar(.gz) of .md/.html files")
+    parser.add_argument("--base-url", help="Store pages as <base-url>/<relative path without extension>")
+    parser.add_argument("--workers", type=int, default=None, help="Parsing processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=16, help="Pages embedded together")
+    parser.add_argument("--force", action="store_true", help="Rewrite pages even if unchanged")
+    args = parser.parse_args()
+
+    processor = DocumentProcessor(DB_CONFIG)
+    try:
+        counts = ingest_snapshot(processor, args.path, base_url=args.base_url, workers=args.workers,
+                                 batch_size=args.batch_size, force=args.force)
+    finally:
+        processor.close()
+    print(f"\nIngested {counts['written']} pages ({counts['chunks']} chunks) in {counts['seconds']:.1f}s; "
+          f"{counts['unchanged']} unchanged, {counts['empty']} empty, {counts['failed']} failed "
+          f"(embedding batch size {INGEST_CONFIG['embedding_batch_size']})")
+    if counts['skipped']:
+        print(f"Skipped {len(counts['skipped'])} unreadable files:")
+        for name, error in counts['skipped']:
+            print(f"  {name}: {error}")
+
+if __name__ == "__main__":
+    main()
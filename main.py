@@ -1,11 +1,26 @@
 from processor.document_processor import DocumentProcessor
 from db.init_db import init_database
-from config import DB_CONFIG
-from scraper.scraper import get_side_bar_links, scrape_page
+from processor.ingest_journal import IngestJournal
+from config import DB_CONFIG, JOURNAL_CONFIG
+from scraper.discovery import get_doc_urls
+from scraper.fetcher import fetch_pages
+import argparse
 import logging
 import time
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape and ingest the Amazon API documentation")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the previous run from the ingestion journal instead of starting over")
+    parser.add_argument("--from-cache", action="store_true",
+                        help="Re-chunk and re-embed pages from the local page cache without fetching")
+    parser.add_argument("--reextract", action="store_true",
+                        help="With --from-cache, re-run markdown extraction on the cached HTML")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    
     # Initialize logging
     logging.basicConfig(level=logging.DEBUG)
     logger = logging.getLogger(__name__)
@@ -25,44 +40,59 @@ def main():
     # Initialize processor
     print("Initializing document processor...")
     processor = DocumentProcessor(db_config)
+    journal = IngestJournal(JOURNAL_CONFIG["path"], JOURNAL_CONFIG["max_attempts"])
     
     try:
+        if args.from_cache:
+            processor.reprocess_from_cache(reextract=args.reextract)
+            return
+        
         # Get URLs
-        urls = get_side_bar_links()
+        urls = get_doc_urls()
         logger.info(f"Found {len(urls)} URLs to process")
         
-        for url in urls:
-            try:
-                logger.info(f"Processing URL: {url}")
-                
-                # Scrape content
-                content = scrape_page(url)
-                if not content:
-                    logger.warning(f"No content found for {url}")
+        pending = journal.start(urls, resume=args.resume)
+        logger.info(f"{len(pending)} URLs left to process")
+        # Each pass retries what failed in the previous one until attempts run out
+        while pending:
+            # Pages are fetched concurrently under the per-host rate limit and processed as they arrive
+            for url, content in fetch_pages(pending, fetch=processor._scrape):
+                try:
+                    logger.info(f"Processing URL: {url}")
+                    
+                    if not content:
+                        logger.warning(f"No content found for {url}")
+                        journal.mark_failed(url, "No content found")
+                        continue
+                    journal.mark_fetched(url)
+                    
+                    logger.debug(f"Content length: {len(content)}")
+                    
+                    # Process document, skipping it if unchanged since the last run
+                    if processor.ingest_document(
+                        content=content,
+                        metadata={
+                            'source': url,
+                            'type': 'api_documentation',
+                            'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
+                        }
+                    ):
+                        logger.info(f"Successfully processed {url}")
+                    else:
+                        logger.info(f"Unchanged, skipped {url}")
+                    journal.mark_processed(url)
+                    
+                except Exception as e:
+                    logger.error(f"Error processing {url}: {str(e)}", exc_info=True)
+                    journal.mark_failed(url, str(e))
                     continue
-                
-                logger.debug(f"Content length: {len(content)}")
-                
-                # Process document
-                processor.process_document(
-                    content=content,
-                    metadata={
-                        'source': url,
-                        'type': 'api_documentation',
-                        'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
-                    }
-                )
-                
-                logger.info(f"Successfully processed {url}")
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Error processing {url}: {str(e)}", exc_info=True)
-                continue
+            pending = journal.remaining()
+        logger.info(f"Ingestion journal: {journal.summary()}")
                 
     except Exception as e:
         logger.error(f"Main process error: {str(e)}", exc_info=True)
     finally:
+        journal.close()
         processor.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+from typing import Any, Dict, List, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+def invalidate_document(cur, document_id: int) -> None:
+    """Drop cached answers built from any chunk of a document about to be replaced"""
+    cur.execute("""
+        DELETE FROM answer_cache
+        WHERE chunk_ids && ARRAY(SELECT id FROM document_chunks WHERE document_id = %s)
+    """, (document_id,))
+
+class AnswerCache:
+    """Generated answers kept in Postgres and looked up by query embedding similarity.
+
+    A question whose embedding has cosine similarity of at least `similarity_threshold`
+    with an earlier one (same search mode, result limit and distance threshold, younger
+    than `ttl_hours`)
+    gets the earlier answer without retrieval or a completion call. Entries record the
+    chunks they were built from and are deleted when any of them is re-ingested.
+    Cache failures are logged and treated as misses.
+    """
+
+    def __init__(self, processor, similarity_threshold: float = 0.95, ttl_hours: float = 168):
+        self.processor = processor
+        self.similarity_threshold = similarity_threshold
+        self.ttl_hours = ttl_hours
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def lookup(self, query_embedding: List[float], search_mode: str, limit: int,
+               min_distance: float) -> Optional[str]:
+        """Cached answer for a near-identical earlier question, or None"""
+        started = time.perf_counter()
+        conn = None
+        row = None
+        try:
+            conn = self.processor.conn
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT id, answer, generation_seconds, 1 - (embedding <=> %s::vector(1024)) AS similarity
+                    FROM answer_cache
+                    WHERE search_mode = %s
+                      AND result_limit = %s
+                      AND min_distance = %s
+                      AND created_at > now() - make_interval(hours => %s)
+                    ORDER BY embedding <=> %s::vector(1024)
+                    LIMIT 1
+                """, (query_embedding, search_mode, limit, min_distance, self.ttl_hours, query_embedding))
+                row = cur.fetchone()
+                if row is not None and row[3] >= self.similarity_threshold:
+                    cur.execute("UPDATE answer_cache SET hits = hits + 1 WHERE id = %s", (row[0],))
+                    conn.commit()
+                else:
+                    row = None
+        except Exception as e:
+            logger.error(f"Answer cache lookup failed: {str(e)}")
+            self._rollback(conn)
+            row = None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_seconds += max(0.0, (row[2] or 0.0) - (time.perf_counter() - started))
+        return row[1]
+
+    def store(self, query: str, query_embedding: List[float], search_mode: str, limit: int, min_distance: float,
+              answer: str, chunk_ids: List[int], generation_seconds: float) -> None:
+        """Remember an answer and the chunks it was generated from"""
+        conn = None
+        try:
+            conn = self.processor.conn
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO answer_cache
+                        (query, embedding, search_mode, result_limit, min_distance, answer, chunk_ids,
+                         generation_seconds)
+                    VALUES (%s, %s::vector(1024), %s, %s, %s, %s, %s, %s)
+                """, (query, query_embedding, search_mode, limit, min_distance, answer, chunk_ids,
+                      generation_seconds))
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Answer cache store failed: {str(e)}")
+            self._rollback(conn)
+
+    @staticmethod
+    def _rollback(conn) -> None:
+        """Roll back after a failed cache query; a connection that never opened or has dropped is left alone"""
+        if conn is None:
+            return
+        try:
+            conn.rollback()
+        except Exception as e:
+            logger.error(f"Answer cache rollback failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and the generation time saved by hits"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_seconds": self.saved_seconds,
+            }
@@ -1,18 +1,35 @@
 from typing import List, Dict, Any, Optional
 import json
 import re
-from langchain.text_splitter import MarkdownHeaderTextSplitter
-from langchain_community.embeddings import HuggingFaceEmbeddings
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import psycopg2
 from psycopg2.extras import Json
-from scraper.scraper import get_side_bar_links, scrape_page
-import time
+from psycopg2.pool import ThreadedConnectionPool
+from scraper.page_cache import PageCache
 import logging
-from config import TEXT_SPLITTER_CONFIG
+from config import (INGEST_CONFIG, EMBEDDING_CACHE_CONFIG, PAGE_CACHE_CONFIG, JOURNAL_CONFIG,
+                    IDENTIFIER_SEARCH_CONFIG, HYBRID_CONFIG, VECTOR_INDEX_CONFIG, RESULT_CACHE_CONFIG,
+                    RETRIEVAL_CONFIG)
+from db.bulk_writer import BulkChunkWriter
+from db.schema import (KEYWORD_TSQUERY_SQL, TEXT_SEARCH_CONFIG_SQL, CONTENT_TSV_SQL, HEADER_TEXT_SQL,
+                       ANSWER_CACHE_TABLE_SQL, ANSWER_CACHE_INDEX_SQL, CORPUS_STATE_SQL)
+from db.vector_index import (create_index_sql, distance_threshold, nearest_chunks_sql, nearest_chunks_params,
+                             search_settings)
+from processor.embedding_backends import backend_variant
+from processor.embedding_cache import EmbeddingCache
+from processor.embedding_service import get_embedding_service
+from processor.answer_cache import invalidate_document
+from processor.retrieval_cache import RetrievalCache, BUMP_GENERATION_SQL
+from processor.ranking import reciprocal_rank_fusion
 import os
 
 class DocumentProcessor:
-    def __init__(self, db_config: Dict[str, str] = None, embedding_model: str = "BAAI/bge-large-en-v1.5"):
+    def __init__(self, db_config: Dict[str, str] = None, embedding_model: str = "BAAI/bge-large-en-v1.5",
+                 embedding_batch_size: int = None, write_mode: str = None):
         """Initialize the document processor with database and embedding configurations"""
         # Configure logging to only show our custom logs
         logging.basicConfig(
@@ -36,9 +53,110 @@ class DocumentProcessor:
         self.logger.setLevel(logging.DEBUG)  # Keep our logs at DEBUG level
         
         self.db_config = db_config
-        self.embeddings = HuggingFaceEmbeddings(model_name=embedding_model)
-        self.conn = self._create_db_connection()
+        # Shared with every other processor/handler in this process and loaded on first use
+        self.embeddings = get_embedding_service(embedding_model)
+        self.embedding_batch_size = embedding_batch_size or INGEST_CONFIG["embedding_batch_size"]
+        # Chunk embeddings survive restarts so unchanged text is never re-embedded
+        self.embedding_cache = None
+        if EMBEDDING_CACHE_CONFIG["path"]:
+            self.embedding_cache = EmbeddingCache(
+                EMBEDDING_CACHE_CONFIG["path"],
+                model_name=embedding_model,
+                backend=backend_variant(self.embeddings.backend_name),
+                max_entries=EMBEDDING_CACHE_CONFIG["max_entries"]
+            )
+        # Raw pages are kept on disk so chunking changes can be replayed offline
+        self.page_cache = PageCache(PAGE_CACHE_CONFIG["dir"]) if PAGE_CACHE_CONFIG["dir"] else None
+        # The connection is opened on first use (or by warm_up) so construction stays cheap
+        self._conn = None
+        self._conn_lock = threading.Lock()
+        # Hybrid search runs its branches concurrently on pooled connections; getconn
+        # raises instead of waiting when the pool is exhausted, so borrowers queue here
+        self._pool = None
+        self._pool_slots = threading.BoundedSemaphore(HYBRID_CONFIG["pool_size"])
+        # Search results are reused until the corpus generation changes
+        self.result_cache = None
+        self._generation_warned = False
+        if RESULT_CACHE_CONFIG["max_entries"]:
+            self.result_cache = RetrievalCache(
+                self._corpus_generation,
+                max_entries=RESULT_CACHE_CONFIG["max_entries"],
+                check_interval_seconds=RESULT_CACHE_CONFIG["check_interval_seconds"]
+            )
+        self._search_executor = ThreadPoolExecutor(max_workers=HYBRID_CONFIG["pool_size"], thread_name_prefix="search")
+        # With RETRIEVAL_BACKEND=snapshot, nearest-neighbour lookups run in-process on a file snapshot
+        self._snapshot = None
+        # 'row' inserts one chunk at a time, 'bulk' writes each batch with multi-row statements
+        self.write_mode = write_mode or INGEST_CONFIG["write_mode"]
         
+    @property
+    def conn(self):
+        """Database connection, opened on first access"""
+        if self._conn is None:
+            with self._conn_lock:
+                if self._conn is None:
+                    self._conn = self._create_db_connection()
+        return self._conn
+
+    @property
+    def pool(self) -> ThreadedConnectionPool:
+        """Connection pool for concurrent search branches, opened on first access"""
+        if self._pool is None:
+            with self._conn_lock:
+                if self._pool is None:
+                    self._pool = ThreadedConnectionPool(1, HYBRID_CONFIG["pool_size"], **self.db_config)
+        return self._pool
+
+    @contextmanager
+    def _pooled_cursor(self):
+        """Cursor on a pooled connection, waiting for a free one (any open transaction is rolled back on return)"""
+        with self._pool_slots:
+            conn = self.pool.getconn()
+            try:
+                with conn.cursor() as cur:
+                    yield cur
+            finally:
+                self.pool.putconn(conn)
+
+    @property
+    def snapshot(self):
+        """Memory-mapped vector snapshot when RETRIEVAL_BACKEND=snapshot, loaded on first access; else None"""
+        if self._snapshot is None and RETRIEVAL_CONFIG["backend"] == "snapshot":
+            with self._conn_lock:
+                if self._snapshot is None:
+                    from processor.vector_snapshot import VectorSnapshot
+                    self._snapshot = VectorSnapshot(
+                        RETRIEVAL_CONFIG["snapshot_dir"],
+                        backend=RETRIEVAL_CONFIG["snapshot_search"],
+                        faiss_nlist=RETRIEVAL_CONFIG["faiss_nlist"],
+                        faiss_nprobe=RETRIEVAL_CONFIG["faiss_nprobe"]
+                    )
+                    self.logger.info(f"Loaded vector snapshot of {self._snapshot.count} chunks "
+                                     f"(generation {self._snapshot.generation})")
+        return self._snapshot
+
+    @property
+    def bulk_writer(self) -> BulkChunkWriter:
+        return BulkChunkWriter(self.conn)
+
+    def warm_up(self) -> Dict[str, float]:
+        """Load the embedding model and open the database connection ahead of the first query.
+
+        Safe to call from a background thread. Returns the seconds spent per phase.
+        """
+        timings = {}
+        started = time.perf_counter()
+        self.embeddings.load()
+        timings["model load"] = time.perf_counter() - started
+        if RETRIEVAL_CONFIG["backend"] == "snapshot":
+            started = time.perf_counter()
+            self.snapshot
+            timings["snapshot load"] = time.perf_counter() - started
+        started = time.perf_counter()
+        self.conn
+        timings["db connect"] = time.perf_counter() - started
+        return timings
+
     def _create_db_connection(self):
         """Create database connection"""
         try:
@@ -47,45 +165,118 @@ class DocumentProcessor:
             self.logger.error(f"Failed to connect to database: {str(e)}")
             raise
 
-    def scrape_and_process_docs(self,limit):
-        """Scrape documentation and process all pages"""
+    def scrape_and_process_docs(self, limit, resume: bool = False):
+        """Scrape documentation and process all pages.
+
+        Progress is recorded per URL in the ingestion journal; with `resume` the run
+        continues where the previous one stopped instead of starting over.
+        """
+        from scraper.discovery import get_doc_urls
+        from scraper.fetcher import fetch_pages
+        from processor.ingest_journal import IngestJournal
+
         # Get all documentation URLs
-        urls = get_side_bar_links()
+        urls = get_doc_urls()
         if not urls:
             print("No URLs found to scrape")
             return
         
         print(f"Found {len(urls)} URLs to process")
-        count = 0
-        # Process each URL
-        for url in urls:
-            if count > limit:
-                break
-            count += 1
-            try:
-                # Scrape the page
-                content = scrape_page(url)
-                if not content:
-                    print(f"No content found for {url}")
-                    continue
-                
-                # Process the document
-                self.process_document(
-                    content=content,
-                    metadata={
-                        'source': url
-                    }
-                )
-                print(f"Successfully processed {url}")
-                
-                # Rate limiting
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"Error processing {url}: {str(e)}")
+        journal = IngestJournal(JOURNAL_CONFIG["path"], JOURNAL_CONFIG["max_attempts"])
+        try:
+            # (limit + 1 keeps the page count of the old `count > limit` loop)
+            pending = journal.start(urls[:limit + 1], resume=resume)
+            # Each pass retries what failed in the previous one until attempts run out
+            while pending:
+                # Pages are fetched concurrently under the per-host rate limit and processed as they arrive
+                for url, content in fetch_pages(pending, fetch=self._scrape):
+                    try:
+                        if not content:
+                            print(f"No content found for {url}")
+                            journal.mark_failed(url, "No content found")
+                            continue
+                        journal.mark_fetched(url)
+                        
+                        # Process the document, skipping it if unchanged since the last run
+                        if self.ingest_document(
+                            content=content,
+                            metadata={
+                                'source': url
+                            }
+                        ):
+                            print(f"Successfully processed {url}")
+                        else:
+                            print(f"Unchanged, skipped {url}")
+                        journal.mark_processed(url)
+                        
+                    except Exception as e:
+                        print(f"Error processing {url}: {str(e)}")
+                        journal.mark_failed(url, str(e))
+                        continue
+                pending = journal.remaining()
+            print(f"Ingestion journal: {journal.summary()}")
+        finally:
+            journal.close()
+
+    def _scrape(self, url: str) -> Optional[str]:
+        """Scrape a page, keeping a copy in the page cache"""
+        from scraper.scraper import scrape_page
+        return scrape_page(url, cache=self.page_cache)
+
+    def reprocess_from_cache(self, urls: List[str] = None, reextract: bool = False,
+                             batch_size: int = 16) -> Dict[str, Any]:
+        """Re-chunk and re-embed cached pages without touching the network.
+
+        Uses the cached markdown, or re-runs extraction on the cached HTML when
+        `reextract` is set. Pages are always rewritten since the point is to pick
+        up processing changes. Returns the page cache hit/miss statistics of the
+        URL lookups plus the number of cached entries read.
+        """
+        if self.page_cache is None:
+            raise ValueError("Page cache is disabled; set PAGE_CACHE_DIR")
+        from scraper.scraper import extract_markdown, extract_markdown_bs
+        if urls is None:
+            entries = self.page_cache.entries()
+        else:
+            entries = (self.page_cache.get(url) for url in urls)
+        
+        processed = 0
+        read = 0
+        batch = []
+        for entry in entries:
+            if entry is None:
+                continue
+            read += 1
+            content = entry['markdown']
+            if reextract:
+                if entry['extractor'] == "beautifulsoup":
+                    content = extract_markdown_bs(entry['html'])
+                else:
+                    content = extract_markdown(entry['html'])
+            if not content:
+                print(f"No content extracted from cached {entry['url']}")
                 continue
+            batch.append({'content': content, 'metadata': {'source': entry['url']}})
+            if len(batch) >= batch_size:
+                self.ingest_documents(batch, force=True)
+                processed += len(batch)
+                batch = []
+        if batch:
+            self.ingest_documents(batch, force=True)
+            processed += len(batch)
+        
+        stats = self.page_cache.stats()
+        stats["entries"] = read
+        stats["processed"] = processed
+        if urls is None:
+            print(f"Reprocessed {processed} of {read} cached pages")
+        else:
+            print(f"Reprocessed {processed} of {len(urls)} pages from cache "
+                  f"({stats['hits']} hits, {stats['misses']} misses, hit rate {stats['hit_rate']:.0%})")
+        return stats
 
-    def _extract_json_blocks(self, text: str) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _extract_json_blocks(text: str) -> List[Dict[str, Any]]:
         """Extract JSON blocks from markdown text"""
         json_blocks = []
         json_pattern = r"```\n([\s\S]*?)\n```"
@@ -103,7 +294,8 @@ class DocumentProcessor:
                 
         return json_blocks
     
-    def _extract_tables(self, text: str) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _extract_tables(text: str) -> List[Dict[str, Any]]:
         """Extract markdown tables from text"""
         tables = []
         
@@ -112,14 +304,14 @@ class DocumentProcessor:
         
         for match in re.finditer(table_pattern, text):
             table_text = match.group(0)
-            # Call process_table as instance method
-            table = self._process_table(table_text)
+            table = DocumentProcessor._process_table(table_text)
             if table:
                 tables.append(table)
         
         return sorted(tables, key=lambda x: x['position'])
 
-    def _process_table(self, table_text: str) -> Dict[str, Any]:
+    @staticmethod
+    def _process_table(table_text: str) -> Dict[str, Any]:
         """Process a table and return structured data"""
         lines = [line for line in table_text.strip().split('\n') if line.strip()]
         
@@ -167,295 +359,607 @@ class DocumentProcessor:
             }
         return None
 
-    def process_document(self, content: str, metadata: Dict[str, Any]) -> None:
-        """Process a document and store it in the database"""
-        try:
-            self.logger.debug(f"Processing document from: {metadata.get('source', 'unknown')}")
-            self.logger.debug(f"Content length: {len(content)}")
-            # # First find and store all matches
-            pattern = r"(`\S+`)\s*(\S+)\s*\1\s*\2"
-            matches = list(re.finditer(pattern, content))
+    # A backtick name followed by a word, repeated (e.g. "`marketplaceId` string `marketplaceId` string")
+    _FIELD_PATTERN = re.compile(r"(`\S+`)\s*(\S+)\s*\1\s*\2")
+
+    @staticmethod
+    def _normalize_content(content: str) -> str:
+        """Join split backtick/word pairs and mark them as H3 headers for the splitter.
+
+        Inside each match, backtick/word pairs separated by a blank line are joined
+        with a single space and the match is prefixed with "### ". Done as one
+        re.sub pass, so the cost is linear in the document size.
+        """
+        def rewrite(match):
+            backtick_part = match.group(1)
+            word_part = match.group(2)
+            # Replace \n\n between backtick and word with a single space
+            joined = match.group(0).replace(f"{backtick_part}\n\n{word_part}", f"{backtick_part} {word_part}")
+            return "### " + joined
+        
+        # Whitespace-only edits never change which spans the pattern matches, so one
+        # pass gives the same result as joining first and then inserting headers
+        return DocumentProcessor._FIELD_PATTERN.sub(rewrite, content)
+
+    @classmethod
+    def _build_chunk_plan(cls, content: str) -> List[Dict[str, Any]]:
+        """Split a document into chunks and resolve the header hierarchy.
+
+        Returns the rows to insert in insertion order. Each row carries the text to
+        embed and the index of its parent row (or None), so the embeddings can be
+        computed in batches before anything is written. Needs no model or database,
+        so it can run in worker processes.
+        """
+        from langchain.text_splitter import MarkdownHeaderTextSplitter
+
+        content = cls._normalize_content(content)
+        # Create chunks
+        splitter = MarkdownHeaderTextSplitter(
+            headers_to_split_on=[
+                ("#", "Header 1"),
+                ("##", "Header 2"),
+                ("###", "Header 3"),
+            ],
+            strip_headers=False
+        )
+        chunks = splitter.split_text(content)
+
+        nodes = []
+        # Track the current section headers and their row indexes
+        current_h1 = {'index': None, 'title': None}
+        current_h2 = {'index': None, 'title': None}
+        
+        for chunk in chunks:
+            # Determine header level and content from metadata
+            current_level = 0
+            h1_title = chunk.metadata.get("Header 1")
+            h2_title = chunk.metadata.get("Header 2")
+            h3_title = chunk.metadata.get("Header 3")
             
-            # First pass: Remove \n\n between first backtick and word
-            for match in matches:
-                full_match = match.group(0)
-                backtick_part = match.group(1)
-                word_part = match.group(2)
-                # Replace \n\n between backtick and word with a single space
-                new_first_part = re.sub(r'(`\S+`)\s*\n\n+(\S+)', r'\1 \2', f"{backtick_part}\n\n{word_part}")
-                content = content.replace(full_match, full_match.replace(f"{backtick_part}\n\n{word_part}", new_first_part))
+            if h3_title:
+                current_level = 3
+            elif h2_title:
+                current_level = 2
+            elif h1_title:
+                current_level = 1
             
-            # # Second pass: Add ### (existing logic)
-            matches = re.finditer(pattern, content)
-            offset = 0
-            for match in matches:
-                start = match.start() + offset
-                content = content[:start] + "### " + content[start:]
-                offset += 4  # Length of "### "
-            # Create chunks
-            splitter = MarkdownHeaderTextSplitter(
-                headers_to_split_on=[
-                    ("#", "Header 1"),
-                    ("##", "Header 2"),
-                    ("###", "Header 3"),
-                ],
-                strip_headers=False
-            )
-            chunks = splitter.split_text(content)
-
-            # Log chunks creation
-            # self.logger.debug(f"Created {len(chunks)} chunks")
-            # self.logger.debug("=== Chunk Details ===")
-            # for i, chunk in enumerate(chunks):
-            #     self.logger.debug(f"\nChunk {i+1}:")
-            #     self.logger.debug(f"Metadata: {chunk.metadata}")
-            #     self.logger.debug(f"Content starts with: {chunk.page_content[:200]}")
-            #     self.logger.debug(f"Content length: {len(chunk.page_content)}")
-            #     self.logger.debug("=" * 50)
+            # If we have an H3 with a new H2 section, create the H2 node first
+            if current_level == 3 and h2_title and (current_h2['title'] != h2_title):
+                nodes.append({
+                    'parent': current_h1['index'],  # Parent is current H1
+                    'content': f"## {h2_title}",  # Content is the header itself
+                    'embed_text': h2_title,
+                    'metadata': {
+                        "Header 1": h1_title,
+                        "Header 2": h2_title
+                    },
+                    'json_blocks': [],
+                    'tables': []
+                })
+                current_h2['index'] = len(nodes) - 1
+                current_h2['title'] = h2_title
             
-            with self.conn.cursor() as cur:
-                # Track the current section headers and their IDs
-                current_h1 = {'id': None, 'title': None}
-                current_h2 = {'id': None, 'title': None}
+            # Get parent based on header level
+            parent = None
+            
+            if current_level == 1:
+                # H1 headers have no parent
+                parent = None
+                # Update current H1 and reset H2
+                current_h1['title'] = h1_title
+                current_h2 = {'index': None, 'title': None}
+            elif current_level == 2:
+                # H2 headers are children of current H1
+                parent = current_h1['index']
+                # Update current H2
+                current_h2['title'] = h2_title
+            elif current_level == 3:
+                # H3 headers are children of current H2 if it exists
+                if current_h2['index'] is not None and h2_title == current_h2['title']:
+                    parent = current_h2['index']
+                else:
+                    parent = current_h1['index']
+            
+            # Extract JSON and tables first and add chunk metadata to them
+            json_blocks = [
+                {**block, 'metadata': chunk.metadata} 
+                for block in cls._extract_json_blocks(chunk.page_content)
+            ]
+            tables = [
+                {**block, 'metadata': chunk.metadata} 
+                for block in cls._extract_tables(chunk.page_content)
+            ]
+            
+            # Remove JSON and tables from text for chunking
+            clean_text = chunk.page_content
+            for block in json_blocks + tables:
+                clean_text = clean_text.replace(block['raw_text'], '[EXTRACTED_CONTENT]')
+            
+            # Blocks are only stored when they were actually cut out of the chunk
+            if '[EXTRACTED_CONTENT]' not in clean_text:
+                json_blocks, tables = [], []
+            
+            nodes.append({
+                'parent': parent,
+                'content': clean_text,
+                'embed_text': clean_text,
+                'metadata': chunk.metadata,
+                'json_blocks': json_blocks,
+                'tables': tables
+            })
+            
+            # Update the current section indexes
+            if current_level == 1:
+                current_h1['index'] = len(nodes) - 1
+            elif current_level == 2:
+                current_h2['index'] = len(nodes) - 1
+        
+        return nodes
+
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with embed_documents in length-sorted batches, returning vectors in input order"""
+        if self.embedding_cache:
+            vectors = self.embedding_cache.get_many(texts)
+        else:
+            vectors = [None] * len(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        
+        # Sorting by length keeps similarly sized texts together so batches pad less
+        order = sorted(missing, key=lambda i: len(texts[i]))
+        for start in range(0, len(order), self.embedding_batch_size):
+            batch = order[start:start + self.embedding_batch_size]
+            batch_texts = [texts[i] for i in batch]
+            batch_vectors = self.embeddings.embed_documents(batch_texts)
+            for i, vector in zip(batch, batch_vectors):
+                vectors[i] = vector
+            if self.embedding_cache:
+                self.embedding_cache.put_many(batch_texts, batch_vectors)
+        
+        self.logger.debug(f"Embedded {len(missing)} of {len(texts)} texts ({len(texts) - len(missing)} cached)")
+        return vectors
+
+    def _embed_plan(self, nodes: List[Dict[str, Any]]) -> None:
+        """Attach an embedding to every row of one or more chunk plans"""
+        vectors = self._embed_texts([node['embed_text'] for node in nodes])
+        for node, vector in zip(nodes, vectors):
+            node['embedding'] = vector
+
+    def _write_plan(self, nodes: List[Dict[str, Any]], document_id: int = None, conn=None) -> List[int]:
+        """Insert an embedded chunk plan row by row and return the new chunk IDs"""
+        ids = []
+        with (conn or self.conn).cursor() as cur:
+            for node in nodes:
+                parent_id = ids[node['parent']] if node['parent'] is not None else None
                 
-                for i, chunk in enumerate(chunks):
-                    # Determine header level and content from metadata
-                    current_level = 0
-                    h1_title = chunk.metadata.get("Header 1")
-                    h2_title = chunk.metadata.get("Header 2")
-                    h3_title = chunk.metadata.get("Header 3")
-                    
-                    if h3_title:
-                        current_level = 3
-                    elif h2_title:
-                        current_level = 2
-                    elif h1_title:
-                        current_level = 1
-                    
-                    # If we have an H3 with a new H2 section, create the H2 node first
-                    if current_level == 3 and h2_title and (current_h2['title'] != h2_title):
-                        # Create H2 node
-                        h2_metadata = {
-                            "Header 1": h1_title,
-                            "Header 2": h2_title
-                        }
-                        
-                        cur.execute("""
-                            INSERT INTO document_chunks (parent_id, content, embedding, metadata)
-                            VALUES (%s, %s, %s, %s)
-                            RETURNING id
-                        """, (
-                            current_h1['id'],  # Parent is current H1
-                            f"## {h2_title}",  # Content is the header itself
-                            self.embeddings.embed_query(h2_title),
-                            Json(h2_metadata)
-                        ))
-                        
-                        result = cur.fetchone()
-                        current_h2['id'] = result[0]
-                        current_h2['title'] = h2_title
-                    
-                    # Get parent_id based on header level
-                    parent_id = None
-                    
-                    if current_level == 1:
-                        # H1 headers have no parent
-                        parent_id = None
-                        # Update current H1 and reset H2
-                        current_h1['title'] = h1_title
-                        current_h2 = {'id': None, 'title': None}
-                    elif current_level == 2:
-                        # H2 headers are children of current H1
-                        parent_id = current_h1['id']
-                        # Update current H2
-                        current_h2['title'] = h2_title
-                    elif current_level == 3:
-                        # H3 headers are children of current H2 if it exists
-                        if current_h2['id'] is not None and h2_title == current_h2['title']:
-                            parent_id = current_h2['id']
-                        else:
-                            parent_id = current_h1['id']
-                    
-                    # Extract JSON and tables first and add chunk metadata to them
-                    json_blocks = [
-                        {**block, 'metadata': chunk.metadata} 
-                        for block in self._extract_json_blocks(chunk.page_content)
-                    ]
-                    tables = [
-                        {**block, 'metadata': chunk.metadata} 
-                        for block in self._extract_tables(chunk.page_content)
-                    ]
-                    
-                    # Remove JSON and tables from text for chunking
-                    clean_text = chunk.page_content
-                    for block in json_blocks + tables:
-                        clean_text = clean_text.replace(block['raw_text'], '[EXTRACTED_CONTENT]')
-                    
-                    # Generate embedding for the chunk
-                    embedding = self.embeddings.embed_query(clean_text)
-                    
-                    # Insert the chunk and get its ID
+                # Insert the chunk and get its ID
+                cur.execute("""
+                    INSERT INTO document_chunks (parent_id, document_id, content, embedding, metadata)
+                    VALUES (%s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (
+                    parent_id,
+                    document_id,
+                    node['content'],
+                    node['embedding'],
+                    Json(node['metadata'])
+                ))
+                
+                result = cur.fetchone()
+                chunk_id = result[0]
+                ids.append(chunk_id)
+                
+                # Store associated JSON blocks
+                for json_block in node['json_blocks']:
+                    cur.execute("""
+                        INSERT INTO json_blocks (chunk_id, json_content, metadata)
+                        VALUES (%s, %s, %s)
+                    """, (
+                        chunk_id, 
+                        Json(json_block['content']), 
+                        Json(json_block['metadata'])  # Use Json adapter for metadata
+                    ))
+
+                # Store associated tables
+                for table in node['tables']:
                     cur.execute("""
-                        INSERT INTO document_chunks (parent_id, content, embedding, metadata)
+                        INSERT INTO table_blocks (chunk_id, table_content, headers, metadata)
                         VALUES (%s, %s, %s, %s)
-                        RETURNING id
                     """, (
-                        parent_id,
-                        clean_text,
-                        embedding,
-                        Json(chunk.metadata)
+                        chunk_id,
+                        Json(table['content']),
+                        table['headers'],
+                        Json(table['metadata'])  # Use Json adapter for metadata
                     ))
-                    
-                    result = cur.fetchone()
-                    chunk_id = result[0]
-                    
-                    # Update the current section IDs
-                    if current_level == 1:
-                        current_h1['id'] = chunk_id
-                    elif current_level == 2:
-                        current_h2['id'] = chunk_id
-                    
-                    # Store associated JSON blocks
-                    for json_block in json_blocks:
-                        if '[EXTRACTED_CONTENT]' in clean_text:
-                            cur.execute("""
-                                INSERT INTO json_blocks (chunk_id, json_content, metadata)
-                                VALUES (%s, %s, %s)
-                            """, (
-                                chunk_id, 
-                                Json(json_block['content']), 
-                                Json(json_block['metadata'])  # Use Json adapter for metadata
-                            ))
-
-                    # Store associated tables
-                    for table in tables:
-                        if '[EXTRACTED_CONTENT]' in clean_text:
-                            cur.execute("""
-                                INSERT INTO table_blocks (chunk_id, table_content, headers, metadata)
-                                VALUES (%s, %s, %s, %s)
-                            """, (
-                                chunk_id,
-                                Json(table['content']),
-                                table['headers'],
-                                Json(table['metadata'])  # Use Json adapter for metadata
-                            ))
-                    self.conn.commit()
+        return ids
+
+    def process_document(self, content: str, metadata: Dict[str, Any]) -> None:
+        """Process a document and store it in the database"""
+        self.process_documents([{'content': content, 'metadata': metadata}])
+
+    def process_documents(self, documents: List[Dict[str, Any]]) -> None:
+        """Process several documents, embedding all of their chunks in shared batches.
 
+        Each document is a dict with 'content' and 'metadata' keys.
+        """
+        try:
+            plans = []
+            for document in documents:
+                self.logger.debug(f"Processing document from: {document['metadata'].get('source', 'unknown')}")
+                self.logger.debug(f"Content length: {len(document['content'])}")
+                nodes = self._build_chunk_plan(document['content'])
+                if document['metadata'].get('source'):
+                    self._tag_source(nodes, document['metadata']['source'])
+                plans.append(nodes)
+            
+            self._embed_plan([node for nodes in plans for node in nodes])
+            self.logger.debug(f"Embedded {sum(len(nodes) for nodes in plans)} chunks from {len(plans)} documents")
+            
+            self._write_plans(plans)
+            with self.conn.cursor() as cur:
+                cur.execute(BUMP_GENERATION_SQL)
             self.conn.commit()
         except Exception as e:
             self.logger.error(f"Error processing document: {str(e)}", exc_info=True)
             self.conn.rollback()  # Rollback on error
             raise
 
-    def search(self, query: str, limit: int = 3, min_distance: float = 0.70) -> List[Dict[str, Any]]:
-        """Search for relevant documents"""
-        query_embedding = self.embeddings.embed_query(query)
+    def _write_plans(self, plans: List[List[Dict[str, Any]]], document_ids: List[int] = None, conn=None) -> None:
+        """Write embedded chunk plans with the configured write mode, without committing"""
+        if document_ids is None:
+            document_ids = [None] * len(plans)
+        if self.write_mode == "bulk":
+            writer = self.bulk_writer if conn is None else BulkChunkWriter(conn)
+            writer.write_plans(plans, document_ids)
+        else:
+            for nodes, document_id in zip(plans, document_ids):
+                self._write_plan(nodes, document_id, conn=conn)
+
+    @staticmethod
+    def _tag_source(nodes: List[Dict[str, Any]], url: str) -> None:
+        """Record the page URL in the metadata of every row of a chunk plan"""
+        for node in nodes:
+            node['metadata'] = {**node['metadata'], 'source': url}
+
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        """Hash of the raw page content used to detect changed pages"""
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def ingest_document(self, content: str, metadata: Dict[str, Any], force: bool = False) -> bool:
+        """Store a page only if it is new or changed; returns True if it was (re)written"""
+        return self.ingest_documents([{'content': content, 'metadata': metadata}], force=force)[0]
+
+    def ingest_documents(self, documents: List[Dict[str, Any]], force: bool = False) -> List[bool]:
+        """Incrementally ingest pages keyed by their metadata 'source' URL.
+
+        Pages whose content hash matches the `documents` table are skipped. A changed
+        page has its old chunks, JSON blocks and tables deleted and rewritten in a
+        single transaction, so readers never see a half-replaced page.
+        """
+        hashes = [self._content_hash(document['content']) for document in documents]
+        urls = [document['metadata']['source'] for document in documents]
+        stored = self._stored_hashes(urls)
+        
+        # Chunk and embed outside the write transactions so row locks are held briefly
+        plans = {}
+        for i, document in enumerate(documents):
+            if not force and stored.get(urls[i]) == hashes[i]:
+                self.logger.debug(f"Skipping unchanged document: {urls[i]}")
+                continue
+            self.logger.debug(f"Processing document from: {urls[i]}")
+            self.logger.debug(f"Content length: {len(document['content'])}")
+            plans[i] = self._build_chunk_plan(document['content'])
+        self._embed_plan([node for nodes in plans.values() for node in nodes])
+        
+        for i, nodes in plans.items():
+            self._store_document(urls[i], hashes[i], nodes)
+        return [i in plans for i in range(len(documents))]
+
+    def _stored_hashes(self, urls: List[str] = None) -> Dict[str, str]:
+        """Content hashes recorded for the given URLs (or for every document if None)"""
         with self.conn.cursor() as cur:
-            cur.execute("""
-                SELECT id, content, metadata,
-                       embedding <-> %s::vector(1024) as distance
-                FROM document_chunks
-                WHERE embedding <-> %s::vector(1024) < %s
-                ORDER BY distance
-                LIMIT %s
-            """, (query_embedding, query_embedding, min_distance, limit))
+            if urls is None:
+                cur.execute("SELECT url, content_hash FROM documents")
+            else:
+                cur.execute("SELECT url, content_hash FROM documents WHERE url = ANY(%s)", (urls,))
+            stored = dict(cur.fetchall())
+        self.conn.commit()
+        return stored
+
+    def _store_document(self, url: str, content_hash: str, nodes: List[Dict[str, Any]], conn=None) -> int:
+        """Replace a document's chunks with an embedded plan in one transaction and return its ID"""
+        conn = conn or self.conn
+        self._tag_source(nodes, url)
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO documents (url, content_hash, chunk_count, last_ingested_at)
+                    VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+                    ON CONFLICT (url) DO UPDATE
+                    SET content_hash = EXCLUDED.content_hash,
+                        chunk_count = EXCLUDED.chunk_count,
+                        last_ingested_at = EXCLUDED.last_ingested_at
+                    RETURNING id
+                """, (url, content_hash, len(nodes)))
+                document_id = cur.fetchone()[0]
+                self._delete_document_chunks(cur, document_id, url)
+            self._write_plans([nodes], [document_id], conn=conn)
+            with conn.cursor() as cur:
+                # Last statement before commit, so the counter row is locked only briefly
+                cur.execute(BUMP_GENERATION_SQL)
+            conn.commit()
+            return document_id
+        except Exception as e:
+            self.logger.error(f"Error ingesting document {url}: {str(e)}", exc_info=True)
+            conn.rollback()
+            raise
+
+    def _delete_document_chunks(self, cur, document_id: int, url: str) -> None:
+        """Delete every chunk, JSON block and table stored for a document, and answers built from them"""
+        # Chunks written for the URL by process_documents are not linked to the document yet
+        cur.execute("""
+            UPDATE document_chunks SET document_id = %s
+            WHERE document_id IS NULL AND metadata->>'source' = %s
+        """, (document_id, url))
+        invalidate_document(cur, document_id)
+        cur.execute("""
+            DELETE FROM json_blocks
+            WHERE chunk_id IN (SELECT id FROM document_chunks WHERE document_id = %s)
+        """, (document_id,))
+        cur.execute("""
+            DELETE FROM table_blocks
+            WHERE chunk_id IN (SELECT id FROM document_chunks WHERE document_id = %s)
+        """, (document_id,))
+        cur.execute("DELETE FROM document_chunks WHERE document_id = %s", (document_id,))
+
+    # Attached JSON and table blocks of the chunk aliased `c`, aggregated in the same statement
+    # as the chunks themselves instead of two extra queries per hit
+    _BLOCKS_SELECT = """
+        COALESCE(jb.json_blocks, '[]'::json) AS json_blocks,
+        COALESCE(tb.tables, '[]'::json) AS tables
+    """
+    _BLOCKS_JOIN = """
+        LEFT JOIN LATERAL (
+            SELECT json_agg(json_build_object('content', j.json_content, 'metadata', j.metadata) ORDER BY j.id) AS json_blocks
+            FROM json_blocks j
+            WHERE j.chunk_id = c.id
+        ) jb ON true
+        LEFT JOIN LATERAL (
+            SELECT json_agg(json_build_object('content', t.table_content, 'headers', t.headers, 'metadata', t.metadata) ORDER BY t.id) AS tables
+            FROM table_blocks t
+            WHERE t.chunk_id = c.id
+        ) tb ON true
+    """
+
+    def _corpus_generation(self) -> Optional[int]:
+        """Generation counter of the committed corpus (one primary-key read), or None if unavailable.
+
+        Databases created before corpus_state existed have no such table until init_db
+        runs; the read is rolled back so the connection stays usable and searches simply
+        bypass the result cache.
+        """
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT generation FROM corpus_state")
+                row = cur.fetchone()
+        except psycopg2.Error as e:
+            self.conn.rollback()
+            if not self._generation_warned:
+                self._generation_warned = True
+                self.logger.warning(f"Corpus generation unavailable, result cache bypassed "
+                                    f"(run db/init_db.py): {str(e)}")
+            return None
+        return row[0] if row else None
+
+    def _cached_search(self, mode: str, query: str, limit: int, threshold: Any, compute) -> List[Dict[str, Any]]:
+        """Run a search through the retrieval result cache, if enabled"""
+        if self.result_cache is None:
+            return compute()
+        return self.result_cache.get_or_compute(mode, query, limit, threshold, compute)
+
+    @staticmethod
+    def _apply_settings(cur, settings: Dict[str, Any] = None) -> None:
+        """Set planner/index settings for the current transaction only"""
+        for name, value in (settings or {}).items():
+            cur.execute("SELECT set_config(%s, %s, true)", (name, str(value)))
+
+    def _fetch_results(self, sql: str, params: tuple, score: str = "distance",
+                       settings: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Run a search statement returning (id, content, metadata, score, json_blocks, tables) rows.
+
+        The score is returned under the `score` key, and left out when it is NULL.
+        `settings` are applied with set_config for the current transaction first.
+        """
+        with self.conn.cursor() as cur:
+            self._apply_settings(cur, settings)
+            cur.execute(sql, params)
             results = []
-            for row in cur.fetchall():
-                chunk_id, content, metadata, distance = row
-                cur.execute("SELECT json_content, metadata FROM json_blocks WHERE chunk_id = %s", (chunk_id,))
-                json_blocks = [{"content": r[0], "metadata": r[1]} for r in cur.fetchall()]
-                cur.execute("SELECT table_content, headers, metadata FROM table_blocks WHERE chunk_id = %s", (chunk_id,))
-                tables = [{"content": r[0], "headers": r[1], "metadata": r[2]} for r in cur.fetchall()]
-                results.append({
+            for chunk_id, content, metadata, value, json_blocks, tables in cur.fetchall():
+                result = {
                     "id": chunk_id,
                     "content": content,
                     "metadata": metadata,
                     "json_blocks": json_blocks,
                     "tables": tables,
-                    "distance": distance
-                })
+                }
+                if value is not None:
+                    result[score] = value
+                results.append(result)
             return results
 
-    def hybrid_search(self, query: str, limit: int = 5, min_distance: float = 1.5) -> List[Dict[str, Any]]:
-        """Hybrid search: combine semantic and keyword search results, deduplicated, sorted by semantic distance if available."""
-        # 1. Semantic search
-        semantic_results = self.search(query, limit=limit, min_distance=min_distance)
-        semantic_ids = {r.get('id') for r in semantic_results if r.get('id') is not None}
+    def search(self, query: str, limit: int = 3, min_distance: float = 0.70) -> List[Dict[str, Any]]:
+        """Search for relevant documents.
 
-        # 2. Keyword search (ILIKE on content)
-        with self.conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT id, content, metadata
-                FROM document_chunks
-                WHERE content ILIKE %s
+        `min_distance` is the largest L2 distance accepted, whatever VECTOR_INDEX_CONFIG
+        metric is in use; returned distances are in the metric's own units.
+        With RETRIEVAL_BACKEND=snapshot the lookup never touches Postgres, so it skips
+        the result cache (whose invalidation reads the corpus generation there).
+        """
+        if self.snapshot is not None:
+            return self.snapshot.search(self.embeddings.embed_query(query), limit,
+                                        distance_threshold(self.snapshot.metric, min_distance))
+        return self._cached_search("semantic", query, limit, min_distance,
+                                   lambda: self._semantic_search(query, limit, min_distance))
+
+    def _semantic_search(self, query: str, limit: int = 3, min_distance: float = 0.70) -> List[Dict[str, Any]]:
+        """Uncached body of search"""
+        query_embedding = self.embeddings.embed_query(query)
+        return self._fetch_results(f"""
+            SELECT c.id, c.content, c.metadata, hits.distance, {self._BLOCKS_SELECT}
+            FROM ({nearest_chunks_sql(VECTOR_INDEX_CONFIG["metric"], VECTOR_INDEX_CONFIG["storage"])}) hits
+            JOIN document_chunks c ON c.id = hits.id
+            {self._BLOCKS_JOIN}
+            ORDER BY hits.distance
+        """, nearest_chunks_params(VECTOR_INDEX_CONFIG, query_embedding, limit, min_distance),
+            settings=search_settings(VECTOR_INDEX_CONFIG, limit))
+
+    def _semantic_candidates(self, query: str, count: int, min_distance: float) -> List[tuple]:
+        """(chunk id, distance) of the nearest chunks, on a pooled connection or the snapshot"""
+        query_embedding = self.embeddings.embed_query(query)
+        if self.snapshot is not None:
+            return [(int(self.snapshot.ids[row]), distance) for row, distance in self.snapshot.nearest(
+                query_embedding, count, distance_threshold(self.snapshot.metric, min_distance))]
+        with self._pooled_cursor() as cur:
+            self._apply_settings(cur, search_settings(VECTOR_INDEX_CONFIG, count))
+            cur.execute(nearest_chunks_sql(VECTOR_INDEX_CONFIG["metric"], VECTOR_INDEX_CONFIG["storage"]),
+                        nearest_chunks_params(VECTOR_INDEX_CONFIG, query_embedding, count, min_distance))
+            return cur.fetchall()
+
+    def _keyword_candidates(self, query: str, count: int) -> List[int]:
+        """Chunk ids of the best full-text matches, on a pooled connection"""
+        with self._pooled_cursor() as cur:
+            cur.execute(f"""
+                SELECT id
+                FROM document_chunks, {KEYWORD_TSQUERY_SQL}
+                WHERE content_tsv @@ q
+                ORDER BY ts_rank_cd(content_tsv, q) DESC
                 LIMIT %s
-                """,
-                (f"%{query}%", limit)
-            )
-            keyword_rows = cur.fetchall()
-            keyword_results = []
-            for row in keyword_rows:
-                chunk_id, content, metadata = row
-                # Get associated JSON blocks
-                cur.execute("SELECT json_content, metadata FROM json_blocks WHERE chunk_id = %s", (chunk_id,))
-                json_blocks = [{"content": r[0], "metadata": r[1]} for r in cur.fetchall()]
-                # Get associated tables
-                cur.execute("SELECT table_content, headers, metadata FROM table_blocks WHERE chunk_id = %s", (chunk_id,))
-                tables = [{"content": r[0], "headers": r[1], "metadata": r[2]} for r in cur.fetchall()]
-                keyword_results.append({
-                    "id": chunk_id,
-                    "content": content,
-                    "metadata": metadata,
-                    "json_blocks": json_blocks,
-                    "tables": tables,
-                    # No semantic distance for keyword results
-                })
+            """, (query, query, count))
+            return [row[0] for row in cur.fetchall()]
 
-        # 3. Merge, deduplicate by id (semantic results take precedence)
-        merged = {r.get('id'): r for r in semantic_results if r.get('id') is not None}
-        for r in keyword_results:
-            if r.get('id') is not None and r.get('id') not in merged:
-                merged[r.get('id')] = r
-        # 4. Sort: semantic results first by distance, then keyword results
-        sorted_results = sorted(
-            merged.values(),
-            key=lambda r: r.get('distance', float('inf'))
-        )
-        return sorted_results[:limit]
+    def hybrid_search(self, query: str, limit: int = 5, min_distance: float = 1.5) -> List[Dict[str, Any]]:
+        """Hybrid search: semantic and full-text candidates merged with reciprocal rank fusion.
+
+        The keyword branch runs on a second pooled connection while the query is
+        embedded and the semantic branch runs, so latency is about the slower of the
+        two. Results carry their "rrf_score", and "distance" when found semantically.
+        """
+        return self._cached_search("hybrid", query, limit, min_distance,
+                                   lambda: self._hybrid_search(query, limit, min_distance))
+
+    def _hybrid_search(self, query: str, limit: int = 5, min_distance: float = 1.5) -> List[Dict[str, Any]]:
+        """Uncached body of hybrid_search"""
+        keyword_future = self._search_executor.submit(
+            self._keyword_candidates, query, HYBRID_CONFIG["keyword_candidates"])
+        semantic = self._semantic_candidates(query, HYBRID_CONFIG["semantic_candidates"], min_distance)
+        keyword = keyword_future.result()
+
+        fused = reciprocal_rank_fusion(
+            [[chunk_id for chunk_id, _ in semantic], keyword],
+            weights=[HYBRID_CONFIG["semantic_weight"], HYBRID_CONFIG["keyword_weight"]],
+            k=HYBRID_CONFIG["rrf_k"]
+        )[:limit]
+        if not fused:
+            return []
+        rows = self._fetch_results(f"""
+            SELECT c.id, c.content, c.metadata, NULL, {self._BLOCKS_SELECT}
+            FROM document_chunks c
+            {self._BLOCKS_JOIN}
+            WHERE c.id = ANY(%s)
+        """, ([chunk_id for chunk_id, _ in fused],))
+        by_id = {row["id"]: row for row in rows}
+        distances = dict(semantic)
+        results = []
+        for chunk_id, score in fused:
+            result = by_id.get(chunk_id)
+            if result is None:
+                continue  # Deleted by a re-ingest in the meantime
+            if chunk_id in distances:
+                result["distance"] = distances[chunk_id]
+            result["rrf_score"] = score
+            results.append(result)
+        return results
 
     def keyword_search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
-        """Keyword search (ILIKE) on content, returns results in the same format as other search methods."""
-        with self.conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT id, content, metadata
+        """Full-text keyword search on content, returns results in the same format as other search methods.
+
+        The query uses web search syntax ("quoted phrases", OR, -excluded) and hits are
+        ordered by ts_rank_cd, which is returned under "rank". Matching goes through the
+        GIN index on the stored content_tsv column; exact words (getOrders) rank above
+        chunks that only share their stem.
+        """
+        return self._cached_search("keyword", query, limit, None,
+                                   lambda: self._keyword_search(query, limit))
+
+    def _keyword_search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Uncached body of keyword_search"""
+        return self._fetch_results(f"""
+            SELECT c.id, c.content, c.metadata, hits.rank, {self._BLOCKS_SELECT}
+            FROM (
+                SELECT id, ts_rank_cd(content_tsv, q) AS rank
+                FROM document_chunks, {KEYWORD_TSQUERY_SQL}
+                WHERE content_tsv @@ q
+                ORDER BY rank DESC
+                LIMIT %s
+            ) hits
+            JOIN document_chunks c ON c.id = hits.id
+            {self._BLOCKS_JOIN}
+            ORDER BY hits.rank DESC
+        """, (query, query, limit), score="rank")
+
+    def identifier_search(self, query: str, limit: int = 5, threshold: float = None) -> List[Dict[str, Any]]:
+        """Trigram lookup for operation, model and error names (e.g. createReport, InvalidInput).
+
+        Matches the query against chunk headers, chunk content and table cells with
+        strict_word_similarity at least `threshold`, using the pg_trgm GIN indexes.
+        Each chunk is scored by its best match, returned under "similarity".
+        """
+        return self._cached_search("identifier", query, limit, threshold,
+                                   lambda: self._identifier_search(query, limit, threshold))
+
+    def _identifier_search(self, query: str, limit: int = 5, threshold: float = None) -> List[Dict[str, Any]]:
+        """Uncached body of identifier_search"""
+        threshold = IDENTIFIER_SEARCH_CONFIG["threshold"] if threshold is None else threshold
+        return self._fetch_results(f"""
+            WITH matches AS (
+                SELECT id, strict_word_similarity(%s, header_text) AS similarity
+                FROM document_chunks
+                WHERE %s <<%% header_text
+                UNION ALL
+                SELECT id, strict_word_similarity(%s, content)
                 FROM document_chunks
-                WHERE content ILIKE %s
+                WHERE %s <<%% content
+                UNION ALL
+                SELECT chunk_id, strict_word_similarity(%s, table_content::text)
+                FROM table_blocks
+                WHERE %s <<%% table_content::text
+            ),
+            hits AS (
+                SELECT id, max(similarity) AS similarity
+                FROM matches
+                GROUP BY id
+                ORDER BY similarity DESC
                 LIMIT %s
-                """,
-                (f"%{query}%", limit)
             )
-            rows = cur.fetchall()
-            results = []
-            for row in rows:
-                chunk_id, content, metadata = row
-                cur.execute("SELECT json_content, metadata FROM json_blocks WHERE chunk_id = %s", (chunk_id,))
-                json_blocks = [{"content": r[0], "metadata": r[1]} for r in cur.fetchall()]
-                cur.execute("SELECT table_content, headers, metadata FROM table_blocks WHERE chunk_id = %s", (chunk_id,))
-                tables = [{"content": r[0], "headers": r[1], "metadata": r[2]} for r in cur.fetchall()]
-                results.append({
-                    "id": chunk_id,
-                    "content": content,
-                    "metadata": metadata,
-                    "json_blocks": json_blocks,
-                    "tables": tables,
-                })
-            return results
+            SELECT c.id, c.content, c.metadata, hits.similarity, {self._BLOCKS_SELECT}
+            FROM hits
+            JOIN document_chunks c ON c.id = hits.id
+            {self._BLOCKS_JOIN}
+            ORDER BY hits.similarity DESC
+        """, (query,) * 6 + (limit,), score="similarity",
+            settings={"pg_trgm.strict_word_similarity_threshold": threshold})
 
     def close(self):
         """Close database connection"""
-        self.conn.close()
+        if self._conn is not None:
+            self._conn.close()
+        if self._pool is not None:
+            self._pool.closeall()
+        self._search_executor.shutdown(wait=False)
+        if self._snapshot is not None:
+            self._snapshot.close()
+        if self.embedding_cache:
+            self.embedding_cache.close()
 
     def test_database_connection(self):
         """Test database operations"""
@@ -489,19 +993,37 @@ class DocumentProcessor:
             with self.conn.cursor() as cur:
                 # Enable vector extension
                 cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+                cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+                cur.execute(TEXT_SEARCH_CONFIG_SQL)
                 
                 # Drop existing table if it exists
+                cur.execute("DROP TABLE IF EXISTS answer_cache;")
                 cur.execute("DROP TABLE IF EXISTS table_blocks;")
                 cur.execute("DROP TABLE IF EXISTS json_blocks;")
                 cur.execute("DROP TABLE IF EXISTS document_chunks;")
+                cur.execute("DROP TABLE IF EXISTS documents;")
                 
-                # Create document_chunks table with 1024-dimensional vector
+                # One row per source page, used to skip unchanged pages on re-ingest
                 cur.execute("""
+                    CREATE TABLE documents (
+                        id SERIAL PRIMARY KEY,
+                        url TEXT UNIQUE NOT NULL,
+                        content_hash TEXT NOT NULL,
+                        chunk_count INTEGER,
+                        last_ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+                
+                # Create document_chunks table with 1024-dimensional vector
+                cur.execute(f"""
                     CREATE TABLE document_chunks (
                         id SERIAL PRIMARY KEY,
                         parent_id INTEGER REFERENCES document_chunks(id),
+                        document_id INTEGER REFERENCES documents(id),
                         title TEXT,
                         content TEXT,
+                        content_tsv {CONTENT_TSV_SQL},
+                        header_text {HEADER_TEXT_SQL},
                         embedding vector(1024),
                         metadata JSONB
                     );
@@ -528,11 +1050,34 @@ class DocumentProcessor:
                     );
                 """)
                 
-                # Create index for similarity search
-                cur.execute("""
-                    CREATE INDEX ON document_chunks 
-                    USING ivfflat (embedding vector_l2_ops);
-                """)
+                # Create index for similarity search with the configured metric
+                cur.execute(create_index_sql(VECTOR_INDEX_CONFIG))
+                
+                # Replacing a page deletes its chunks by document
+                cur.execute("CREATE INDEX ON document_chunks (document_id);")
+                
+                # Keyword search
+                cur.execute("CREATE INDEX ON document_chunks USING gin (content_tsv);")
+                
+                # Identifier search
+                cur.execute("CREATE INDEX ON document_chunks USING gin (header_text gin_trgm_ops);")
+                cur.execute("CREATE INDEX ON document_chunks USING gin (content gin_trgm_ops);")
+                cur.execute("CREATE INDEX ON table_blocks USING gin ((table_content::text) gin_trgm_ops);")
+                
+                # Generation counter for cached search results; kept and bumped rather than
+                # reset, so other processes never match results cached before the rebuild
+                for statement in CORPUS_STATE_SQL:
+                    cur.execute(statement)
+                cur.execute(BUMP_GENERATION_SQL)
+                
+                # Answers are cached by query embedding and reference the chunks they used
+                cur.execute(ANSWER_CACHE_TABLE_SQL)
+                for statement in ANSWER_CACHE_INDEX_SQL:
+                    cur.execute(statement)
+                
+                # Searches aggregate the blocks of each hit by chunk
+                cur.execute("CREATE INDEX ON json_blocks (chunk_id);")
+                cur.execute("CREATE INDEX ON table_blocks (chunk_id);")
                 
                 self.conn.commit()
                 self.logger.info("Database schema created successfully")
@@ -0,0 +1,163 @@
+from typing import List
+import logging
+import os
+import threading
+import time
+from langchain_core.embeddings import Embeddings
+from config import EMBEDDING_MODEL_CONFIG, EMBEDDING_SERVER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+def resolve_device(device: str = None) -> str:
+    """Map 'auto' to cuda when a GPU is available and cpu otherwise"""
+    device = device or EMBEDDING_MODEL_CONFIG["device"]
+    if device != "auto":
+        return device
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+class HuggingFaceBackend(Embeddings):
+    """Full-precision PyTorch model through HuggingFaceEmbeddings (the reference backend)"""
+
+    name = "huggingface"
+
+    def __init__(self, model_name: str, device: str = None, intra_op_threads: int = 0):
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+
+        self.device = resolve_device(device)
+        if intra_op_threads and self.device == "cpu":
+            import torch
+            torch.set_num_threads(intra_op_threads)
+        self.embeddings = HuggingFaceEmbeddings(model_name=model_name, model_kwargs={"device": self.device})
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+class OnnxBackend(Embeddings):
+    """CPU inference with ONNX Runtime, optionally with dynamic int8 weight quantization.
+
+    The model is exported once with optimum (and quantized with onnxruntime) into
+    `cache_dir`; later runs load the exported file directly. Uses CLS pooling and
+    L2 normalization, matching the sentence-transformers config of the bge models.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_name: str, quantize: bool = True, intra_op_threads: int = 0,
+                 cache_dir: str = ".cache/onnx", max_length: int = 512):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model_path = self._export(model_name, quantize, cache_dir)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    @staticmethod
+    def _export(model_name: str, quantize: bool, cache_dir: str) -> str:
+        """Path to the (quantized) ONNX model, exporting it on first use"""
+        export_dir = os.path.join(cache_dir, model_name.replace('/', '__'))
+        fp32_path = os.path.join(export_dir, "model.onnx")
+        if not os.path.exists(fp32_path):
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            logger.info(f"Exporting {model_name} to ONNX in {export_dir}")
+            ORTModelForFeatureExtraction.from_pretrained(model_name, export=True).save_pretrained(export_dir)
+        if not quantize:
+            return fp32_path
+        int8_path = os.path.join(export_dir, "model_int8.onnx")
+        if not os.path.exists(int8_path):
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            logger.info(f"Quantizing {fp32_path} to int8")
+            quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        return int8_path
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        import numpy as np
+        inputs = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np")
+        feed = {name: inputs[name].astype(np.int64) for name in self.input_names if name in inputs}
+        last_hidden_state = self.session.run(None, feed)[0]
+        cls = last_hidden_state[:, 0]
+        cls = cls / np.linalg.norm(cls, axis=1, keepdims=True)
+        return cls.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+class RemoteEmbeddings(Embeddings):
+    """Client for the shared embedding server (processor/embedding_server.py).
+
+    Refuses vectors from a server running a different model, since they would not
+    be comparable with the stored ones (or the embedding cache entries).
+    """
+
+    name = "remote"
+
+    def __init__(self, url: str, model_name: str, timeout: float = 60):
+        self.url = url.rstrip('/')
+        self.model_name = model_name
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self):
+        # One keep-alive session per thread
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+            session = self._local.session = requests.Session()
+        return session
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        response = self._session().post(f"{self.url}/embed", json={"texts": texts}, timeout=self.timeout)
+        response.raise_for_status()
+        body = response.json()
+        if body["model"] != self.model_name:
+            raise ValueError(f"Embedding server at {self.url} runs {body['model']}, expected {self.model_name}")
+        return body["embeddings"]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+def backend_variant(backend: str = None) -> str:
+    """Which vectors a backend produces (its name, plus int8 or fp32 for onnx), so caches keep them apart"""
+    backend = backend or EMBEDDING_MODEL_CONFIG["backend"]
+    if backend == "onnx":
+        return "onnx-int8" if EMBEDDING_MODEL_CONFIG["onnx_quantize"] else "onnx-fp32"
+    return backend
+
+def create_embedding_backend(model_name: str = None, backend: str = None) -> Embeddings:
+    """Build the embedding backend selected by EMBEDDING_MODEL_CONFIG (or the arguments)"""
+    model_name = model_name or EMBEDDING_MODEL_CONFIG["model_name"]
+    backend = backend or EMBEDDING_MODEL_CONFIG["backend"]
+    started = time.perf_counter()
+    if backend == "onnx":
+        embeddings = OnnxBackend(
+            model_name,
+            quantize=EMBEDDING_MODEL_CONFIG["onnx_quantize"],
+            intra_op_threads=EMBEDDING_MODEL_CONFIG["intra_op_threads"],
+            cache_dir=EMBEDDING_MODEL_CONFIG["onnx_cache_dir"]
+        )
+    elif backend == "remote":
+        embeddings = RemoteEmbeddings(
+            EMBEDDING_SERVER_CONFIG["url"],
+            model_name,
+            timeout=EMBEDDING_SERVER_CONFIG["timeout"]
+        )
+    elif backend == "huggingface":
+        embeddings = HuggingFaceBackend(
+            model_name,
+            intra_op_threads=EMBEDDING_MODEL_CONFIG["intra_op_threads"]
+        )
+    else:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    logger.info(f"Loaded {backend} embedding backend for {model_name} in {time.perf_counter() - started:.1f}s")
+    return embeddings
@@ -0,0 +1,207 @@
+"""Shared local embedding server with dynamic micro-batching.
+
+    python -m processor.embedding_server --port 8765
+
+One process holds the model; query handlers and ingest workers embed through it
+with EMBEDDING_BACKEND=remote. Concurrent requests are coalesced into batches
+of up to `max_batch_size` texts, waiting at most `max_wait_ms` for a batch to fill.
+
+    POST /embed   {"texts": ["..."]}  ->  {"model": "...", "embeddings": [[...]]}
+    GET  /health                      ->  {"model": "...", "stats": {...}}
+"""
+from typing import Any, Callable, Dict, List
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+from config import EMBEDDING_MODEL_CONFIG, EMBEDDING_SERVER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+class _Request:
+    __slots__ = ("texts", "done", "result", "error")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class MicroBatcher:
+    """Coalesce concurrent embedding requests into batched model calls.
+
+    Callers block in `embed` while a single worker thread gathers queued requests
+    until `max_batch_size` texts are waiting or `max_wait_ms` has passed since the
+    first one arrived, embeds them together and hands each caller its own rows.
+    """
+
+    def __init__(self, embed: Callable[[List[str]], List[List[float]]], max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0):
+        self._embed = embed
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed `texts`, sharing a model call with whatever else is queued"""
+        if not texts:
+            return []
+        request = _Request(list(texts))
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _gather(self, first: _Request) -> List[_Request]:
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)  # Let the run loop see the stop signal after this batch
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._gather(first)
+            texts = [text for request in batch for text in request.texts]
+            try:
+                vectors = []
+                # A single oversized request is still split into model calls of max_batch_size
+                for i in range(0, len(texts), self.max_batch_size):
+                    vectors.extend(self._embed(texts[i:i + self.max_batch_size]))
+                calls = (len(texts) + self.max_batch_size - 1) // self.max_batch_size
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+                    request.done.set()
+                continue
+            offset = 0
+            for request in batch:
+                request.result = vectors[offset:offset + len(request.texts)]
+                offset += len(request.texts)
+                request.done.set()
+            with self._lock:
+                self.requests += len(batch)
+                self.texts += len(texts)
+                self.batches += calls
+
+    def stats(self) -> Dict[str, Any]:
+        """Request/batch counters for reporting"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "texts": self.texts,
+                "batches": self.batches,
+                "mean_batch_size": self.texts / self.batches if self.batches else 0.0,
+            }
+
+    def close(self) -> None:
+        """Stop the worker after the requests already queued"""
+        self._queue.put(None)
+        self._thread.join()
+
+class _EmbeddingHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients reuse one connection per thread
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": "not found"})
+            return
+        self._send_json(200, {"model": self.server.model_name, "stats": self.server.batcher.stats()})
+
+    def do_POST(self):
+        if self.path != "/embed":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            texts = body["texts"]
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError("texts must be a list of strings")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": f"Bad request: {str(e)}"})
+            return
+        try:
+            embeddings = self.server.batcher.embed(texts)
+        except Exception as e:
+            logger.error(f"Embedding failed: {str(e)}")
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, {"model": self.server.model_name, "embeddings": embeddings})
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+class EmbeddingServer(ThreadingHTTPServer):
+    """HTTP front end for a MicroBatcher; one handler thread per connection"""
+
+    daemon_threads = True
+
+    def __init__(self, embeddings, model_name: str, host: str = "127.0.0.1", port: int = 8765,
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        super().__init__((host, port), _EmbeddingHandler)
+        self.model_name = model_name
+        self.batcher = MicroBatcher(embeddings.embed_documents, max_batch_size, max_wait_ms)
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=EMBEDDING_SERVER_CONFIG["host"])
+    parser.add_argument("--port", type=int, default=EMBEDDING_SERVER_CONFIG["port"])
+    parser.add_argument("--backend", default=EMBEDDING_SERVER_CONFIG["backend"], choices=["huggingface", "onnx"])
+    parser.add_argument("--max-batch-size", type=int, default=EMBEDDING_SERVER_CONFIG["max_batch_size"])
+    parser.add_argument("--max-wait-ms", type=float, default=EMBEDDING_SERVER_CONFIG["max_wait_ms"])
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from processor.embedding_backends import create_embedding_backend
+    model_name = EMBEDDING_MODEL_CONFIG["model_name"]
+    embeddings = create_embedding_backend(model_name, args.backend)
+    server = EmbeddingServer(embeddings, model_name, args.host, args.port, args.max_batch_size, args.max_wait_ms)
+    print(f"Serving {model_name} ({args.backend}) on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Stats: {server.batcher.stats()}")
+
+if __name__ == "__main__":
+    main()
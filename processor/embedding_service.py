@@ -0,0 +1,76 @@
+from typing import Dict, List
+import atexit
+import os
+import threading
+from langchain_core.embeddings import Embeddings
+from processor.embedding_backends import backend_variant, create_embedding_backend
+from processor.lru_cache import LRUCache
+from config import EMBEDDING_MODEL_CONFIG, QUERY_CACHE_CONFIG
+
+class EmbeddingService(Embeddings):
+    """Process-wide embedding model shared by every DocumentProcessor and QueryHandler.
+
+    The backend is loaded lazily on first use, under a lock, so concurrent first
+    callers still load it only once. Inference calls go straight to the backend;
+    both the PyTorch and ONNX Runtime backends support concurrent calls.
+
+    Query embeddings go through an LRU cache keyed on the whitespace-normalized
+    query, so repeated questions skip the model entirely. With QUERY_CACHE_DIR set
+    the cache is loaded on creation and saved again at exit, in one file per model
+    and backend variant.
+    """
+
+    def __init__(self, model_name: str, backend: str = None):
+        self.model_name = model_name
+        self.backend_name = backend
+        self._backend = None
+        self._lock = threading.Lock()
+        self.query_cache = LRUCache(QUERY_CACHE_CONFIG["max_entries"], QUERY_CACHE_CONFIG["ttl_seconds"])
+        self.query_cache_path = None
+        if QUERY_CACHE_CONFIG["dir"]:
+            file_name = f"{model_name.replace('/', '__')}__{backend_variant(backend)}.pkl"
+            self.query_cache_path = os.path.join(QUERY_CACHE_CONFIG["dir"], file_name)
+            self.query_cache.load(self.query_cache_path)
+            atexit.register(self.save_query_cache)
+
+    @property
+    def loaded(self) -> bool:
+        return self._backend is not None
+
+    def load(self) -> Embeddings:
+        """Load the backend if needed and return it"""
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = create_embedding_backend(self.model_name, self.backend_name)
+        return self._backend
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.load().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        # The normalized text is what gets embedded, so a cached vector is exactly what the model would return
+        text = " ".join(text.split())
+        vector = self.query_cache.get(text)
+        if vector is None:
+            vector = self.load().embed_query(text)
+            self.query_cache.put(text, vector)
+        return vector
+
+    def save_query_cache(self) -> None:
+        """Persist the query embedding cache (no-op without QUERY_CACHE_DIR)"""
+        if self.query_cache_path and len(self.query_cache):
+            self.query_cache.save(self.query_cache_path)
+
+_services: Dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+def get_embedding_service(model_name: str = None) -> EmbeddingService:
+    """The shared embedding service for a model (nothing is loaded until it is used)"""
+    model_name = model_name or EMBEDDING_MODEL_CONFIG["model_name"]
+    with _services_lock:
+        service = _services.get(model_name)
+        if service is None:
+            service = EmbeddingService(model_name)
+            _services[model_name] = service
+        return service
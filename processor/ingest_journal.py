@@ -0,0 +1,96 @@
+from typing import Dict, List
+import sqlite3
+import threading
+import time
+import os
+
+PENDING = "pending"
+FETCHED = "fetched"
+PROCESSED = "processed"
+FAILED = "failed"
+
+class IngestJournal:
+    """Durable per-URL ingestion state kept in a local SQLite file.
+
+    Every state change is committed immediately, so after a crash or Ctrl-C a
+    resumed run picks up exactly the URLs that were not processed yet. Failed
+    URLs are retried until they have failed `max_attempts` times.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS journal (
+                    position INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT UNIQUE NOT NULL,
+                    state TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def start(self, urls: List[str], resume: bool = False) -> List[str]:
+        """Begin a run over `urls` and return the ones still to do.
+
+        A fresh run forgets previous state. A resumed run keeps it and only adds
+        URLs the journal has not seen yet.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            if not resume:
+                self._conn.execute("DELETE FROM journal")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO journal (url, state, updated_at) VALUES (?, ?, ?)",
+                [(url, PENDING, now) for url in urls]
+            )
+        return self.remaining()
+
+    def remaining(self) -> List[str]:
+        """URLs not yet processed, including failed ones with attempts left, in journal order"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT url FROM journal
+                WHERE state IN (?, ?) OR (state = ? AND attempts < ?)
+                ORDER BY position
+            """, (PENDING, FETCHED, FAILED, self.max_attempts)).fetchall()
+        return [row[0] for row in rows]
+
+    def _set_state(self, url: str, state: str, error: str = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("""
+                UPDATE journal
+                SET state = ?,
+                    attempts = attempts + ?,
+                    last_error = ?,
+                    updated_at = ?
+                WHERE url = ?
+            """, (state, 1 if state == FAILED else 0, error, time.time(), url))
+
+    def mark_fetched(self, url: str) -> None:
+        self._set_state(url, FETCHED)
+
+    def mark_processed(self, url: str) -> None:
+        self._set_state(url, PROCESSED)
+
+    def mark_failed(self, url: str, error: str) -> None:
+        self._set_state(url, FAILED, error)
+
+    def summary(self) -> Dict[str, int]:
+        """Number of URLs in each state"""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM journal GROUP BY state").fetchall()
+        counts = {PENDING: 0, FETCHED: 0, PROCESSED: 0, FAILED: 0}
+        counts.update(rows)
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
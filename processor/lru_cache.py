@@ -0,0 +1,93 @@
+from typing import Any, Callable, Dict, Hashable, Optional
+from collections import OrderedDict
+import os
+import pickle
+import threading
+import time
+
+class LRUCache:
+    """Bounded, thread-safe least-recently-used cache with an optional time to live.
+
+    Entries older than `ttl_seconds` (0 keeps them forever) count as misses and are
+    dropped. `save` and `load` persist the entries to a file so the cache survives
+    restarts; expiry uses wall-clock time so it carries across processes too.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 0, clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, stored_at), least recently used first
+        self._lock = threading.Lock()
+
+    def _expired(self, stored_at: float) -> bool:
+        return bool(self.ttl_seconds) and self.clock() - stored_at > self.ttl_seconds
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached value for `key`, or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1]):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries beyond max_entries"""
+        with self._lock:
+            self._entries[key] = (value, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for reporting"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def save(self, path: str) -> None:
+        """Write the live entries to `path` atomically, least recently used first"""
+        with self._lock:
+            entries = [(key, entry) for key, entry in self._entries.items() if not self._expired(entry[1])]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> int:
+        """Add the unexpired entries saved in `path` (if it exists) and return how many were loaded"""
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            entries = pickle.load(f)
+        loaded = 0
+        with self._lock:
+            for key, (value, stored_at) in entries:
+                if self._expired(stored_at):
+                    continue
+                self._entries[key] = (value, stored_at)
+                self._entries.move_to_end(key)
+                loaded += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return loaded
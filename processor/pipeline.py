@@ -0,0 +1,225 @@
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import logging
+import queue
+import threading
+import time
+import psycopg2
+from processor.document_processor import DocumentProcessor
+from scraper.discovery import get_doc_urls
+from scraper.fetcher import fetch_with_retries, new_rate_limiter
+from config import DB_CONFIG, PIPELINE_CONFIG, SCRAPE_PROCESS_LIMIT
+
+# Marks the end of a stage's input
+_DONE = object()
+
+class Stage:
+    """A pool of worker threads that reads items from one bounded queue and feeds the next.
+
+    `func` returns the item to pass downstream, or None to drop it. Because the
+    queues are bounded, a slow stage blocks its producers instead of letting work
+    pile up in memory.
+    """
+
+    def __init__(self, name: str, func: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+                 workers: int, inbox: queue.Queue, outbox: Optional[queue.Queue] = None,
+                 setup: Callable[[], Any] = None, teardown: Callable[[Any], None] = None):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.inbox = inbox
+        self.outbox = outbox
+        # Optional per-worker state (e.g. a DB connection) passed to func as `context`
+        self.setup = setup
+        self.teardown = teardown
+        self.downstream_workers = 0
+        self._running = 0
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.lock = threading.Lock()
+        self.threads = []
+        self.logger = logging.getLogger(__name__)
+
+    def start(self) -> None:
+        """Start the worker threads"""
+        self._running = self.workers
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def join(self) -> None:
+        """Wait for every worker to finish"""
+        for thread in self.threads:
+            thread.join()
+
+    def _work(self) -> None:
+        context, ready = None, True
+        try:
+            if self.setup:
+                try:
+                    context = self.setup()
+                except Exception as e:
+                    self.logger.error(f"{self.name} worker setup failed: {str(e)}", exc_info=True)
+                    print(f"Error setting up {self.name} worker: {str(e)}")
+                    ready = False
+            while True:
+                item = self.inbox.get()
+                if item is _DONE:
+                    break
+                if not ready:
+                    # Keep draining so upstream stages never block on a full queue
+                    with self.lock:
+                        self.failed += 1
+                    continue
+                started = time.perf_counter()
+                try:
+                    result = self.func(item, context) if self.setup else self.func(item)
+                    ok = True
+                except Exception as e:
+                    self.logger.error(f"{self.name} failed for {item.get('url')}: {str(e)}", exc_info=True)
+                    print(f"Error in {self.name} stage for {item.get('url')}: {str(e)}")
+                    result, ok = None, False
+                elapsed = time.perf_counter() - started
+                with self.lock:
+                    self.busy_seconds += elapsed
+                    if ok:
+                        self.processed += 1
+                    else:
+                        self.failed += 1
+                if result is not None and self.outbox is not None:
+                    self.outbox.put(result)
+        finally:
+            if self.teardown and ready:
+                self.teardown(context)
+            with self.lock:
+                self._running -= 1
+                last = self._running == 0
+            # The last worker out tells every downstream worker to stop
+            if last and self.outbox is not None:
+                for _ in range(self.downstream_workers):
+                    self.outbox.put(_DONE)
+
+class IngestionPipeline:
+    """Ingest pages through fetch -> chunk -> embed -> write stages running concurrently.
+
+    Each stage has its own worker pool and they are connected by bounded queues,
+    so network waits, chunking, model inference and DB writes overlap and a full
+    crawl is bounded by the slowest stage rather than the sum of all of them.
+    """
+
+    def __init__(self, processor: DocumentProcessor, fetch_workers: int = None, chunk_workers: int = None,
+                 embed_workers: int = None, write_workers: int = None, queue_size: int = None,
+                 force: bool = False):
+        self.processor = processor
+        self.force = force
+        self.queue_size = queue_size or PIPELINE_CONFIG["queue_size"]
+        self.worker_counts = {
+            "fetch": fetch_workers or PIPELINE_CONFIG["fetch_workers"],
+            "chunk": chunk_workers or PIPELINE_CONFIG["chunk_workers"],
+            "embed": embed_workers or PIPELINE_CONFIG["embed_workers"],
+            "write": write_workers or PIPELINE_CONFIG["write_workers"],
+        }
+        self.limiter = new_rate_limiter()
+        self.stored_hashes = {}
+        self.skipped = 0
+        self.lock = threading.Lock()
+
+    def _fetch(self, item):
+        content = fetch_with_retries(item['url'], self.limiter, fetch=self.processor._scrape)
+        if not content:
+            print(f"No content found for {item['url']}")
+            return None
+        return {**item, 'content': content}
+
+    def _chunk(self, item):
+        content_hash = self.processor._content_hash(item['content'])
+        if not self.force and self.stored_hashes.get(item['url']) == content_hash:
+            with self.lock:
+                self.skipped += 1
+            print(f"Unchanged, skipped {item['url']}")
+            return None
+        nodes = self.processor._build_chunk_plan(item['content'])
+        return {'url': item['url'], 'content_hash': content_hash, 'nodes': nodes}
+
+    def _embed(self, item):
+        self.processor._embed_plan(item['nodes'])
+        return item
+
+    def _write(self, item, conn):
+        self.processor._store_document(item['url'], item['content_hash'], item['nodes'], conn=conn)
+        print(f"Successfully processed {item['url']}")
+        return None
+
+    def _connect(self):
+        return psycopg2.connect(**self.processor.db_config)
+
+    def run(self, urls: List[str]) -> Dict[str, Dict[str, float]]:
+        """Ingest the given URLs and return per-stage statistics"""
+        # One query up front instead of a lookup per page in the chunk stage
+        self.stored_hashes = self.processor._stored_hashes()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(4)]
+        stages = [
+            Stage("fetch", self._fetch, self.worker_counts["fetch"], queues[0], queues[1]),
+            Stage("chunk", self._chunk, self.worker_counts["chunk"], queues[1], queues[2]),
+            Stage("embed", self._embed, self.worker_counts["embed"], queues[2], queues[3]),
+            Stage("write", self._write, self.worker_counts["write"], queues[3],
+                  setup=self._connect, teardown=lambda conn: conn.close()),
+        ]
+        for stage, downstream in zip(stages, stages[1:]):
+            stage.downstream_workers = downstream.workers
+
+        started = time.perf_counter()
+        for stage in stages:
+            stage.start()
+        # Blocks whenever the fetch queue is full, which throttles the whole pipeline
+        for url in urls:
+            queues[0].put({'url': url})
+        for _ in range(stages[0].workers):
+            queues[0].put(_DONE)
+        for stage in stages:
+            stage.join()
+        elapsed = time.perf_counter() - started
+
+        stats = {}
+        for stage in stages:
+            stats[stage.name] = {
+                "workers": stage.workers,
+                "processed": stage.processed,
+                "failed": stage.failed,
+                "busy_seconds": stage.busy_seconds,
+                "items_per_second": stage.processed / elapsed if elapsed else 0.0,
+                # Share of the stage's worker capacity spent busy; the highest is the bottleneck
+                "utilization": stage.busy_seconds / (elapsed * stage.workers) if elapsed else 0.0,
+            }
+        stats["total"] = {"urls": len(urls), "skipped": self.skipped, "seconds": elapsed}
+        return stats
+
+def print_report(stats: Dict[str, Dict[str, float]]) -> None:
+    """Print per-stage throughput"""
+    total = stats["total"]
+    print(f"\nIngested {total['urls']} URLs in {total['seconds']:.1f}s ({total['skipped']} unchanged)")
+    print(f"{'stage':<8}{'workers':>8}{'done':>8}{'failed':>8}{'items/s':>10}{'busy':>8}")
+    for name in ("fetch", "chunk", "embed", "write"):
+        stage = stats[name]
+        print(f"{name:<8}{stage['workers']:>8}{stage['processed']:>8}{stage['failed']:>8}"
+              f"{stage['items_per_second']:>10.2f}{stage['utilization']:>8.0%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest the documentation through the staged pipeline")
+    parser.add_argument("--limit", type=int, default=SCRAPE_PROCESS_LIMIT, help="Maximum number of pages")
+    parser.add_argument("--force", action="store_true", help="Re-ingest pages even if unchanged")
+    args = parser.parse_args()
+
+    processor = DocumentProcessor(DB_CONFIG)
+    try:
+        urls = get_doc_urls()
+        print(f"Found {len(urls)} URLs to process")
+        stats = IngestionPipeline(processor, force=args.force).run(urls[:args.limit])
+        print_report(stats)
+    finally:
+        processor.close()
+
+if __name__ == "__main__":
+    main()
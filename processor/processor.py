@@ -1,26 +1,24 @@
-from scraper.scraper import get_side_bar_links, scrape_page
+from scraper.discovery import get_doc_urls
+from scraper.fetcher import fetch_pages
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.text_splitter import MarkdownHeaderTextSplitter
 from langchain_community.vectorstores import FAISS
 from langchain_community.embeddings import HuggingFaceEmbeddings
+from processor.embedding_backends import resolve_device
 from config import EMBEDDING_MODEL_CONFIG, TEXT_SPLITTER_CONFIG
-import time
 
 def process_docs():
     #1.get all documentation URLs
-    urls = get_side_bar_links()
+    urls = get_doc_urls()
 
-    #2. scrape and clean content
+    #2. scrape and clean content (concurrent, rate limited per host)
     documents = []
-    for url in urls:
-        content = scrape_page(url)
+    for url, content in fetch_pages(urls):
         if content:
             documents.append({
                 "text": content,
                 "metadata": {"source": url}
             })
-        #rate limiting - pausing for 1 second between each request
-        time.sleep(1)
     
     #Chunk documents
     chunks = chunk_documents(documents)
@@ -31,7 +29,7 @@ def create_vector_store(chunks):
     #embeddings
     embeddings = HuggingFaceEmbeddings(
         model_name=EMBEDDING_MODEL_CONFIG["model_name"],
-        model_kwargs={"device": EMBEDDING_MODEL_CONFIG["device"]}
+        model_kwargs={"device": resolve_device()}
     )
     #create vector store
     vector_store = FAISS.from_documents(chunks, embeddings)
@@ -0,0 +1,23 @@
+from typing import Hashable, List, Sequence, Tuple
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], weights: Sequence[float] = None,
+                           k: int = 60) -> List[Tuple[Hashable, float]]:
+    """Merge ranked lists with reciprocal rank fusion.
+
+    An item scores weight / (k + rank) in every list it appears in (ranks start at
+    1, repeats within a list are ignored), summed over the lists. Returns
+    (item, score) pairs, best first; ties keep the order items were first seen in.
+    """
+    if weights is None:
+        weights = [1.0] * len(rankings)
+    if len(weights) != len(rankings):
+        raise ValueError("Need one weight per ranking")
+    scores = {}
+    for ranking, weight in zip(rankings, weights):
+        seen = set()
+        for rank, item in enumerate(ranking, start=1):
+            if item in seen:
+                continue
+            seen.add(item)
+            scores[item] = scores.get(item, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda pair: -pair[1])
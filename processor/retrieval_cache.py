@@ -0,0 +1,90 @@
+from typing import Any, Callable, Dict, Hashable, List, Optional
+import copy
+import threading
+import time
+from processor.lru_cache import LRUCache
+
+BUMP_GENERATION_SQL = "UPDATE corpus_state SET generation = generation + 1"
+
+class RetrievalCache:
+    """Search results cached per (mode, normalized query, limit, threshold).
+
+    Every entry is tagged with the corpus generation it was computed under. The
+    ingest path bumps the generation in the same transaction as each document
+    write, so an entry is only served while the corpus is unchanged. Reading the
+    generation is one cheap query; with `check_interval_seconds` it is read at
+    most that often, trading that much staleness for fewer round trips. When
+    `read_generation` returns None the generation is unknown and searches run
+    uncached (counted under `bypassed`).
+    """
+
+    def __init__(self, read_generation: Callable[[], int], max_entries: int = 2048,
+                 check_interval_seconds: float = 0, clock: Callable[[], float] = time.monotonic):
+        self.read_generation = read_generation
+        self.check_interval_seconds = check_interval_seconds
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.bypassed = 0
+        self._entries = LRUCache(max_entries)
+        self._generation = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(mode: str, query: str, limit: int, threshold: Any = None) -> Hashable:
+        return (mode, " ".join(query.split()), limit, threshold)
+
+    def generation(self) -> Optional[int]:
+        """Current corpus generation, re-read when the check interval has passed"""
+        now = self.clock()
+        with self._lock:
+            fresh = (self._checked_at is not None and self.check_interval_seconds
+                     and now - self._checked_at < self.check_interval_seconds)
+            if fresh:
+                return self._generation
+        generation = self.read_generation()
+        if generation is None:
+            return None
+        with self._lock:
+            self._generation = generation
+            self._checked_at = now
+        return generation
+
+    def get_or_compute(self, mode: str, query: str, limit: int, threshold: Any,
+                       compute: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Cached results for the search, running `compute` on a miss or after the corpus changed"""
+        key = self.key(mode, query, limit, threshold)
+        generation = self.generation()
+        if generation is None:
+            with self._lock:
+                self.bypassed += 1
+            return compute()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == generation:
+            with self._lock:
+                self.hits += 1
+            # Copies, so callers can annotate their results without touching the cache
+            return copy.deepcopy(entry[1])
+        with self._lock:
+            self.misses += 1
+            if entry is not None:
+                self.stale += 1
+        results = compute()
+        self._entries.put(key, (generation, copy.deepcopy(results)))
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters; `stale` counts misses caused by a newer corpus generation"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "bypassed": self.bypassed,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "generation": self._generation,
+            }
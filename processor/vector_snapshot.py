@@ -0,0 +1,272 @@
+"""Memory-mapped snapshot of the chunk embeddings for Postgres-free semantic search.
+
+    python -m processor.vector_snapshot export --dir .cache/vector_snapshot --dtype float32
+    python -m processor.vector_snapshot bench --dir .cache/vector_snapshot
+
+A snapshot directory holds:
+
+    manifest.json   count, dimensions, dtype, metric and the corpus generation exported
+    embeddings.bin  raw count x dimensions matrix (float16 or float32), memory-mapped on load
+    ids.npy         chunk id of each matrix row
+    norms.npy       squared L2 norm of each row (float32, computed before down-casting)
+    chunks.jsonl    one JSON payload per row: content, metadata, json_blocks, tables
+    offsets.npy     count + 1 byte offsets of the payload lines
+
+Lookups return the same dicts as DocumentProcessor.search, with distances in the
+snapshot metric's units, so a read replica can serve semantic search from a file.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timezone
+import argparse
+import json
+import os
+import time
+import numpy as np
+
+MANIFEST_VERSION = 1
+SEARCH_BLOCK_ROWS = 16384
+
+def write_snapshot(directory: str, rows: Iterable[Tuple[int, List[float], Dict[str, Any]]], count: int,
+                   dimensions: int = 1024, dtype: str = "float32", metric: str = "l2",
+                   generation: Optional[int] = None) -> Dict[str, Any]:
+    """Write `count` (chunk id, embedding, payload) rows as a snapshot and return its manifest.
+
+    Files are written under temporary names and renamed into place, manifest last.
+    """
+    if count == 0:
+        raise ValueError("No embedded chunks to snapshot")
+    os.makedirs(directory, exist_ok=True)
+    path = lambda name: os.path.join(directory, name)
+    # Stored raw (no .npy header) so readers can map it at offset 0
+    matrix = np.memmap(path("embeddings.bin.tmp"), dtype=dtype, mode='w+', shape=(count, dimensions))
+    ids = np.empty(count, dtype=np.int64)
+    norms = np.empty(count, dtype=np.float32)
+    offsets = np.empty(count + 1, dtype=np.int64)
+    offsets[0] = 0
+    written = 0
+    with open(path("chunks.jsonl.tmp"), 'wb') as payloads:
+        for chunk_id, embedding, payload in rows:
+            if written == count:
+                raise ValueError(f"More than {count} rows")
+            vector = np.asarray(embedding, dtype=np.float32)
+            matrix[written] = vector
+            ids[written] = chunk_id
+            norms[written] = float(vector @ vector)
+            payloads.write(json.dumps(payload).encode('utf-8') + b"\n")
+            written += 1
+            offsets[written] = payloads.tell()
+    if written != count:
+        raise ValueError(f"Expected {count} rows, got {written}")
+    matrix.flush()
+    del matrix
+    for name, array in (("ids", ids), ("norms", norms), ("offsets", offsets)):
+        with open(path(f"{name}.tmp.npy"), 'wb') as f:
+            np.save(f, array)
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "count": count,
+        "dimensions": dimensions,
+        "dtype": dtype,
+        "metric": metric,
+        "generation": generation,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    for tmp_name, name in (("embeddings.bin.tmp", "embeddings.bin"), ("chunks.jsonl.tmp", "chunks.jsonl"),
+                           ("ids.tmp.npy", "ids.npy"), ("norms.tmp.npy", "norms.npy"),
+                           ("offsets.tmp.npy", "offsets.npy")):
+        os.replace(path(tmp_name), path(name))
+    with open(path("manifest.json.tmp"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path("manifest.json.tmp"), path("manifest.json"))
+    return manifest
+
+def export_snapshot(processor, directory: str, dtype: str = "float32", metric: str = "l2") -> Dict[str, Any]:
+    """Export every chunk with an embedding from Postgres, streaming through a server-side cursor"""
+    conn = processor.conn
+    # One read-only repeatable-read transaction, so the count, rows and generation agree
+    conn.rollback()
+    conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT generation FROM corpus_state")
+            generation = cur.fetchone()[0]
+            cur.execute("SELECT count(*) FROM document_chunks WHERE embedding IS NOT NULL")
+            count = cur.fetchone()[0]
+
+        def rows():
+            with conn.cursor(name="vector_snapshot_export") as cur:
+                cur.itersize = 2000
+                cur.execute(f"""
+                    SELECT c.id, c.embedding::real[], c.content, c.metadata, {processor._BLOCKS_SELECT}
+                    FROM document_chunks c
+                    {processor._BLOCKS_JOIN}
+                    WHERE c.embedding IS NOT NULL
+                    ORDER BY c.id
+                """)
+                for chunk_id, embedding, content, metadata, json_blocks, tables in cur:
+                    yield chunk_id, embedding, {
+                        "content": content,
+                        "metadata": metadata,
+                        "json_blocks": json_blocks,
+                        "tables": tables,
+                    }
+
+        return write_snapshot(directory, rows(), count, dtype=dtype, metric=metric, generation=generation)
+    finally:
+        conn.rollback()
+        conn.set_session(isolation_level="DEFAULT", readonly="DEFAULT")
+
+class VectorSnapshot:
+    """Exact (numpy) or FAISS top-k search over a snapshot directory.
+
+    The matrix is memory-mapped, so the page cache is shared between processes
+    serving the same snapshot. `backend="faiss"` builds an in-memory flat index, or
+    an IVF index with `faiss_nlist` lists, from the matrix at load time.
+    """
+
+    def __init__(self, directory: str, backend: str = "numpy", faiss_nlist: int = 0, faiss_nprobe: int = 8):
+        with open(os.path.join(directory, "manifest.json"), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest["version"] != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported snapshot version {self.manifest['version']}")
+        self.directory = directory
+        self.metric = self.manifest["metric"]
+        self.count = self.manifest["count"]
+        self.matrix = np.memmap(os.path.join(directory, "embeddings.bin"), dtype=self.manifest["dtype"], mode='r',
+                                shape=(self.count, self.manifest["dimensions"]))
+        self.ids = np.load(os.path.join(directory, "ids.npy"))
+        self.norms = np.load(os.path.join(directory, "norms.npy"))
+        self.offsets = np.load(os.path.join(directory, "offsets.npy"))
+        self._payload_fd = os.open(os.path.join(directory, "chunks.jsonl"), os.O_RDONLY)
+        self.backend = backend
+        self._faiss_index = None
+        if backend == "faiss":
+            self._faiss_index = self._build_faiss_index(faiss_nlist, faiss_nprobe)
+        elif backend != "numpy":
+            raise ValueError(f"Unknown snapshot search backend: {backend}")
+
+    @property
+    def generation(self) -> Optional[int]:
+        return self.manifest["generation"]
+
+    def _build_faiss_index(self, nlist: int, nprobe: int):
+        import faiss
+        vectors = np.ascontiguousarray(self.matrix, dtype=np.float32)
+        dimensions = vectors.shape[1]
+        # Inner product ranks like cosine and ip once rows are normalized; l2 keeps raw vectors
+        if self.metric == "l2":
+            quantizer = faiss.IndexFlatL2(dimensions)
+        else:
+            if self.metric == "cosine":
+                faiss.normalize_L2(vectors)
+            quantizer = faiss.IndexFlatIP(dimensions)
+        index = quantizer
+        if nlist:
+            faiss_metric = faiss.METRIC_L2 if self.metric == "l2" else faiss.METRIC_INNER_PRODUCT
+            index = faiss.IndexIVFFlat(quantizer, dimensions, nlist, faiss_metric)
+            index.train(vectors)
+            index.nprobe = nprobe
+        index.add(vectors)
+        return index
+
+    def _distances(self, dots: np.ndarray, norms: np.ndarray, query_norm2: float) -> np.ndarray:
+        """Distances in the metric's units (matching pgvector) from dot products"""
+        if self.metric == "l2":
+            return np.sqrt(np.maximum(norms - 2 * dots + query_norm2, 0))
+        if self.metric == "cosine":
+            return 1 - dots / np.maximum(np.sqrt(norms * query_norm2), 1e-12)
+        return -dots
+
+    def nearest(self, query_embedding: List[float], limit: int, max_distance: float) -> List[Tuple[int, float]]:
+        """(row, distance) of the nearest rows within `max_distance`, closest first"""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query_norm2 = float(query @ query)
+        if self._faiss_index is not None:
+            search_query = query[None, :].copy()
+            if self.metric == "cosine":
+                search_query /= max(np.sqrt(query_norm2), 1e-12)
+            _, rows = self._faiss_index.search(search_query, limit)
+            rows = rows[0][rows[0] >= 0]
+            distances = self._distances(self.matrix[rows].astype(np.float32) @ query, self.norms[rows], query_norm2)
+        else:
+            # Blocked scan keeps the float32 working set bounded for float16 matrices
+            best_rows, best_distances = [], []
+            for start in range(0, self.count, SEARCH_BLOCK_ROWS):
+                block = np.asarray(self.matrix[start:start + SEARCH_BLOCK_ROWS], dtype=np.float32)
+                block_distances = self._distances(block @ query, self.norms[start:start + len(block)], query_norm2)
+                if len(block_distances) > limit:
+                    top = np.argpartition(block_distances, limit)[:limit]
+                else:
+                    top = np.arange(len(block_distances))
+                best_rows.append(top + start)
+                best_distances.append(block_distances[top])
+            if not best_rows:
+                return []
+            rows = np.concatenate(best_rows)
+            distances = np.concatenate(best_distances)
+        order = np.argsort(distances, kind="stable")[:limit]
+        return [(int(rows[i]), float(distances[i])) for i in order if distances[i] < max_distance]
+
+    def payload(self, row: int) -> Dict[str, Any]:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return json.loads(os.pread(self._payload_fd, end - start, start))
+
+    def search(self, query_embedding: List[float], limit: int, max_distance: float) -> List[Dict[str, Any]]:
+        """Nearest chunks in the DocumentProcessor.search result format"""
+        results = []
+        for row, distance in self.nearest(query_embedding, limit, max_distance):
+            payload = self.payload(row)
+            results.append({
+                "id": int(self.ids[row]),
+                "content": payload["content"],
+                "metadata": payload["metadata"],
+                "json_blocks": payload["json_blocks"],
+                "tables": payload["tables"],
+                "distance": distance,
+            })
+        return results
+
+    def close(self) -> None:
+        os.close(self._payload_fd)
+
+def main():
+    from config import DB_CONFIG, VECTOR_INDEX_CONFIG, RETRIEVAL_CONFIG
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["export", "bench"])
+    parser.add_argument("--dir", default=RETRIEVAL_CONFIG["snapshot_dir"])
+    parser.add_argument("--dtype", default=RETRIEVAL_CONFIG["dtype"], choices=["float16", "float32"])
+    parser.add_argument("--backend", default=RETRIEVAL_CONFIG["snapshot_search"], choices=["numpy", "faiss"])
+    parser.add_argument("--queries", type=int, default=200, help="Random queries for bench")
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        from processor.document_processor import DocumentProcessor
+        processor = DocumentProcessor(DB_CONFIG)
+        try:
+            started = time.perf_counter()
+            manifest = export_snapshot(processor, args.dir, dtype=args.dtype, metric=VECTOR_INDEX_CONFIG["metric"])
+        finally:
+            processor.close()
+        print(f"Exported {manifest['count']} chunks ({manifest['dtype']}, {manifest['metric']}, "
+              f"generation {manifest['generation']}) to {args.dir} in {time.perf_counter() - started:.1f}s")
+        return
+
+    snapshot = VectorSnapshot(args.dir, backend=args.backend, faiss_nlist=RETRIEVAL_CONFIG["faiss_nlist"],
+                              faiss_nprobe=RETRIEVAL_CONFIG["faiss_nprobe"])
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((args.queries, snapshot.manifest["dimensions"])).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        snapshot.search(query, args.limit, float("inf"))
+        latencies.append((time.perf_counter() - started) * 1e6)
+    latencies.sort()
+    print(f"{snapshot.count} rows, {args.backend}: median {latencies[len(latencies) // 2]:.0f} us, "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.0f} us per top-{args.limit} search")
+    snapshot.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,10 @@
 from typing import List, Dict, Any
-from transformers import AutoTokenizer, AutoModel
-import torch
 from processor.document_processor import DocumentProcessor
-from config import DB_CONFIG, EMBEDDING_MODEL_CONFIG, GROQ_CONFIG, SEARCH_MODE, SYSTEM_PROMPT, NO_RESULTS_MESSAGE, FALLBACK_CONTEXT_MESSAGE
+from processor.answer_cache import AnswerCache
+from config import DB_CONFIG, GROQ_CONFIG, ANSWER_CACHE_CONFIG, SEARCH_MODE, SYSTEM_PROMPT, NO_RESULTS_MESSAGE, FALLBACK_CONTEXT_MESSAGE
 import logging
 import os
-from groq import Groq
+import time
 
 class QueryHandler:
     def __init__(self):
@@ -14,22 +13,35 @@ class QueryHandler:
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         
-        # Initialize document processor
+        # Initialize document processor (it uses the process-wide embedding service,
+        # so the model is loaded once, on the first query)
         self.doc_processor = DocumentProcessor(DB_CONFIG)
         
-        # Initialize model and tokenizer for embeddings
-        self.model_name = EMBEDDING_MODEL_CONFIG["model_name"]
-        self.device = EMBEDDING_MODEL_CONFIG["device"]
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModel.from_pretrained(self.model_name).to(self.device)
+        # Near-duplicate questions reuse an earlier answer instead of retrieval + completion
+        self.answer_cache = None
+        if ANSWER_CACHE_CONFIG["enabled"]:
+            self.answer_cache = AnswerCache(
+                self.doc_processor,
+                similarity_threshold=ANSWER_CACHE_CONFIG["similarity_threshold"],
+                ttl_hours=ANSWER_CACHE_CONFIG["ttl_hours"]
+            )
         
         # Initialize Groq client for text generation
+        started = time.perf_counter()
         try:
+            from groq import Groq
             self.groq_client = Groq(api_key=GROQ_CONFIG["api_key"])
             self.logger.info("Groq client initialized successfully")
         except Exception as e:
             self.logger.error(f"Failed to initialize Groq client: {str(e)}")
             self.groq_client = None
+        self.startup_timings = {"groq client": time.perf_counter() - started}
+
+    def warm_up(self) -> Dict[str, float]:
+        """Load the embedding model and connect to the database (safe to run in a background thread)"""
+        timings = self.doc_processor.warm_up()
+        self.startup_timings.update(timings)
+        return timings
         
     def format_context(self, search_results: List[Dict[str, Any]]) -> str:
         """Format search results into a context string"""
@@ -73,7 +85,17 @@ class QueryHandler:
 
     def get_response(self, query: str, min_distance: float = 0.8, limit: int = 1) -> str:
         """Get response for a query using RAG approach"""
+        started = time.perf_counter()
         try:
+            query_embedding = None
+            use_answer_cache = self.answer_cache is not None and SEARCH_MODE in ANSWER_CACHE_CONFIG["modes"]
+            if use_answer_cache:
+                # Shares the query embedding cache with the semantic search below
+                query_embedding = self.doc_processor.embeddings.embed_query(query)
+                cached_answer = self.answer_cache.lookup(query_embedding, SEARCH_MODE, limit, min_distance)
+                if cached_answer is not None:
+                    return cached_answer
+            
             # Get relevant documents based on SEARCH_MODE
             if SEARCH_MODE == "hybrid":
                 search_results = self.doc_processor.hybrid_search(
@@ -86,6 +108,11 @@ class QueryHandler:
                     query=query,
                     limit=limit
                 )
+            elif SEARCH_MODE == "identifier":
+                search_results = self.doc_processor.identifier_search(
+                    query=query,
+                    limit=limit
+                )
             else:  # Default to semantic
                 search_results = self.doc_processor.search(
                     query=query,
@@ -115,23 +142,18 @@ class QueryHandler:
                         temperature=GROQ_CONFIG["temperature"],
                         max_tokens=GROQ_CONFIG["max_tokens"]
                     )
-                    return response.choices[0].message.content
+                    answer = response.choices[0].message.content
+                    if use_answer_cache:
+                        self.answer_cache.store(
+                            query, query_embedding, SEARCH_MODE, limit, min_distance, answer,
+                            chunk_ids=[result['id'] for result in search_results],
+                            generation_seconds=time.perf_counter() - started
+                        )
+                    return answer
                 except Exception as e:
                     self.logger.error(f"Error using Groq API: {str(e)}")
                     # Fall back to using context directly if Groq fails
                     return FALLBACK_CONTEXT_MESSAGE.format(context=context)
-            # else:
-            #     # Fallback to old method if Groq client not available
-            #     inputs = self.tokenizer(prompt, return_tensors="pt", truncation=True, max_length=512).to(self.device)
-                
-            #     with torch.no_grad():
-            #         outputs = self.model(**inputs)
-            #         # Get the model's output logits and convert to text
-            #         logits = outputs.logits if hasattr(outputs, 'logits') else outputs.last_hidden_state
-            #         predicted_tokens = torch.argmax(logits, dim=-1)
-            #         model_response = self.tokenizer.decode(predicted_tokens[0], skip_special_tokens=True)
-                
-            #     return model_response
             
         except Exception as e:
             self.logger.error(f"Error generating response: {str(e)}")
@@ -140,6 +162,9 @@ class QueryHandler:
     def close(self):
         """Clean up resources"""
         if hasattr(self, 'doc_processor'):
+            self.logger.info(f"Query embedding cache: {self.doc_processor.embeddings.query_cache.stats()}")
+            if self.answer_cache:
+                self.logger.info(f"Answer cache: {self.answer_cache.stats()}")
             self.doc_processor.close()
 
 # Example usage
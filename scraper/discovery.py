@@ -0,0 +1,133 @@
+from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urljoin, urldefrag
+import json
+import os
+import re
+import requests
+from bs4 import BeautifulSoup
+from scraper.scraper import get_side_bar_links
+from config import URL_PATHS, DISCOVERY_CONFIG
+
+MANIFEST_VERSION = 1
+
+def _docs_prefix() -> str:
+    """Path prefix shared by every documentation page, e.g. /sp-api/docs/"""
+    return URL_PATHS["api_docs_url"].rsplit('/', 1)[0] + '/'
+
+def _normalize_link(href: str) -> Optional[str]:
+    """Absolute documentation URL without fragment or query, or None for other links"""
+    url = urldefrag(urljoin(URL_PATHS["base_url"], href))[0].split('?', 1)[0]
+    if not url.startswith(URL_PATHS["base_url"] + _docs_prefix()):
+        return None
+    return url.rstrip('/')
+
+def discover_links_http(timeout: int = 30) -> List[str]:
+    """Collect documentation links from the sidebar markup of the docs landing page.
+
+    The sidebar is server-rendered, so a plain GET is enough; links that only
+    appear in the page's hydration JSON are picked up by matching doc paths in
+    the raw HTML.
+    """
+    start_url = URL_PATHS["base_url"] + URL_PATHS["api_docs_url"]
+    resp = requests.get(start_url, timeout=timeout)
+    if resp.status_code != 200:
+        print(f"Failed to fetch {start_url} with status {resp.status_code}")
+        return []
+    soup = BeautifulSoup(resp.text, 'html.parser')
+    links = set()
+    for anchor in soup.select("#hub-sidebar a[href], a[class*='Sidebar-link'][href]"):
+        url = _normalize_link(anchor['href'])
+        if url:
+            links.add(url)
+    # The path must run up to its closing quote (possibly escaped) or a query/fragment,
+    # so asset references such as /sp-api/docs/diagram.png are not cut into page URLs
+    pattern = r'(["\'])(' + re.escape(_docs_prefix()) + r'[A-Za-z0-9_\-/]+)(?:[?#][^"\'\\]*)?\\?\1'
+    for match in re.finditer(pattern, resp.text):
+        url = _normalize_link(match.group(2))
+        if url:
+            links.add(url)
+    return sorted(links)
+
+def discover_links_sitemap(timeout: int = 30) -> List[str]:
+    """Collect documentation links from the site's sitemap.xml"""
+    resp = requests.get(URL_PATHS["base_url"] + "/sitemap.xml", timeout=timeout)
+    if resp.status_code != 200:
+        print(f"Failed to fetch sitemap with status {resp.status_code}")
+        return []
+    links = set()
+    for loc in re.findall(r"<loc>\s*([^<\s]+)\s*</loc>", resp.text):
+        url = _normalize_link(loc)
+        if url:
+            links.add(url)
+    return sorted(links)
+
+def load_manifest(path: str, ttl_hours: float) -> Optional[List[str]]:
+    """URLs from a manifest file, or None if it is missing, from another version or older than the TTL"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        created_at = datetime.fromisoformat(manifest["created_at"])
+        if datetime.now(timezone.utc) - created_at > timedelta(hours=ttl_hours):
+            return None
+        return manifest["urls"]
+    except (ValueError, KeyError) as e:
+        print(f"Ignoring unreadable URL manifest {path}: {str(e)}")
+        return None
+
+def save_manifest(path: str, urls: List[str], source: str) -> None:
+    """Write discovered URLs with a version and timestamp"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "source": source,
+        "start_url": URL_PATHS["base_url"] + URL_PATHS["api_docs_url"],
+        "urls": urls,
+    }
+    # Write then rename so a crash never leaves a truncated manifest behind
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+def get_doc_urls(refresh: bool = False, use_selenium: bool = None) -> List[str]:
+    """Documentation URLs from the cached manifest, rediscovering them once it expires.
+
+    Discovery is HTTP-only (sidebar markup, then sitemap). The Selenium sidebar
+    crawl is only used when enabled via DISCOVERY_CONFIG or `use_selenium`.
+    """
+    path = DISCOVERY_CONFIG["manifest_path"]
+    if not refresh:
+        urls = load_manifest(path, DISCOVERY_CONFIG["ttl_hours"])
+        if urls:
+            return urls
+
+    if use_selenium is None:
+        use_selenium = DISCOVERY_CONFIG["selenium_fallback"]
+    source = "http"
+    try:
+        urls = discover_links_http()
+    except requests.RequestException as e:
+        print(f"HTTP discovery failed: {str(e)}")
+        urls = []
+    if not urls:
+        source = "sitemap"
+        try:
+            urls = discover_links_sitemap()
+        except requests.RequestException as e:
+            print(f"Sitemap discovery failed: {str(e)}")
+            urls = []
+    if not urls and use_selenium:
+        source = "selenium"
+        urls = sorted(get_side_bar_links())
+
+    if urls:
+        save_manifest(path, urls, source)
+    return urls
@@ -0,0 +1,57 @@
+from typing import Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from scraper.scraper import scrape_page
+from scraper.rate_limiter import HostRateLimiter
+from config import FETCH_CONFIG
+import time
+
+def fetch_with_retries(url: str, limiter: HostRateLimiter, fetch=scrape_page,
+                       max_retries: int = None, backoff_seconds: float = None) -> Optional[str]:
+    """Fetch one page under the rate limiter, retrying empty results with exponential backoff"""
+    max_retries = FETCH_CONFIG["max_retries"] if max_retries is None else max_retries
+    backoff_seconds = FETCH_CONFIG["backoff_seconds"] if backoff_seconds is None else backoff_seconds
+    for attempt in range(max_retries + 1):
+        limiter.acquire(url)
+        content = fetch(url)
+        if content:
+            return content
+        if attempt < max_retries:
+            delay = backoff_seconds * (2 ** attempt)
+            print(f"Retrying {url} in {delay:.1f}s (attempt {attempt + 2} of {max_retries + 1})")
+            time.sleep(delay)
+    return None
+
+def new_rate_limiter(requests_per_second: float = None, burst: int = None) -> HostRateLimiter:
+    """Per-host rate limiter using FETCH_CONFIG defaults"""
+    return HostRateLimiter(
+        requests_per_second or FETCH_CONFIG["requests_per_second"],
+        burst or FETCH_CONFIG["burst"]
+    )
+
+def fetch_pages(urls: List[str], fetch=scrape_page, max_workers: int = None,
+                requests_per_second: float = None, burst: int = None,
+                max_retries: int = None, backoff_seconds: float = None) -> Iterator[Tuple[str, Optional[str]]]:
+    """Fetch pages concurrently and yield (url, content) pairs as they complete.
+
+    Requests are spread over a thread pool but every request first takes a token
+    from its host's bucket, so the request rate against a site never exceeds
+    `requests_per_second`. Pages that come back empty are retried with
+    exponential backoff; content is None once retries are exhausted.
+    """
+    limiter = new_rate_limiter(requests_per_second, burst)
+    pool = ThreadPoolExecutor(max_workers=max_workers or FETCH_CONFIG["max_workers"])
+    try:
+        futures = {
+            pool.submit(fetch_with_retries, url, limiter, fetch, max_retries, backoff_seconds): url
+            for url in urls
+        }
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                yield url, future.result()
+            except Exception as e:
+                print(f"Error fetching {url}: {str(e)}")
+                yield url, None
+    finally:
+        # A consumer that stops early (GeneratorExit) only waits for the fetches already running
+        pool.shutdown(wait=True, cancel_futures=True)
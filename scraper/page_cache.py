@@ -0,0 +1,76 @@
+from typing import Any, Dict, Iterator, Optional
+from datetime import datetime, timezone
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+class PageCache:
+    """Gzip-compressed local store of raw HTML and extracted markdown, keyed by URL.
+
+    Each page lives in its own file named after the SHA-256 of its URL, so the
+    whole corpus can be re-chunked and re-embedded without touching the network.
+    """
+
+    def __init__(self, directory: str, compresslevel: int = 6):
+        self.directory = directory
+        self.compresslevel = compresslevel
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest() + ".json.gz")
+
+    def put(self, url: str, html: str, markdown: str, extractor: str = "trafilatura") -> None:
+        """Store a page, replacing any previous copy"""
+        entry = {
+            "url": url,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "extractor": extractor,
+            "html": html,
+            "markdown": markdown,
+        }
+        path = self._path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=self.compresslevel) as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.writes += 1
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Cached entry for a URL (url, fetched_at, extractor, html, markdown), or None"""
+        path = self._path(url)
+        entry = None
+        if os.path.exists(path):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over every cached page (not counted as lookups in the hit/miss stats)"""
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".json.gz"):
+                continue
+            with gzip.open(os.path.join(self.directory, name), 'rt', encoding='utf-8') as f:
+                yield json.load(f)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for reporting"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -1,14 +1,16 @@
 from trafilatura import fetch_url, extract
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from config import URL_PATHS
 import time
 import requests
 from bs4 import BeautifulSoup
 
 def get_side_bar_links():
+    # Selenium is only needed for this opt-in fallback; see scraper.discovery.get_doc_urls
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     driver = webdriver.Chrome()
     try:
         driver.get(URL_PATHS["base_url"] + URL_PATHS["api_docs_url"])
@@ -43,7 +45,8 @@ def get_side_bar_links():
     finally:
         driver.quit()
 
-def scrape_page(url, use_bs=False):
+def scrape_page(url, use_bs=False, cache=None):
+    """Download a page and convert it to markdown; raw HTML and markdown are stored in `cache` if given"""
     if not use_bs:
         try:
             downloaded = fetch_url(url)
@@ -51,14 +54,13 @@ def scrape_page(url, use_bs=False):
                 print(f"Failed to download content from {url}")
                 return None
             
-            content = extract(
-                downloaded,
-                output_format = "markdown"
-                )
+            content = extract_markdown(downloaded)
             if not content:
                 print(f"Failed to extract content from {url}")
                 return None
             
+            if cache is not None:
+                cache.put(url, downloaded, content, extractor="trafilatura")
             return content
         except Exception as e:
             print(f"Error scraping {url}: {str(e)}")
@@ -69,69 +71,83 @@ def scrape_page(url, use_bs=False):
             if resp.status_code != 200:
                 print(f"Failed to fetch {url} with status {resp.status_code}")
                 return None
-            soup = BeautifulSoup(resp.text, 'html.parser')
-            # Remove the value of the 'dehydrated' attribute from all elements
-            for tag in soup.find_all(attrs={'dehydrated': True}):
-                tag['dehydrated'] = ''
-            # Only extract from <article class="rm-Article ">
-            main = soup.find('article')
-            if not main:
-                print("Main article container not found.")
-                return None
-            lines = []
-            table_signatures = set()  # Track unique tables
-            for tag in main.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'table', 'pre', 'code', 'ul', 'ol', 'li'], recursive=True):
-                if tag.name == 'h1':
-                    lines.append(f"# {tag.get_text(strip=True)}\n")
-                elif tag.name == 'h2':
-                    lines.append(f"## {tag.get_text(strip=True)}\n")
-                elif tag.name == 'h3':
-                    lines.append(f"### {tag.get_text(strip=True)}\n")
-                elif tag.name == 'h4':
-                    lines.append(f"#### {tag.get_text(strip=True)}\n")
-                elif tag.name == 'h5':
-                    lines.append(f"##### {tag.get_text(strip=True)}\n")
-                elif tag.name == 'h6':
-                    lines.append(f"###### {tag.get_text(strip=True)}\n")
-                elif tag.name == 'p':
-                    lines.append(tag.get_text(strip=True) + '\n')
-                elif tag.name == 'ul':
-                    for li in tag.find_all('li', recursive=False):
-                        lines.append(f"- {li.get_text(strip=True)}\n")
-                elif tag.name == 'ol':
-                    for idx, li in enumerate(tag.find_all('li', recursive=False), 1):
-                        lines.append(f"{idx}. {li.get_text(strip=True)}\n")
-                elif tag.name == 'table':
-                    # Improved deduplication: normalize cell text, ignore empty rows
-                    rows = tag.find_all('tr')
-                    table_signature = []
-                    for row in rows:
-                        cols = [col.get_text(strip=True).lower() for col in row.find_all(['th', 'td'])]
-                        if cols:  # Ignore empty rows
-                            table_signature.append('|'.join(cols))
-                    signature_str = '\n'.join(table_signature)
-                    if signature_str in table_signatures:
-                        continue  # Skip duplicate table
-                    table_signatures.add(signature_str)
-
-                    md_table = []
-                    for i, row in enumerate(rows):
-                        cols = [col.get_text(strip=True) for col in row.find_all(['th', 'td'])]
-                        md_table.append('| ' + ' | '.join(cols) + ' |')
-                        if i == 0:
-                            md_table.append('|' + '|'.join(['---'] * len(cols)) + '|')
-                    lines.append('\n'.join(md_table) + '\n')
-                elif tag.name in ['pre', 'code']:
-                    # Only process if not already handled as data-lang="json"
-                    if tag.has_attr('data-lang') and tag['data-lang'] == 'json':
-                        continue
-                    code_text = tag.get_text('\n')
-                    code_text_stripped = code_text.strip()
-                    if code_text_stripped.startswith('{') and code_text_stripped.endswith('}'):
-                        lines.append(f"```\n{code_text}\n```\n")
-                    elif tag.name == 'pre':
-                        lines.append(f"CODE:\n{code_text}:CODE\n")
-            return '\n'.join(lines)
+            content = extract_markdown_bs(resp.text)
+            if content and cache is not None:
+                cache.put(url, resp.text, content, extractor="beautifulsoup")
+            return content
         except Exception as e:
             print(f"Error scraping with BeautifulSoup {url}: {str(e)}")
             return None
+
+def extract_markdown(html):
+    """Convert downloaded HTML to markdown with trafilatura"""
+    return extract(
+        html,
+        output_format = "markdown"
+        )
+
+def extract_markdown_bs(html):
+    """Convert the page's <article> to markdown with BeautifulSoup"""
+    soup = BeautifulSoup(html, 'html.parser')
+    # Remove the value of the 'dehydrated' attribute from all elements
+    for tag in soup.find_all(attrs={'dehydrated': True}):
+        tag['dehydrated'] = ''
+    # Only extract from <article class="rm-Article ">
+    main = soup.find('article')
+    if not main:
+        print("Main article container not found.")
+        return None
+    lines = []
+    table_signatures = set()  # Track unique tables
+    for tag in main.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'table', 'pre', 'code', 'ul', 'ol', 'li'], recursive=True):
+        if tag.name == 'h1':
+            lines.append(f"# {tag.get_text(strip=True)}\n")
+        elif tag.name == 'h2':
+            lines.append(f"## {tag.get_text(strip=True)}\n")
+        elif tag.name == 'h3':
+            lines.append(f"### {tag.get_text(strip=True)}\n")
+        elif tag.name == 'h4':
+            lines.append(f"#### {tag.get_text(strip=True)}\n")
+        elif tag.name == 'h5':
+            lines.append(f"##### {tag.get_text(strip=True)}\n")
+        elif tag.name == 'h6':
+            lines.append(f"###### {tag.get_text(strip=True)}\n")
+        elif tag.name == 'p':
+            lines.append(tag.get_text(strip=True) + '\n')
+        elif tag.name == 'ul':
+            for li in tag.find_all('li', recursive=False):
+                lines.append(f"- {li.get_text(strip=True)}\n")
+        elif tag.name == 'ol':
+            for idx, li in enumerate(tag.find_all('li', recursive=False), 1):
+                lines.append(f"{idx}. {li.get_text(strip=True)}\n")
+        elif tag.name == 'table':
+            # Improved deduplication: normalize cell text, ignore empty rows
+            rows = tag.find_all('tr')
+            table_signature = []
+            for row in rows:
+                cols = [col.get_text(strip=True).lower() for col in row.find_all(['th', 'td'])]
+                if cols:  # Ignore empty rows
+                    table_signature.append('|'.join(cols))
+            signature_str = '\n'.join(table_signature)
+            if signature_str in table_signatures:
+                continue  # Skip duplicate table
+            table_signatures.add(signature_str)
+
+            md_table = []
+            for i, row in enumerate(rows):
+                cols = [col.get_text(strip=True) for col in row.find_all(['th', 'td'])]
+                md_table.append('| ' + ' | '.join(cols) + ' |')
+                if i == 0:
+                    md_table.append('|' + '|'.join(['---'] * len(cols)) + '|')
+            lines.append('\n'.join(md_table) + '\n')
+        elif tag.name in ['pre', 'code']:
+            # Only process if not already handled as data-lang="json"
+            if tag.has_attr('data-lang') and tag['data-lang'] == 'json':
+                continue
+            code_text = tag.get_text('\n')
+            code_text_stripped = code_text.strip()
+            if code_text_stripped.startswith('{') and code_text_stripped.endswith('}'):
+                lines.append(f"```\n{code_text}\n```\n")
+            elif tag.name == 'pre':
+                lines.append(f"CODE:\n{code_text}:CODE\n")
+    return '\n'.join(lines)
@@ -0,0 +1,20 @@
+import unittest
+from processor.answer_cache import AnswerCache
+
+class UnreachableProcessor:
+    """A processor whose database cannot be reached, as on a snapshot replica."""
+    @property
+    def conn(self):
+        raise ConnectionError("could not connect to server")
+
+class TestAnswerCache(unittest.TestCase):
+    def test_unreachable_database_is_a_miss(self):
+        """A failed connection is logged and treated as a miss instead of raising."""
+        cache = AnswerCache(UnreachableProcessor())
+        with self.assertLogs("processor.answer_cache", level="ERROR"):
+            self.assertIsNone(cache.lookup([0.0] * 1024, "semantic", 5, 1.5))
+            cache.store("q", [0.0] * 1024, "semantic", 5, 1.5, "answer", [1], 1.0)
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (0, 1))
+
+if __name__ == '__main__':
+    unittest.main()
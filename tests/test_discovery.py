@@ -0,0 +1,146 @@
+import unittest
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+from scraper import discovery
+from scraper.discovery import (MANIFEST_VERSION, discover_links_http, discover_links_sitemap, get_doc_urls,
+                               load_manifest, save_manifest)
+
+BASE = "https://developer-docs.amazon.com"
+
+LANDING_PAGE = """
+<html><body>
+<nav id="hub-sidebar">
+  <a href="/sp-api/docs/orders-api">Orders</a>
+  <a href="/sp-api/docs/reports-api#overview">Reports</a>
+  <a href="https://example.com/elsewhere">Elsewhere</a>
+</nav>
+<img src="/sp-api/docs/images/diagram.png">
+<script>{"links": [{\\"href\\":\\"/sp-api/docs/feeds-api\\"}], "icon": "/sp-api/docs/icons/logo.svg",
+         "page": "/sp-api/docs/catalog-api?lang=en"}</script>
+</body></html>
+"""
+
+SITEMAP = f"""<?xml version="1.0"?>
+<urlset>
+  <url><loc>{BASE}/sp-api/docs/orders-api</loc></url>
+  <url><loc> {BASE}/sp-api/docs/tokens-api/ </loc></url>
+  <url><loc>{BASE}/other/page</loc></url>
+</urlset>
+"""
+
+def response(text, status_code=200):
+    return Mock(status_code=status_code, text=text)
+
+class TestHttpDiscovery(unittest.TestCase):
+    @patch('scraper.discovery.requests.get')
+    def test_sidebar_and_raw_html_links(self, mock_get):
+        """Sidebar anchors and quoted doc paths are collected; assets and foreign links are not."""
+        mock_get.return_value = response(LANDING_PAGE)
+        self.assertEqual(discover_links_http(), [
+            f"{BASE}/sp-api/docs/catalog-api",
+            f"{BASE}/sp-api/docs/feeds-api",
+            f"{BASE}/sp-api/docs/orders-api",
+            f"{BASE}/sp-api/docs/reports-api",
+        ])
+
+    @patch('scraper.discovery.requests.get')
+    def test_failed_request_returns_nothing(self, mock_get):
+        mock_get.return_value = response("", status_code=503)
+        self.assertEqual(discover_links_http(), [])
+
+    @patch('scraper.discovery.requests.get')
+    def test_sitemap_links(self, mock_get):
+        """Sitemap locations are normalized and filtered to the docs prefix."""
+        mock_get.return_value = response(SITEMAP)
+        self.assertEqual(discover_links_sitemap(), [f"{BASE}/sp-api/docs/orders-api",
+                                                    f"{BASE}/sp-api/docs/tokens-api"])
+        self.assertTrue(mock_get.call_args.args[0].endswith("/sitemap.xml"))
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "cache", "url_manifest.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def rewrite(self, **changes):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        manifest.update(changes)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+
+    def test_round_trip(self):
+        save_manifest(self.path, ["a", "b"], "http")
+        self.assertEqual(load_manifest(self.path, ttl_hours=24), ["a", "b"])
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_expired_manifest(self):
+        save_manifest(self.path, ["a"], "http")
+        self.rewrite(created_at=(datetime.now(timezone.utc) - timedelta(hours=25)).isoformat())
+        self.assertIsNone(load_manifest(self.path, ttl_hours=24))
+
+    def test_other_version_is_ignored(self):
+        save_manifest(self.path, ["a"], "http")
+        self.rewrite(version=MANIFEST_VERSION + 1)
+        self.assertIsNone(load_manifest(self.path, ttl_hours=24))
+
+    def test_missing_or_corrupt_manifest(self):
+        self.assertIsNone(load_manifest(self.path, ttl_hours=24))
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("{not json")
+        self.assertIsNone(load_manifest(self.path, ttl_hours=24))
+
+class TestGetDocUrls(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "url_manifest.json")
+        config = patch.dict(discovery.DISCOVERY_CONFIG, {"manifest_path": self.path, "ttl_hours": 24,
+                                                         "selenium_fallback": False})
+        config.start()
+        self.addCleanup(config.stop)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    @patch('scraper.discovery.requests.get')
+    def test_fresh_manifest_skips_discovery(self, mock_get):
+        save_manifest(self.path, ["cached"], "http")
+        self.assertEqual(get_doc_urls(), ["cached"])
+        mock_get.assert_not_called()
+
+    @patch('scraper.discovery.requests.get')
+    def test_sitemap_fallback_is_saved(self, mock_get):
+        """An empty landing page falls back to the sitemap, and the result is cached with its source."""
+        mock_get.side_effect = [response("<html></html>"), response(SITEMAP)]
+        urls = get_doc_urls()
+        self.assertEqual(len(urls), 2)
+        with open(self.path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.assertEqual((manifest["source"], manifest["urls"]), ("sitemap", urls))
+
+    @patch('scraper.discovery.requests.get')
+    def test_sitemap_fallback_after_request_error(self, mock_get):
+        """A landing page request that raises still falls back to the sitemap."""
+        mock_get.side_effect = [discovery.requests.ConnectionError("reset"), response(SITEMAP)]
+        self.assertEqual(len(get_doc_urls()), 2)
+
+    @patch('scraper.discovery.requests.get')
+    def test_nothing_found_when_every_request_fails(self, mock_get):
+        mock_get.side_effect = discovery.requests.Timeout("timed out")
+        self.assertEqual(get_doc_urls(), [])
+        self.assertFalse(os.path.exists(self.path))
+
+    @patch('scraper.discovery.requests.get')
+    def test_refresh_ignores_manifest(self, mock_get):
+        save_manifest(self.path, ["cached"], "http")
+        mock_get.return_value = response(LANDING_PAGE)
+        self.assertEqual(len(get_doc_urls(refresh=True)), 4)
+
+if __name__ == '__main__':
+    unittest.main()
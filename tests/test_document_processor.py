@@ -1,10 +1,17 @@
 import unittest
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 import json
 import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from psycopg2.pool import PoolError
 from processor.document_processor import DocumentProcessor
+from processor.embedding_service import EmbeddingService
 from scraper.scraper import scrape_page
-from config import DB_CONFIG, URL_PATHS
+from config import DB_CONFIG, HYBRID_CONFIG, JOURNAL_CONFIG, URL_PATHS
 
 class TestDocumentProcessor(unittest.TestCase):
     @classmethod
@@ -19,6 +26,25 @@ class TestDocumentProcessor(unittest.TestCase):
         self.db_config = DB_CONFIG
         self.processor = DocumentProcessor(self.db_config)
         
+    def use_mock_backend(self, mock_backend):
+        """Give the processor its own embedding service on a mocked backend.
+
+        The process-wide service may already hold a real model, so patching the
+        backend class alone would not reach it. The chunk embedding cache is
+        disabled so every chunk goes through embed_documents.
+        """
+        mock_backend.return_value.embed_documents.side_effect = lambda texts: [[0.1] * 1024 for _ in texts]
+        self.processor.embeddings = EmbeddingService(self.processor.embeddings.model_name)
+        self.processor.embedding_cache = None
+        return mock_backend.return_value
+
+    def assert_batched(self, backend):
+        """Chunks were embedded through embed_documents in batches, never one query at a time."""
+        self.assertTrue(backend.embed_documents.called)
+        backend.embed_query.assert_not_called()
+        for call in backend.embed_documents.call_args_list:
+            self.assertLessEqual(len(call.args[0]), self.processor.embedding_batch_size)
+
     def tearDown(self):
         """Clean up after each test method."""
         self.logger.info("Tearing down test...")
@@ -51,10 +77,33 @@ class TestDocumentProcessor(unittest.TestCase):
         self.assertEqual(len(json_blocks), 1)
         self.assertEqual(json_blocks[0]['content'], {"key": "value"})
 
-    @patch('processor.document_processor.HuggingFaceEmbeddings')
-    def test_process_document_with_mock_data(self, mock_embeddings):
+    def test_pooled_cursor_waits_for_a_free_connection(self):
+        """More concurrent borrowers than pooled connections wait instead of raising PoolError."""
+        borrowed, peak, lock = [0], [0], threading.Lock()
+        def getconn():
+            with lock:
+                if borrowed[0] == HYBRID_CONFIG["pool_size"]:
+                    raise PoolError("connection pool exhausted")
+                borrowed[0] += 1
+                peak[0] = max(peak[0], borrowed[0])
+            return MagicMock()
+        def putconn(conn):
+            with lock:
+                borrowed[0] -= 1
+        self.processor._pool = Mock(getconn=getconn, putconn=putconn)
+        def borrow():
+            with self.processor._pooled_cursor():
+                time.sleep(0.01)
+        with ThreadPoolExecutor(max_workers=HYBRID_CONFIG["pool_size"] * 3) as executor:
+            for future in [executor.submit(borrow) for _ in range(HYBRID_CONFIG["pool_size"] * 6)]:
+                future.result()
+        self.assertEqual(peak[0], HYBRID_CONFIG["pool_size"])
+        self.processor._pool = None
+
+    @patch('processor.embedding_service.create_embedding_backend')
+    def test_process_document_with_mock_data(self, mock_backend):
         """Test document processing with mock data."""
-        mock_embeddings.return_value.embed_query.return_value = [0.1] * 1024
+        backend = self.use_mock_backend(mock_backend)
         
         test_content = """
         # Header 1
@@ -76,11 +125,12 @@ class TestDocumentProcessor(unittest.TestCase):
             self.assertTrue(True)
         except Exception as e:
             self.fail(f"process_document raised an exception: {str(e)}")
+        self.assert_batched(backend)
 
-    @patch('processor.document_processor.HuggingFaceEmbeddings')
-    def test_process_document_with_scraper(self, mock_embeddings):
+    @patch('processor.embedding_service.create_embedding_backend')
+    def test_process_document_with_scraper(self, mock_backend):
         """Test document processing with real scraping."""
-        mock_embeddings.return_value.embed_query.return_value = [0.1] * 1024
+        backend = self.use_mock_backend(mock_backend)
         
         # Use a test URL from your API docs
         test_url = "https://developer-docs.amazon.com/sp-api/docs/orders-api-v0-use-case-guide"
@@ -101,6 +151,7 @@ class TestDocumentProcessor(unittest.TestCase):
             self.assertTrue(True)
         except Exception as e:
             self.fail(f"process_document with scraped content raised an exception: {str(e)}")
+        self.assert_batched(backend)
 
     def test_database_connection(self):
         """Test database operations"""
@@ -227,16 +278,26 @@ class TestDocumentProcessor(unittest.TestCase):
             self.logger.error(f"Failed to set up database: {str(e)}", exc_info=True)
             return False
 
-    @patch('processor.document_processor.HuggingFaceEmbeddings')
+    @patch('processor.embedding_service.create_embedding_backend')
     @patch('scraper.scraper.scrape_page')
-    @patch('scraper.scraper.get_side_bar_links')
-    def test_scrape_and_process_docs(self, mock_get_side_bar_links, mock_scrape_page, mock_embeddings):
-        """Test scrape_and_process_docs with mocked sidebar links and page content."""
-        try:
-            self.processor.scrape_and_process_docs(500)
-            self.assertTrue(True)
-        except Exception as e:
-            self.fail(f"scrape_and_process_docs raised an exception: {str(e)}")
+    @patch('scraper.discovery.get_doc_urls')
+    def test_scrape_and_process_docs(self, mock_get_doc_urls, mock_scrape_page, mock_backend):
+        """Test scrape_and_process_docs with mocked discovery and page content."""
+        backend = self.use_mock_backend(mock_backend)
+        urls = [f"{URL_PATHS['base_url']}/sp-api/docs/test-page-{i}" for i in range(2)]
+        mock_get_doc_urls.return_value = urls
+        mock_scrape_page.side_effect = lambda url, cache=None: f"# Test page\n\nContent of {url}"
+        
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                patch.dict(JOURNAL_CONFIG, {"path": os.path.join(tmpdir, "journal.sqlite3")}):
+            try:
+                self.processor.scrape_and_process_docs(500)
+            except Exception as e:
+                self.fail(f"scrape_and_process_docs raised an exception: {str(e)}")
+        
+        mock_get_doc_urls.assert_called_once()
+        self.assertEqual(sorted(call.args[0] for call in mock_scrape_page.call_args_list), urls)
+        self.assert_batched(backend)
 
 if __name__ == '__main__':
     # Create a test loader
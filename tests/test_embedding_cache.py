@@ -0,0 +1,68 @@
+import unittest
+import os
+import tempfile
+from processor.embedding_cache import EmbeddingCache
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        """Create a cache in a temporary directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "embeddings.sqlite3")
+        self.cache = EmbeddingCache(self.path, model_name="test-model", max_entries=3)
+
+    def tearDown(self):
+        """Close the cache and remove its file."""
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        """Stored vectors come back as float32 values in input order."""
+        self.cache.put_many(["alpha", "beta"], [[0.5, 1.0], [0.25, -2.0]])
+        vectors = self.cache.get_many(["beta", "gamma", "alpha"])
+        self.assertEqual(vectors, [[0.25, -2.0], None, [0.5, 1.0]])
+        self.assertEqual(self.cache.hits, 2)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_whitespace_is_normalized(self):
+        """Texts that only differ in whitespace share an entry."""
+        self.cache.put_many(["get  Orders\n"], [[1.0]])
+        self.assertEqual(self.cache.get_many(["get Orders"]), [[1.0]])
+
+    def test_keys_are_scoped_by_model(self):
+        """A different model never sees another model's vectors."""
+        self.cache.put_many(["alpha"], [[1.0]])
+        other = EmbeddingCache(self.path, model_name="other-model")
+        try:
+            self.assertEqual(other.get_many(["alpha"]), [None])
+        finally:
+            other.close()
+
+    def test_keys_are_scoped_by_backend(self):
+        """Quantized ONNX vectors are never served to the fp32 backend."""
+        self.cache.put_many(["alpha"], [[1.0]])
+        other = EmbeddingCache(self.path, model_name="test-model", backend="onnx-int8")
+        try:
+            self.assertEqual(other.get_many(["alpha"]), [None])
+        finally:
+            other.close()
+
+    def test_persists_across_instances(self):
+        """Vectors survive closing and reopening the cache file."""
+        self.cache.put_many(["alpha"], [[1.0, 2.0]])
+        self.cache.close()
+        self.cache = EmbeddingCache(self.path, model_name="test-model")
+        self.assertEqual(self.cache.get_many(["alpha"]), [[1.0, 2.0]])
+
+    def test_evicts_least_recently_used(self):
+        """Going over max_entries drops the entries used longest ago."""
+        self.cache.put_many(["a"], [[1.0]])
+        self.cache.put_many(["b"], [[2.0]])
+        self.cache.put_many(["c"], [[3.0]])
+        self.cache.get_many(["a"])
+        self.cache.put_many(["d"], [[4.0]])
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(self.cache.get_many(["b"]), [None])
+        self.assertEqual(self.cache.get_many(["a"]), [[1.0]])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,104 @@
+import unittest
+import json
+import threading
+import urllib.error
+import urllib.request
+from processor.embedding_server import MicroBatcher, EmbeddingServer
+
+class FakeEmbeddings:
+    """Embeds a text as [len(text)] and records every model call."""
+    def __init__(self, gate=None):
+        self.calls = []
+        self.gate = gate
+
+    def embed_documents(self, texts):
+        if self.gate is not None:
+            self.gate.wait()
+        self.calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_results_match_inputs(self):
+        """Each caller gets the vectors of its own texts, in order."""
+        batcher = MicroBatcher(FakeEmbeddings().embed_documents, max_batch_size=8, max_wait_ms=1)
+        try:
+            self.assertEqual(batcher.embed(["a", "bbb", "cc"]), [[1.0], [3.0], [2.0]])
+            self.assertEqual(batcher.embed([]), [])
+        finally:
+            batcher.close()
+
+    def test_concurrent_requests_share_a_call(self):
+        """Requests queued while the model is busy are embedded together."""
+        gate = threading.Event()
+        fake = FakeEmbeddings(gate)
+        batcher = MicroBatcher(fake.embed_documents, max_batch_size=64, max_wait_ms=50)
+        results = {}
+
+        def query(i):
+            results[i] = batcher.embed(["x" * i])
+
+        threads = [threading.Thread(target=query, args=(i,)) for i in range(1, 11)]
+        for thread in threads:
+            thread.start()
+        gate.set()
+        for thread in threads:
+            thread.join()
+        batcher.close()
+        self.assertEqual(results, {i: [[float(i)]] for i in range(1, 11)})
+        self.assertLess(len(fake.calls), 10)
+        self.assertEqual(batcher.stats()["texts"], 10)
+
+    def test_max_batch_size_bounds_model_calls(self):
+        """An oversized request is split into model calls of at most max_batch_size texts."""
+        fake = FakeEmbeddings()
+        batcher = MicroBatcher(fake.embed_documents, max_batch_size=4, max_wait_ms=1)
+        try:
+            vectors = batcher.embed(["t"] * 10)
+        finally:
+            batcher.close()
+        self.assertEqual(len(vectors), 10)
+        self.assertEqual([len(call) for call in fake.calls], [4, 4, 2])
+
+    def test_errors_reach_the_caller(self):
+        """A failing model call raises in every request of the batch."""
+        def fail(texts):
+            raise RuntimeError("model failed")
+        batcher = MicroBatcher(fail, max_batch_size=4, max_wait_ms=1)
+        try:
+            with self.assertRaises(RuntimeError):
+                batcher.embed(["a"])
+        finally:
+            batcher.close()
+
+class TestEmbeddingServer(unittest.TestCase):
+    def setUp(self):
+        self.server = EmbeddingServer(FakeEmbeddings(), "fake-model", port=0, max_batch_size=8, max_wait_ms=1)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def post(self, body):
+        request = urllib.request.Request(f"{self.url}/embed", data=json.dumps(body).encode('utf-8'),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+    def test_embed_round_trip(self):
+        """POST /embed returns the model name and one vector per text."""
+        body = self.post({"texts": ["ab", "abcd"]})
+        self.assertEqual(body, {"model": "fake-model", "embeddings": [[2.0], [4.0]]})
+        with urllib.request.urlopen(f"{self.url}/health") as response:
+            self.assertEqual(json.loads(response.read())["stats"]["texts"], 2)
+
+    def test_bad_request(self):
+        """Malformed bodies are rejected with 400."""
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            self.post({"texts": "not a list"})
+        self.assertEqual(context.exception.code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
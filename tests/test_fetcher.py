@@ -0,0 +1,31 @@
+import unittest
+import threading
+import time
+from scraper.fetcher import fetch_pages
+
+class TestFetchPages(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def fetch(self, url):
+        with self.lock:
+            self.calls.append(url)
+        time.sleep(0.05)
+        return f"# {url}"
+
+    def test_every_page_is_yielded(self):
+        urls = [f"https://example.com/docs/{i}" for i in range(5)]
+        pages = dict(fetch_pages(urls, fetch=self.fetch, max_workers=2, requests_per_second=1000, burst=100))
+        self.assertEqual(pages, {url: f"# {url}" for url in urls})
+
+    def test_closing_early_cancels_queued_fetches(self):
+        """Stopping after the first page does not wait for the rest of the queue."""
+        urls = [f"https://example.com/docs/{i}" for i in range(50)]
+        pages = fetch_pages(urls, fetch=self.fetch, max_workers=2, requests_per_second=1000, burst=100)
+        next(pages)
+        pages.close()
+        self.assertLess(len(self.calls), 10)
+
+if __name__ == '__main__':
+    unittest.main()
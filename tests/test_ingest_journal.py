@@ -0,0 +1,44 @@
+import unittest
+import os
+import tempfile
+from processor.ingest_journal import IngestJournal
+
+class TestIngestJournal(unittest.TestCase):
+    def setUp(self):
+        """Create a journal in a temporary directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "journal.sqlite3")
+        self.journal = IngestJournal(self.path, max_attempts=2)
+
+    def tearDown(self):
+        self.journal.close()
+        self.tmpdir.cleanup()
+
+    def test_resume_skips_processed_urls(self):
+        """A resumed run continues with the URLs that were not processed."""
+        self.journal.start(["a", "b", "c"])
+        self.journal.mark_fetched("a")
+        self.journal.mark_processed("a")
+        self.journal.mark_fetched("b")
+        self.journal.close()
+
+        self.journal = IngestJournal(self.path, max_attempts=2)
+        self.assertEqual(self.journal.start(["a", "b", "c", "d"], resume=True), ["b", "c", "d"])
+
+    def test_fresh_start_forgets_previous_run(self):
+        """Without resume every URL is pending again."""
+        self.journal.start(["a", "b"])
+        self.journal.mark_processed("a")
+        self.assertEqual(self.journal.start(["a", "b"]), ["a", "b"])
+
+    def test_failed_urls_are_retried_until_attempts_run_out(self):
+        """Failures stay in the remaining list until max_attempts is reached."""
+        self.journal.start(["a"])
+        self.journal.mark_failed("a", "timeout")
+        self.assertEqual(self.journal.remaining(), ["a"])
+        self.journal.mark_failed("a", "timeout")
+        self.assertEqual(self.journal.remaining(), [])
+        self.assertEqual(self.journal.summary()["failed"], 1)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,70 @@
+import unittest
+import os
+import tempfile
+from ingest_snapshot import ingest_snapshot, iter_snapshot
+from processor.document_processor import DocumentProcessor
+
+BASE_URL = "https://example.com/docs"
+
+class FakeProcessor:
+    """Records what ingest_snapshot embeds and stores instead of touching a database."""
+    def __init__(self, stored_hashes=None):
+        self.stored_hashes = stored_hashes or {}
+        self.embedded = []
+        self.stored = {}
+
+    def _stored_hashes(self):
+        return self.stored_hashes
+
+    def _embed_plan(self, nodes):
+        for node in nodes:
+            node["embedding"] = [0.0]
+        self.embedded.extend(nodes)
+
+    def _store_document(self, url, content_hash, nodes):
+        self.stored[url] = (content_hash, nodes)
+
+class TestIngestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.pages = {
+            "orders-api.md": "# Orders API\n\nGet orders.\n\n## getOrders\n\nReturns orders.",
+            "guides/feeds-api.md": "# Feeds API\n\nSubmit feeds.",
+            "unchanged.md": "# Unchanged\n\nSame as last time.",
+        }
+        for name, text in self.pages.items():
+            self.write(name, text.encode("utf-8"))
+        self.write("broken.md", b"# Broken \xff\xfe page")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmpdir.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def test_unreadable_files_are_skipped(self):
+        skipped = []
+        names = [name for name, _ in iter_snapshot(self.tmpdir.name, skipped)]
+        self.assertEqual(sorted(names), sorted(self.pages))
+        self.assertEqual([name for name, _ in skipped], ["broken.md"])
+
+    def test_pages_are_chunked_embedded_and_stored(self):
+        """Changed pages go through chunk -> embed -> store; unchanged and unreadable ones do not."""
+        unchanged_url = f"{BASE_URL}/unchanged"
+        processor = FakeProcessor({unchanged_url: DocumentProcessor._content_hash(self.pages["unchanged.md"])})
+        counts = ingest_snapshot(processor, self.tmpdir.name, base_url=BASE_URL, workers=1, batch_size=1)
+
+        self.assertEqual(sorted(processor.stored), [f"{BASE_URL}/guides/feeds-api", f"{BASE_URL}/orders-api"])
+        for url, (content_hash, nodes) in processor.stored.items():
+            self.assertTrue(content_hash)
+            self.assertTrue(nodes)
+            self.assertTrue(all(node["embedding"] == [0.0] for node in nodes))
+        self.assertEqual(len(processor.embedded), counts["chunks"])
+        self.assertEqual((counts["pages"], counts["written"], counts["unchanged"], counts["failed"]), (3, 2, 1, 0))
+        self.assertEqual([name for name, _ in counts["skipped"]], ["broken.md"])
+
+if __name__ == '__main__':
+    unittest.main()
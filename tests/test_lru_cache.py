@@ -0,0 +1,62 @@
+import unittest
+import os
+import tempfile
+from processor.lru_cache import LRUCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestLRUCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        """Lookups are counted and reported as a hit rate."""
+        cache = LRUCache(max_entries=2)
+        cache.put("q", [1.0])
+        self.assertEqual(cache.get("q"), [1.0])
+        self.assertIsNone(cache.get("other"))
+        self.assertEqual(cache.stats(), {"entries": 1, "hits": 1, "misses": 1, "hit_rate": 0.5})
+
+    def test_least_recently_used_is_evicted(self):
+        """Reading an entry protects it from the next eviction."""
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+
+    def test_ttl(self):
+        """Entries older than the TTL are misses and get dropped."""
+        clock = FakeClock()
+        cache = LRUCache(max_entries=2, ttl_seconds=60, clock=clock)
+        cache.put("q", 1)
+        clock.now += 30
+        self.assertEqual(cache.get("q"), 1)
+        clock.now += 31
+        self.assertIsNone(cache.get("q"))
+        self.assertEqual(len(cache), 0)
+
+    def test_save_and_load(self):
+        """Saved entries come back in a new cache, except those that expired meanwhile."""
+        clock = FakeClock()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "sub", "queries.pkl")
+            cache = LRUCache(max_entries=5, ttl_seconds=60, clock=clock)
+            cache.put("old", [0.5])
+            clock.now += 50
+            cache.put("new", [1.5])
+            cache.save(path)
+
+            clock.now += 20
+            restored = LRUCache(max_entries=5, ttl_seconds=60, clock=clock)
+            self.assertEqual(restored.load(path), 1)
+            self.assertEqual(restored.get("new"), [1.5])
+            self.assertIsNone(restored.get("old"))
+            self.assertEqual(LRUCache().load(os.path.join(tmpdir, "missing.pkl")), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+import random
+from processor.document_processor import DocumentProcessor
+from benchmarks.normalize_content import legacy_normalize_content, reference_page
+
+SAMPLE_DOC = "tests/test_data/sample_doc.md"
+
+class TestNormalizeContent(unittest.TestCase):
+    def assertSameAsLegacy(self, content):
+        self.assertEqual(DocumentProcessor._normalize_content(content), legacy_normalize_content(content))
+
+    def test_sample_doc(self):
+        """The sample doc normalizes exactly as before."""
+        with open(SAMPLE_DOC, 'r', encoding='utf-8') as f:
+            self.assertSameAsLegacy(f.read())
+
+    def test_reference_page(self):
+        """Pages dense with backtick field entries normalize exactly as before."""
+        content = reference_page(200)
+        self.assertSameAsLegacy(content)
+        self.assertIn("### `field7` string\n\n`field7` string", DocumentProcessor._normalize_content(content))
+
+    def test_random_fragments(self):
+        """Random mixes of backticks, words and whitespace normalize exactly as before."""
+        rng = random.Random(7)
+        tokens = ['`a`', '`b`', 'x', 'y', '`a`x', '\n\n', '\n\n\n', ' ', '\n', '`', '``']
+        for _ in range(2000):
+            self.assertSameAsLegacy(''.join(rng.choice(tokens) for _ in range(rng.randint(1, 12))))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
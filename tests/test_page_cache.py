@@ -0,0 +1,48 @@
+import unittest
+import tempfile
+from scraper.page_cache import PageCache
+
+class TestPageCache(unittest.TestCase):
+    def setUp(self):
+        """Create a cache in a temporary directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = PageCache(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        """Stored pages come back with their HTML, markdown and extractor."""
+        self.cache.put("https://example.com/docs/a", "<html>a</html>", "# A", extractor="beautifulsoup")
+        entry = self.cache.get("https://example.com/docs/a")
+        self.assertEqual(entry["html"], "<html>a</html>")
+        self.assertEqual(entry["markdown"], "# A")
+        self.assertEqual(entry["extractor"], "beautifulsoup")
+
+    def test_hit_and_miss_counters(self):
+        """Lookups are counted as hits or misses."""
+        self.cache.put("https://example.com/docs/a", "<html>a</html>", "# A")
+        self.cache.get("https://example.com/docs/a")
+        self.cache.get("https://example.com/docs/missing")
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["writes"]), (1, 1, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 0.5)
+
+    def test_entries_lists_every_page_once(self):
+        """Re-storing a URL replaces it instead of adding a second entry."""
+        self.cache.put("https://example.com/docs/a", "<html>a</html>", "# A")
+        self.cache.put("https://example.com/docs/b", "<html>b</html>", "# B")
+        self.cache.put("https://example.com/docs/a", "<html>a2</html>", "# A2")
+        entries = {entry["url"]: entry["markdown"] for entry in self.cache.entries()}
+        self.assertEqual(entries, {"https://example.com/docs/a": "# A2", "https://example.com/docs/b": "# B"})
+
+    def test_entries_are_not_counted_as_hits(self):
+        """Enumerating the cache leaves the lookup counters alone."""
+        self.cache.put("https://example.com/docs/a", "<html>a</html>", "# A")
+        list(self.cache.entries())
+        self.cache.get("https://example.com/docs/missing")
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (0, 1, 0.0))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
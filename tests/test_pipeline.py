@@ -0,0 +1,70 @@
+import unittest
+import threading
+from unittest.mock import Mock
+from processor.pipeline import IngestionPipeline
+from scraper.fetcher import new_rate_limiter
+
+class FakeProcessor:
+    """Just enough of DocumentProcessor for the pipeline stages."""
+    db_config = {}
+
+    def __init__(self):
+        self.stored = []
+
+    def _stored_hashes(self):
+        return {}
+
+    def _scrape(self, url):
+        return f"# {url}"
+
+    def _content_hash(self, content):
+        return str(hash(content))
+
+    def _build_chunk_plan(self, content):
+        return [{"content": content}]
+
+    def _embed_plan(self, nodes):
+        for node in nodes:
+            node["embedding"] = [0.0]
+
+    def _store_document(self, url, content_hash, nodes, conn=None):
+        self.stored.append(url)
+
+class TestIngestionPipeline(unittest.TestCase):
+    def run_pipeline(self, pipeline, urls):
+        """Run in a thread so a deadlock fails the test instead of hanging it."""
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(pipeline.run(urls)), daemon=True)
+        thread.start()
+        thread.join(timeout=30)
+        self.assertFalse(thread.is_alive(), "pipeline did not terminate")
+        return result
+
+    def test_pages_flow_through_every_stage(self):
+        """Each URL is fetched, chunked, embedded and written once."""
+        processor = FakeProcessor()
+        pipeline = IngestionPipeline(processor, queue_size=2)
+        pipeline.limiter = new_rate_limiter(requests_per_second=1000, burst=100)
+        pipeline._connect = Mock
+        urls = [f"https://example.com/docs/{i}" for i in range(10)]
+        stats = self.run_pipeline(pipeline, urls)
+        self.assertEqual(sorted(processor.stored), sorted(urls))
+        self.assertEqual(stats["write"]["processed"], 10)
+
+    def test_failed_worker_setup_does_not_deadlock(self):
+        """When no write worker can connect, the pipeline still ends and counts every page as failed."""
+        def connect():
+            raise RuntimeError("connection refused")
+        processor = FakeProcessor()
+        # More pages than the queues hold, so an undrained write queue would block the embed stage
+        pipeline = IngestionPipeline(processor, write_workers=2, queue_size=2)
+        pipeline.limiter = new_rate_limiter(requests_per_second=1000, burst=100)
+        pipeline._connect = connect
+        urls = [f"https://example.com/docs/{i}" for i in range(20)]
+        stats = self.run_pipeline(pipeline, urls)
+        self.assertEqual(processor.stored, [])
+        self.assertEqual(stats["write"]["failed"], 20)
+        self.assertEqual(stats["embed"]["processed"], 20)
+
+if __name__ == '__main__':
+    unittest.main()
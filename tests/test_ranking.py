@@ -0,0 +1,31 @@
+import unittest
+from processor.ranking import reciprocal_rank_fusion
+
+class TestReciprocalRankFusion(unittest.TestCase):
+    def test_items_in_both_lists_win(self):
+        """An item ranked by both branches beats items ranked higher by only one."""
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["d", "c", "e"]], k=60)
+        self.assertEqual(fused[0][0], "c")
+        self.assertAlmostEqual(fused[0][1], 1 / 63 + 1 / 62)
+
+    def test_keyword_hits_are_not_ranked_last(self):
+        """A top keyword hit interleaves with semantic hits instead of trailing them."""
+        fused = [item for item, _ in reciprocal_rank_fusion([[1, 2, 3], [9]])]
+        self.assertEqual(fused, [1, 9, 2, 3])
+
+    def test_weights(self):
+        """A heavier branch takes precedence at equal ranks."""
+        fused = reciprocal_rank_fusion([["semantic"], ["keyword"]], weights=[1.0, 2.0])
+        self.assertEqual([item for item, _ in fused], ["keyword", "semantic"])
+
+    def test_repeats_and_empty_lists(self):
+        """Duplicates within a list count once; empty input gives an empty result."""
+        self.assertEqual(reciprocal_rank_fusion([["a", "a"]], k=0), [("a", 1.0)])
+        self.assertEqual(reciprocal_rank_fusion([[], []]), [])
+
+    def test_weight_count_must_match(self):
+        with self.assertRaises(ValueError):
+            reciprocal_rank_fusion([["a"], ["b"]], weights=[1.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from scraper.rate_limiter import TokenBucket, HostRateLimiter
+
+class FakeClock:
+    """Manual clock whose sleep advances time instead of blocking."""
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class TestTokenBucket(unittest.TestCase):
+    def test_first_request_does_not_wait(self):
+        """A full bucket serves the first request immediately."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, capacity=1, clock=clock, sleep=clock.sleep)
+        self.assertEqual(bucket.acquire(), 0.0)
+
+    def test_requests_are_spaced_at_rate(self):
+        """Back-to-back requests are spaced 1/rate seconds apart."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, capacity=1, clock=clock, sleep=clock.sleep)
+        for _ in range(5):
+            bucket.acquire()
+        self.assertAlmostEqual(clock.now, 2.0)
+        self.assertEqual(clock.sleeps, [0.5] * 4)
+
+    def test_burst_capacity(self):
+        """Up to `capacity` requests go through without waiting."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, capacity=3, clock=clock, sleep=clock.sleep)
+        waits = [bucket.acquire() for _ in range(4)]
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 1.0)
+
+    def test_idle_time_refills_up_to_capacity(self):
+        """Tokens accumulated while idle never exceed capacity."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, capacity=2, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        clock.now += 100
+        waits = [bucket.acquire() for _ in range(3)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 1.0)
+
+class TestHostRateLimiter(unittest.TestCase):
+    def test_hosts_have_independent_buckets(self):
+        """A busy host does not slow down requests to another host."""
+        clock = FakeClock()
+        limiter = HostRateLimiter(rate=1.0, capacity=1, clock=clock, sleep=clock.sleep)
+        self.assertEqual(limiter.acquire("https://a.example.com/docs/1"), 0.0)
+        self.assertEqual(limiter.acquire("https://b.example.com/docs/1"), 0.0)
+        self.assertAlmostEqual(limiter.acquire("https://a.example.com/docs/2"), 1.0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,91 @@
+import unittest
+from processor.retrieval_cache import RetrievalCache
+
+class FakeCorpus:
+    """Counts generation reads and search runs."""
+    def __init__(self):
+        self.generation = 0
+        self.reads = 0
+        self.searches = 0
+
+    def read_generation(self):
+        self.reads += 1
+        return self.generation
+
+    def search(self):
+        self.searches += 1
+        return [{"id": self.searches, "content": "chunk"}]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestRetrievalCache(unittest.TestCase):
+    def test_repeated_search_is_served_from_cache(self):
+        """The same search under the same generation runs once; the query is normalized."""
+        corpus = FakeCorpus()
+        cache = RetrievalCache(corpus.read_generation)
+        first = cache.get_or_compute("semantic", "Rate limits  for getOrders", 5, 0.8, corpus.search)
+        second = cache.get_or_compute("semantic", "Rate limits for getOrders ", 5, 0.8, corpus.search)
+        self.assertEqual(first, second)
+        self.assertEqual(corpus.searches, 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_key_includes_mode_limit_and_threshold(self):
+        corpus = FakeCorpus()
+        cache = RetrievalCache(corpus.read_generation)
+        cache.get_or_compute("semantic", "q", 5, 0.8, corpus.search)
+        cache.get_or_compute("keyword", "q", 5, None, corpus.search)
+        cache.get_or_compute("semantic", "q", 3, 0.8, corpus.search)
+        cache.get_or_compute("semantic", "q", 5, 1.5, corpus.search)
+        self.assertEqual(corpus.searches, 4)
+
+    def test_new_generation_invalidates(self):
+        """Entries from an older corpus generation are recomputed."""
+        corpus = FakeCorpus()
+        cache = RetrievalCache(corpus.read_generation)
+        cache.get_or_compute("semantic", "q", 5, 0.8, corpus.search)
+        corpus.generation += 1
+        results = cache.get_or_compute("semantic", "q", 5, 0.8, corpus.search)
+        self.assertEqual(results[0]["id"], 2)
+        self.assertEqual(cache.stats()["stale"], 1)
+
+    def test_check_interval_limits_generation_reads(self):
+        """With an interval the generation is read at most once per interval."""
+        corpus = FakeCorpus()
+        clock = FakeClock()
+        cache = RetrievalCache(corpus.read_generation, check_interval_seconds=5, clock=clock)
+        for _ in range(3):
+            cache.get_or_compute("semantic", "q", 5, 0.8, corpus.search)
+        self.assertEqual(corpus.reads, 1)
+        clock.now += 6
+        cache.get_or_compute("semantic", "q", 5, 0.8, corpus.search)
+        self.assertEqual(corpus.reads, 2)
+
+    def test_results_are_copies(self):
+        """Mutating returned results does not change the cached entry."""
+        corpus = FakeCorpus()
+        cache = RetrievalCache(corpus.read_generation)
+        cache.get_or_compute("semantic", "q", 5, 0.8, corpus.search)[0]["content"] = "changed"
+        self.assertEqual(cache.get_or_compute("semantic", "q", 5, 0.8, corpus.search)[0]["content"], "chunk")
+
+    def test_unknown_generation_bypasses_cache(self):
+        """Without a corpus generation (e.g. no corpus_state table) every search runs and nothing is stored."""
+        corpus = FakeCorpus()
+        corpus.generation = None
+        cache = RetrievalCache(corpus.read_generation, check_interval_seconds=5, clock=FakeClock())
+        cache.get_or_compute("semantic", "q", 5, 0.8, corpus.search)
+        cache.get_or_compute("semantic", "q", 5, 0.8, corpus.search)
+        self.assertEqual(corpus.searches, 2)
+        self.assertEqual(corpus.reads, 2)
+        self.assertEqual((cache.stats()["bypassed"], cache.stats()["entries"]), (2, 0))
+        corpus.generation = 0
+        cache.get_or_compute("semantic", "q", 5, 0.8, corpus.search)
+        cache.get_or_compute("semantic", "q", 5, 0.8, corpus.search)
+        self.assertEqual(corpus.searches, 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import math
+import random
+from db.vector_index import (create_index_sql, distance_threshold, nearest_chunks_sql, nearest_chunks_params,
+                             search_settings)
+
+CONFIG = {
+    "metric": "l2",
+    "index_type": "hnsw",
+    "hnsw_m": 16,
+    "hnsw_ef_construction": 64,
+    "hnsw_ef_search": 40,
+    "ivfflat_lists": 100,
+    "ivfflat_probes": 10,
+    "storage": "vector",
+    "rerank_factor": 4,
+}
+
+def unit_vector(dimensions=8):
+    vector = [random.gauss(0, 1) for _ in range(dimensions)]
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector]
+
+class TestVectorIndex(unittest.TestCase):
+    def test_thresholds_select_the_same_neighbours(self):
+        """An L2 threshold converted to each metric accepts exactly the same unit vectors."""
+        random.seed(7)
+        for _ in range(500):
+            a, b = unit_vector(), unit_vector()
+            dot = sum(x * y for x, y in zip(a, b))
+            distances = {
+                "l2": math.sqrt(sum((x - y) ** 2 for x, y in zip(a, b))),
+                "cosine": 1 - dot,
+                "ip": -dot,
+            }
+            threshold = random.uniform(0.2, 1.8)
+            accepted = {metric: distances[metric] < distance_threshold(metric, threshold) - 1e-9
+                        for metric in distances}
+            if abs(distances["l2"] - threshold) > 1e-6:
+                self.assertEqual(len(set(accepted.values())), 1, accepted)
+
+    def test_operator_follows_metric(self):
+        """The query operator and the index operator class come from the same metric."""
+        for metric, operator, opclass in (("l2", "<->", "vector_l2_ops"), ("cosine", "<=>", "vector_cosine_ops"),
+                                          ("ip", "<#>", "vector_ip_ops")):
+            self.assertIn(f"embedding {operator} %s", nearest_chunks_sql(metric))
+            self.assertIn(opclass, create_index_sql({**CONFIG, "metric": metric}))
+
+    def test_distance_computed_once(self):
+        """The nearest-chunks query evaluates the distance operator a single time."""
+        self.assertEqual(nearest_chunks_sql("l2").count("<->"), 1)
+
+    def test_index_types(self):
+        self.assertIn("USING hnsw", create_index_sql(CONFIG))
+        self.assertIn("lists = 100", create_index_sql({**CONFIG, "index_type": "ivfflat"}))
+        self.assertEqual(search_settings(CONFIG, limit=100), {"hnsw.ef_search": 100})
+        with self.assertRaises(ValueError):
+            create_index_sql({**CONFIG, "metric": "manhattan"})
+
+    def test_compact_storage_indexes(self):
+        """Compact storages index an expression of the fp32 column with their own operator class."""
+        halfvec = create_index_sql({**CONFIG, "storage": "halfvec", "metric": "cosine"})
+        self.assertIn("((embedding::halfvec(1024)) halfvec_cosine_ops)", halfvec)
+        binary = create_index_sql({**CONFIG, "storage": "binary"})
+        self.assertIn("((binary_quantize(embedding)::bit(1024)) bit_hamming_ops)", binary)
+        with self.assertRaises(ValueError):
+            create_index_sql({**CONFIG, "storage": "int8"})
+
+    def test_compact_storage_reranks(self):
+        """The coarse search orders on the compact expression and the fp32 distance ranks its candidates."""
+        for storage, coarse in (("halfvec", "(embedding::halfvec(1024)) <-> %s::vector(1024)::halfvec(1024)"),
+                                ("binary", "(binary_quantize(embedding)::bit(1024)) <~> binary_quantize(")):
+            config = {**CONFIG, "storage": storage}
+            sql = nearest_chunks_sql("l2", storage)
+            self.assertIn(coarse, sql)
+            self.assertIn("embedding <-> %s::vector(1024) AS distance", sql)
+            params = nearest_chunks_params(config, [0.0] * 4, 5, 1.5)
+            self.assertEqual(sql.count("%s"), len(params))
+            self.assertEqual(params[2:], (20, 5, 1.5))
+            self.assertEqual(search_settings(config, limit=5), {"hnsw.ef_search": 40})
+            self.assertEqual(search_settings(config, limit=20), {"hnsw.ef_search": 80})
+        self.assertEqual(nearest_chunks_params(CONFIG, [0.0] * 4, 5, 1.5), ([0.0] * 4, 5, 1.5))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import tempfile
+import numpy as np
+from processor.vector_snapshot import write_snapshot, VectorSnapshot
+
+def unit_vectors(count, dimensions, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+class TestVectorSnapshot(unittest.TestCase):
+    def setUp(self):
+        """Snapshot 300 random unit vectors with ids 1000.. and small payloads."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.vectors = unit_vectors(300, 16)
+        self.ids = list(range(1000, 1300))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, dtype="float32", metric="l2"):
+        rows = ((chunk_id, vector.tolist(), {"content": f"chunk {chunk_id}", "metadata": {"n": chunk_id},
+                                             "json_blocks": [], "tables": []})
+                for chunk_id, vector in zip(self.ids, self.vectors))
+        write_snapshot(self.tmpdir.name, rows, len(self.ids), dimensions=16, dtype=dtype, metric=metric,
+                       generation=7)
+        return VectorSnapshot(self.tmpdir.name)
+
+    def brute_force(self, query, limit):
+        distances = np.linalg.norm(self.vectors - query, axis=1)
+        order = np.argsort(distances)[:limit]
+        return [self.ids[i] for i in order], distances[order]
+
+    def test_matches_brute_force(self):
+        """Exact search returns the true nearest chunks and their L2 distances, closest first."""
+        snapshot = self.write()
+        try:
+            for query in unit_vectors(5, 16, seed=1):
+                expected_ids, expected_distances = self.brute_force(query, 5)
+                results = snapshot.search(query.tolist(), 5, float("inf"))
+                self.assertEqual([r["id"] for r in results], expected_ids)
+                np.testing.assert_allclose([r["distance"] for r in results], expected_distances, atol=1e-5)
+        finally:
+            snapshot.close()
+
+    def test_result_format(self):
+        """Results carry the search() keys and the payload of their own row."""
+        snapshot = self.write()
+        try:
+            result = snapshot.search(self.vectors[42].tolist(), 1, float("inf"))[0]
+        finally:
+            snapshot.close()
+        self.assertEqual(set(result), {"id", "content", "metadata", "json_blocks", "tables", "distance"})
+        self.assertEqual(result["id"], 1042)
+        self.assertEqual(result["content"], "chunk 1042")
+        self.assertEqual(result["metadata"], {"n": 1042})
+        self.assertAlmostEqual(result["distance"], 0.0, places=2)
+        self.assertEqual(snapshot.generation, 7)
+
+    def test_threshold_filters(self):
+        """Only chunks closer than the threshold are returned."""
+        snapshot = self.write()
+        try:
+            query = self.vectors[0]
+            _, distances = self.brute_force(query, 10)
+            threshold = float(distances[3] + distances[4]) / 2
+            self.assertEqual(len(snapshot.search(query.tolist(), 10, threshold)), 4)
+        finally:
+            snapshot.close()
+
+    def test_float16_and_cosine(self):
+        """Half-precision cosine snapshots rank like exact L2 on unit vectors."""
+        snapshot = self.write(dtype="float16", metric="cosine")
+        try:
+            query = unit_vectors(1, 16, seed=2)[0]
+            expected_ids, expected_distances = self.brute_force(query, 3)
+            results = snapshot.search(query.tolist(), 3, float("inf"))
+        finally:
+            snapshot.close()
+        self.assertEqual([r["id"] for r in results], expected_ids)
+        np.testing.assert_allclose([r["distance"] for r in results], expected_distances ** 2 / 2, atol=1e-2)
+
+    def test_row_count_mismatch(self):
+        """A row count that does not match the export is rejected."""
+        rows = [(1, [0.0] * 16, {})]
+        with self.assertRaises(ValueError):
+            write_snapshot(self.tmpdir.name, iter(rows), 2, dimensions=16)
+
+if __name__ == '__main__':
+    unittest.main()